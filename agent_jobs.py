@@ -0,0 +1,234 @@
+"""
+Background execution of agent chat turns
+Turns are submitted as jobs to a bounded worker pool so that no UI or request
+thread waits on the LLM. Each job reports its progress (queued, started, every
+tool call, finished) to its session's event queue, which the UI polls.
+Sessions are limited to a few concurrent jobs and queued or running jobs can
+be cancelled; a running turn stops at its next LLM or tool call.
+"""
+
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+# Worker threads shared by all sessions, and how many jobs may wait for one
+JOB_WORKERS = int(os.getenv("TRAVEL_AGENT_JOB_WORKERS", "4"))
+MAX_QUEUED_JOBS = int(os.getenv("TRAVEL_AGENT_MAX_QUEUED_JOBS", "32"))
+
+# Queued plus running jobs per session
+MAX_JOBS_PER_SESSION = int(os.getenv("TRAVEL_AGENT_MAX_JOBS_PER_SESSION", "1"))
+
+# Events kept per session for polling
+MAX_SESSION_EVENTS = 200
+
+# Finished jobs nobody collected (e.g. the chat was cleared) are dropped after this many seconds
+FINISHED_JOB_RETENTION = 600
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = {DONE, FAILED, CANCELLED}
+
+
+class JobLimitError(RuntimeError):
+    """The session or the whole executor already has as many jobs as it may"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running turn once its job has been cancelled"""
+
+
+class JobEvent(NamedTuple):
+    seq: int
+    job_id: str
+    kind: str
+    detail: str
+    timestamp: float
+
+
+class Job:
+    """One submitted chat turn and its outcome"""
+
+    def __init__(self, session_id: str, description: str = ""):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.description = description
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = threading.Event()
+        self.future: Optional[Future] = None
+        self._executor: Optional["JobExecutor"] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def emit(self, kind: str, detail: str = ""):
+        """Report progress to the session's event queue"""
+        if self._executor is not None:
+            self._executor._emit(self, kind, detail)
+
+    def check_cancelled(self):
+        if self.cancel_requested.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+    def callback_handler(self):
+        """LangChain callback that reports tool calls and stops the run once cancelled"""
+        return _job_handler_class()(self)
+
+
+@lru_cache(maxsize=None)
+def _job_handler_class():
+    """Define the callback on first use so importing this module does not load LangChain"""
+    from langchain.callbacks.base import BaseCallbackHandler
+
+    class JobCallbackHandler(BaseCallbackHandler):
+        # Let JobCancelled propagate instead of being logged and ignored
+        raise_error = True
+
+        def __init__(self, job: Job):
+            super().__init__()
+            self.job = job
+
+        def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+            self.job.check_cancelled()
+            self.job.emit("thinking")
+
+        def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+            self.job.check_cancelled()
+            self.job.emit("thinking")
+
+        def on_tool_start(self, serialized, input_str, **kwargs: Any) -> None:
+            self.job.check_cancelled()
+            self.job.emit("tool_start", (serialized or {}).get("name", "tool"))
+
+        def on_tool_end(self, output, **kwargs: Any) -> None:
+            self.job.emit("tool_end", kwargs.get("name") or "")
+
+        def on_tool_error(self, error, **kwargs: Any) -> None:
+            self.job.emit("tool_error", str(error))
+
+    return JobCallbackHandler
+
+
+class JobExecutor:
+    """Bounded worker pool for chat turns with per-session limits and event queues"""
+
+    def __init__(self, max_workers: int = JOB_WORKERS, max_queued: int = MAX_QUEUED_JOBS,
+                 max_per_session: int = MAX_JOBS_PER_SESSION):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_per_session = max_per_session
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-job")
+        self._jobs: Dict[str, Job] = {}
+        self._events: Dict[str, Deque[JobEvent]] = {}
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _emit(self, job: Job, kind: str, detail: str = ""):
+        with self._lock:
+            events = self._events.setdefault(job.session_id, deque(maxlen=MAX_SESSION_EVENTS))
+            events.append(JobEvent(next(self._seq), job.id, kind, detail, time.time()))
+
+    def active_jobs(self, session_id: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values()
+                    if not job.finished and (session_id is None or job.session_id == session_id)]
+
+    def submit(self, session_id: str, fn: Callable[[Job], Any], description: str = "") -> Job:
+        """Run fn(job) on the pool; raises JobLimitError when the session or the pool is full"""
+        job = Job(session_id, description)
+        job._executor = self
+        with self._lock:
+            self._prune()
+            active = [other for other in self._jobs.values() if not other.finished]
+            if sum(other.session_id == session_id for other in active) >= self.max_per_session:
+                raise JobLimitError("This conversation already has a request in progress")
+            if len(active) >= self.max_workers + self.max_queued:
+                raise JobLimitError("The travel agent is busy; please try again shortly")
+            self._jobs[job.id] = job
+        job.emit(QUEUED, description)
+        job.future = self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        if job.cancel_requested.is_set():
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.emit(RUNNING)
+        try:
+            result = fn(job)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            job.error = e
+            self._finish(job, FAILED, str(e))
+        else:
+            # A turn that swallowed the cancellation still counts as cancelled
+            if job.cancel_requested.is_set():
+                self._finish(job, CANCELLED)
+            else:
+                job.result = result
+                self._finish(job, DONE)
+
+    def _finish(self, job: Job, status: str, detail: str = ""):
+        job.finished_at = time.time()
+        job.status = status
+        job.emit(status, detail)
+
+    def _prune(self):
+        cutoff = time.time() - FINISHED_JOB_RETENTION
+        for stale in [job for job in self._jobs.values() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[stale.id]
+            events = self._events.get(stale.session_id)
+            if events is not None and all(event.job_id == stale.id for event in events):
+                del self._events[stale.session_id]
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        return self._jobs.get(job_id) if job_id else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job outright or ask a running one to stop; False if already finished"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED)
+        return True
+
+    def events(self, session_id: str, after: int = 0, job_id: Optional[str] = None) -> List[JobEvent]:
+        """Session events with seq > after (optionally for one job), oldest first"""
+        with self._lock:
+            events = list(self._events.get(session_id, ()))
+        return [event for event in events if event.seq > after and (job_id is None or event.job_id == job_id)]
+
+    def forget(self, job_id: str):
+        """Drop a finished job once its result has been collected"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finished:
+                return
+            del self._jobs[job_id]
+            events = self._events.get(job.session_id)
+            if events is not None:
+                remaining = deque((event for event in events if event.job_id != job_id), maxlen=MAX_SESSION_EVENTS)
+                if remaining:
+                    self._events[job.session_id] = remaining
+                else:
+                    del self._events[job.session_id]
+
+    def shutdown(self, wait: bool = True):
+        for job in self.active_jobs():
+            self.cancel(job.id)
+        self._pool.shutdown(wait=wait)
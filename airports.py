@@ -0,0 +1,236 @@
+"""
+Local airport and airline reference database
+Resolves place names, airport names and airline names to IATA codes from the
+bundled data files, without any network calls.
+"""
+
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from text_index import PrefixTrie, TrigramIndex, is_typo_of, normalize
+from travel_data import AIRLINE_NAMES, DATA_DIR
+
+_IATA_CODE = re.compile(r"^[A-Za-z]{3}$")
+
+EARTH_RADIUS_KM = 6371.0088
+
+# A fuzzy match must score at least this and read as a typo of the name it matched,
+# so near-miss names of other places ("Parma", "Bristol") are not taken for a city
+FUZZY_MIN_SCORE = 0.5
+
+# Grid cell size for nearby-airport queries; one degree of latitude is ~111 km
+GRID_CELL_DEGREES = 1.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Airport(NamedTuple):
+    iata: str
+    name: str
+    city: str
+    country: str
+    latitude: float
+    longitude: float
+
+
+class AirportGrid:
+    """Fixed-size latitude/longitude grid answering "airports within R km of a point".
+
+    A query only visits the cells overlapping the search radius and computes
+    exact distances for the airports in them.
+    """
+
+    def __init__(self, airports: List[Airport], cell_degrees: float = GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.lon_cells = int(round(360 / cell_degrees))
+        self.cells: Dict[Tuple[int, int], List[Airport]] = {}
+        for airport in airports:
+            self.cells.setdefault(self._cell(airport.latitude, airport.longitude), []).append(airport)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_degrees),
+                math.floor((lon + 180) / self.cell_degrees) % self.lon_cells)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Airport, float]]:
+        """(airport, distance_km) pairs within radius_km, nearest first"""
+        lat_span = radius_km / 111.0
+        row_min = math.floor((lat - lat_span) / self.cell_degrees)
+        row_max = math.floor((lat + lat_span) / self.cell_degrees)
+        # Longitude degrees shrink towards the poles; near them every column is searched
+        widest_lat = min(abs(lat) + lat_span, 89.0)
+        lon_span = radius_km / (111.0 * math.cos(math.radians(widest_lat)))
+        if lon_span >= 180:
+            columns = range(self.lon_cells)
+        else:
+            col_min = math.floor((lon - lon_span + 180) / self.cell_degrees)
+            col_max = math.floor((lon + lon_span + 180) / self.cell_degrees)
+            columns = {col % self.lon_cells for col in range(col_min, col_max + 1)}
+
+        found = []
+        for row in range(row_min, row_max + 1):
+            for col in columns:
+                for airport in self.cells.get((row, col), ()):
+                    distance = haversine_km(lat, lon, airport.latitude, airport.longitude)
+                    if distance <= radius_km:
+                        found.append((airport, distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+
+class AirportIndex:
+    """Code, city, prefix, fuzzy and nearby lookups over the bundled airport dataset"""
+
+    def __init__(self, airports: List[Airport], metro_codes: Dict[str, str], city_aliases: Dict[str, str]):
+        self.airports = airports
+        self.by_code: Dict[str, Airport] = {airport.iata: airport for airport in airports}
+        self.metro_codes = {normalize(city): code for city, code in metro_codes.items()}
+        self.by_city: Dict[str, List[Airport]] = {}
+        self._trie = PrefixTrie()
+        self._trigrams = TrigramIndex()
+        self.grid = AirportGrid(airports)
+
+        for airport in airports:
+            city_key = normalize(airport.city)
+            self.by_city.setdefault(city_key, []).append(airport)
+            for key in (city_key, normalize(airport.name)):
+                self._trie.insert(key, airport)
+                self._trigrams.add(key, airport)
+
+        # Aliases ("nyc", "bombay") point at every airport of their city
+        for alias, city in city_aliases.items():
+            alias_key, city_key = normalize(alias), normalize(city)
+            if alias_key == city_key:
+                continue
+            for airport in list(self.by_city.get(city_key, [])):
+                self.by_city.setdefault(alias_key, []).append(airport)
+                self._trie.insert(alias_key, airport)
+                self._trigrams.add(alias_key, airport)
+
+    @classmethod
+    def load(cls) -> "AirportIndex":
+        with open(DATA_DIR / "airports.json", encoding="utf-8") as f:
+            data = json.load(f)
+        airports = [Airport(*row) for row in data["airports"]]
+        return cls(airports, data["metro_codes"], data["city_aliases"])
+
+    def resolve(self, query: str, limit: int = 5) -> List[Airport]:
+        """Airports matching a code, city, alias, name prefix or misspelling; [] if none is close"""
+        if _IATA_CODE.match(query.strip()):
+            airport = self.by_code.get(query.strip().upper())
+            if airport:
+                return [airport]
+
+        key = normalize(query)
+        if not key:
+            return []
+        # Drop a trailing country/state ("Paris, France") if the full text misses
+        candidates = [key]
+        if "," in query:
+            candidates.append(normalize(query.split(",")[0]))
+
+        for candidate in candidates:
+            if candidate in self.by_city:
+                return self.by_city[candidate][:limit]
+        for candidate in candidates:
+            matches = self._trie.search(candidate, limit)
+            if matches:
+                return matches
+        for candidate in candidates:
+            matches = [airport for matched, airport, _ in self._trigrams.search_keys(candidate, limit, FUZZY_MIN_SCORE)
+                       if is_typo_of(candidate, matched)]
+            if matches:
+                return matches
+        return []
+
+    def metro_code(self, city: str) -> Optional[str]:
+        """IATA metropolitan-area code ("NYC", "LON") for multi-airport cities"""
+        return self.metro_codes.get(normalize(city))
+
+    def city_airports(self, city: str) -> List[Airport]:
+        return self.by_city.get(normalize(city), [])
+
+    def city_center(self, city: str) -> Optional[Tuple[float, float]]:
+        """Rough coordinates for a city: the mean position of its bundled airports"""
+        airports = self.city_airports(city) or self.resolve(city, limit=1)
+        if not airports:
+            return None
+        return (sum(airport.latitude for airport in airports) / len(airports),
+                sum(airport.longitude for airport in airports) / len(airports))
+
+    def nearby(self, lat: float, lon: float, radius_km: float, limit: Optional[int] = None) -> List[Tuple[Airport, float]]:
+        """Airports within radius_km of a point with their distances, nearest first"""
+        return self.grid.within(lat, lon, radius_km)[:limit]
+
+
+class AirlineIndex:
+    """Name lookups over the airline table shared with the flight tool"""
+
+    def __init__(self, airline_names):
+        self.by_code = airline_names
+        self._trie = PrefixTrie()
+        self._trigrams = TrigramIndex()
+        for code, name in airline_names.items():
+            key = normalize(name)
+            self._trie.insert(key, code)
+            self._trigrams.add(key, code)
+
+    def resolve(self, query: str, limit: int = 5) -> List[str]:
+        """Airline codes matching a code, name prefix or misspelled name"""
+        code = query.strip().upper()
+        if code in self.by_code:
+            return [code]
+        key = normalize(query)
+        return self._trie.search(key, limit) or [code for code, _ in self._trigrams.search(key, limit)]
+
+
+@lru_cache(maxsize=None)
+def get_airport_index() -> AirportIndex:
+    return AirportIndex.load()
+
+
+@lru_cache(maxsize=None)
+def get_airline_index() -> AirlineIndex:
+    return AirlineIndex(AIRLINE_NAMES)
+
+
+def resolve_airports(query: str, limit: int = 5) -> List[Airport]:
+    """Turn a place or airport name into candidate airports"""
+    return get_airport_index().resolve(query, limit)
+
+
+def airports_near(lat: float, lon: float, radius_km: float = 100, limit: Optional[int] = None) -> List[Tuple[Airport, float]]:
+    """Bundled airports within radius_km of a point, nearest first"""
+    return get_airport_index().nearby(lat, lon, radius_km, limit)
+
+
+def resolve_location_code(query: str) -> Optional[str]:
+    """Best IATA code for a flight search: the code itself, a metro code, the top airport, or None"""
+    query = (query or "").strip()
+    index = get_airport_index()
+    # Upper-case three-letter input is taken as a code even if it is not bundled
+    if _IATA_CODE.match(query) and (query.isupper() or query.upper() in index.by_code
+                                    or query.upper() in index.metro_codes.values()):
+        return query.upper()
+    # A city or alias ("Milan", "nyc") covers all of its airports, even when one is named after it
+    for candidate in (query, query.split(",")[0]):
+        city_airports = index.city_airports(candidate)
+        if city_airports:
+            return index.metro_code(city_airports[0].city) or city_airports[0].iata
+    airports = index.resolve(query, limit=1)
+    if not airports:
+        return None
+    airport = airports[0]
+    # A named airport ("Heathrow") keeps its own code; a misspelled city covers all of its airports
+    if normalize(airport.name).startswith(normalize(query)):
+        return airport.iata
+    return index.metro_code(airport.city) or airport.iata
@@ -0,0 +1,244 @@
+"""
+Shared Amadeus API client
+One access token, one HTTP session, one rate limiter and one response cache
+per set of credentials, shared by every tool and thread in the process.
+Concurrent fan-out helpers go through the same limiter, so batched requests
+stay within the API's transactions-per-second quota.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+import json_codec
+
+# Optional import for incremental parsing of large responses
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
+
+# The test environment allows 10 transactions per second
+DEFAULT_REQUESTS_PER_SECOND = float(os.getenv("TRAVEL_AGENT_AMADEUS_RPS", "10"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("TRAVEL_AGENT_AMADEUS_CONCURRENCY", "4"))
+
+# Refresh the token this many seconds before Amadeus says it expires
+TOKEN_EXPIRY_MARGIN = 60
+
+
+class AmadeusError(RuntimeError):
+    """Non-success response from the Amadeus API"""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"Amadeus API error {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class RateLimiter:
+    """Token bucket shared by all threads; acquire() blocks until a request may start"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TTLCache:
+    """Thread-safe in-memory cache with per-entry expiry and LRU eviction"""
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class AmadeusClient:
+    """Authenticated, rate-limited and cached access to the Amadeus REST API"""
+
+    def __init__(self, client_id: str, client_secret: str, base_url: str = AMADEUS_BASE_URL,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        import requests
+
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.cache = TTLCache()
+        self.max_concurrency = max_concurrency
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock = threading.Lock()
+
+    def access_token(self) -> str:
+        """Current access token, fetching a new one only when it is about to expire"""
+        with self._token_lock:
+            if self._token and time.monotonic() < self._token_expires:
+                return self._token
+            self.rate_limiter.acquire()
+            response = self.session.post(
+                f"{self.base_url}/v1/security/oauth2/token",
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                },
+                timeout=15,
+            )
+            if response.status_code != 200:
+                raise AmadeusError(response.status_code, response.text)
+            payload = response.json()
+            token = payload.get("access_token")
+            if not token:
+                raise AmadeusError(response.status_code, "No access token received from Amadeus.")
+            self._token = token
+            self._token_expires = time.monotonic() + int(payload.get("expires_in", 1799)) - TOKEN_EXPIRY_MARGIN
+            return token
+
+    def _request(self, path: str, params: Dict[str, Any], stream: bool = False):
+        for attempt in range(2):
+            self.rate_limiter.acquire()
+            response = self.session.get(
+                f"{self.base_url}{path}",
+                headers={"Authorization": f"Bearer {self.access_token()}"},
+                params=params,
+                timeout=30,
+                stream=stream,
+            )
+            if response.status_code == 401 and attempt == 0:
+                # Token revoked or expired early: drop it and retry once
+                response.close()
+                with self._token_lock:
+                    self._token = None
+                continue
+            break
+        if response.status_code != 200:
+            raise AmadeusError(response.status_code, response.text)
+        return response
+
+    def get(self, path: str, params: Dict[str, Any], cache_ttl: float = 0,
+            fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        """GET a JSON endpoint.
+
+        With cache_ttl, identical requests are answered from memory. With fields
+        (paths such as "data[].hotelId"), only those parts of the body are decoded.
+        """
+        key = (path, tuple(sorted((name, str(value)) for name, value in params.items())), fields)
+        if cache_ttl:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        body = self._request(path, params).content
+        payload = json_codec.loads_projected(body, fields) if fields else json_codec.loads(body)
+        if cache_ttl:
+            self.cache.set(key, payload, cache_ttl)
+        return payload
+
+    def stream_items(self, path: str, params: Dict[str, Any], prefix: str = "data.item") -> Iterator[Any]:
+        """Yield the elements of a large JSON array one at a time as the body arrives.
+
+        prefix uses ijson's notation ("data.item" is every element of the
+        top-level "data" array). Without ijson the response is decoded in one go
+        and the same array is iterated.
+        """
+        response = self._request(path, params, stream=IJSON_AVAILABLE)
+        if not IJSON_AVAILABLE:
+            items = json_codec.loads(response.content)
+            for key in prefix.split(".")[:-1]:
+                items = items.get(key, {})
+            yield from items or []
+            return
+        try:
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, prefix, use_float=True)
+        finally:
+            response.close()
+
+    def map_concurrent(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """Apply fn to every item on a bounded thread pool, preserving order.
+
+        Each result is either fn's return value or the exception it raised, so
+        one failed request does not discard the others.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        def call(item):
+            try:
+                return fn(item)
+            except Exception as e:
+                return e
+
+        if len(items) == 1:
+            return [call(items[0])]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(items))) as executor:
+            return list(executor.map(call, items))
+
+
+@lru_cache(maxsize=None)
+def _shared_client(client_id: str, client_secret: str) -> AmadeusClient:
+    return AmadeusClient(client_id, client_secret)
+
+
+def get_amadeus_client() -> Optional[AmadeusClient]:
+    """Process-wide client for the credentials in the environment, or None if they are missing"""
+    client_id = os.getenv("AMADEUS_CLIENT_ID")
+    client_secret = os.getenv("AMADEUS_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        return None
+    return _shared_client(client_id, client_secret)
@@ -0,0 +1,385 @@
+"""
+HTTP API for the AI Travel Agent
+A dependency-free ASGI app exposing chat, streamed chat and the agent's tools,
+so the agent can run behind a load balancer outside Streamlit:
+
+    uvicorn api_server:app --host 0.0.0.0 --port 8000
+
+All requests share one runtime: the TravelAgent, a bounded pool of workers for
+agent and tool calls, and a pluggable session store. Requests wait for a free
+worker without holding a thread; once a client has too many requests pending,
+or the wait queue is full, new ones are rejected with 429 and a Retry-After
+estimate instead of piling up.
+"""
+
+import asyncio
+import json
+import math
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from agent_jobs import CANCELLED, DONE, FINISHED, Job, JobEvent, JobExecutor, JobLimitError
+from json_codec import loads
+from session_store import ChatSession, SessionConflictError, SessionStore, create_session_store
+
+# Agent and tool calls running at once; further requests wait for a slot
+MAX_IN_FLIGHT = int(os.getenv("TRAVEL_AGENT_API_MAX_IN_FLIGHT", "8"))
+# Requests allowed to wait for a slot before the server answers 429
+MAX_WAITING = int(os.getenv("TRAVEL_AGENT_API_MAX_WAITING", "32"))
+# Waiting plus running requests per client (X-Client-Id header, else the client address)
+MAX_CLIENT_REQUESTS = int(os.getenv("TRAVEL_AGENT_API_MAX_CLIENT_REQUESTS", "4"))
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_MESSAGE_CHARS = 4000
+
+# Seconds between progress checks on a streamed turn
+STREAM_POLL_INTERVAL = 0.1
+
+# Turn latency assumed for Retry-After until real turns have been timed
+INITIAL_LATENCY_ESTIMATE = 5.0
+
+
+class ApiError(Exception):
+    """An error answered with its status code and a JSON body"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class ApiRuntime:
+    """Agent, workers, admission control and sessions shared by every request"""
+
+    def __init__(self, agent=None, store: Optional[SessionStore] = None, max_in_flight: int = MAX_IN_FLIGHT,
+                 max_waiting: int = MAX_WAITING, max_client_requests: int = MAX_CLIENT_REQUESTS):
+        self._agent = agent
+        # An empty store is falsy (it has a length), so test for None
+        self.store = store if store is not None else create_session_store()
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.max_client_requests = max_client_requests
+        # slot() admits at most max_in_flight calls, so jobs rarely wait inside the pool
+        self.jobs = JobExecutor(max_workers=max_in_flight, max_queued=max_waiting, max_per_session=1)
+        self.in_flight = 0
+        self.waiting = 0
+        self.latency = INITIAL_LATENCY_ESTIMATE
+        self._client_requests: Dict[str, int] = {}
+        # Created on first use so it binds to the server's event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        # One asyncio view of each job's future, shared by every wait on it; see forget()
+        self._waiters: Dict[str, asyncio.Future] = {}
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            from travel_agent import get_shared_agent
+            self._agent = get_shared_agent()
+        return self._agent
+
+    def tools(self) -> Dict[str, Any]:
+        return {tool.name: tool for tool in self.agent.tools}
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the recent turn latency and the queue length"""
+        return max(1, math.ceil(self.latency * (self.waiting + 1) / self.max_in_flight))
+
+    def _busy(self, message: str) -> ApiError:
+        return ApiError(429, message, {"Retry-After": str(self.retry_after())})
+
+    @asynccontextmanager
+    async def slot(self, client_id: str) -> AsyncIterator[None]:
+        """Hold one in-flight slot, waiting for it if allowed; raises ApiError(429) otherwise"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        pending = self._client_requests.get(client_id, 0)
+        if pending >= self.max_client_requests:
+            raise self._busy("Too many requests from this client; wait for earlier ones to finish")
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            raise self._busy("The travel agent is busy; please try again shortly")
+
+        self._client_requests[client_id] = pending + 1
+        self.waiting += 1
+        acquired = False
+        try:
+            await self._slots.acquire()
+            acquired = True
+            self.waiting -= 1
+            self.in_flight += 1
+            yield
+        finally:
+            if acquired:
+                self.in_flight -= 1
+                self._slots.release()
+            else:
+                self.waiting -= 1
+            remaining = self._client_requests[client_id] - 1
+            if remaining:
+                self._client_requests[client_id] = remaining
+            else:
+                del self._client_requests[client_id]
+
+    def submit(self, key: str, fn: Callable[[Job], Any], description: str = "") -> Job:
+        """Start fn on a worker; key allows one job at a time (a session id, or a fresh id for tool calls)"""
+        try:
+            return self.jobs.submit(key, fn, description)
+        except JobLimitError as e:
+            raise ApiError(409, str(e))
+
+    async def wait(self, job: Job, timeout: Optional[float] = None) -> bool:
+        """Wait for a job without blocking the event loop; True once it has finished"""
+        if job.finished:
+            return True
+        # Wrapping adds a done-callback to the job's future, so a polling client wraps it only once
+        waiter = self._waiters.get(job.id)
+        if waiter is None:
+            waiter = self._waiters[job.id] = asyncio.wrap_future(job.future)
+        done, _ = await asyncio.wait({waiter}, timeout=timeout)
+        if done and job.started_at is not None:
+            # Smoothed so a single slow turn does not swing the Retry-After estimate
+            self.latency = 0.8 * self.latency + 0.2 * (job.finished_at - job.started_at)
+        return job.status in FINISHED
+
+    def forget(self, job: Job):
+        """Drop a job the request is done with"""
+        self._waiters.pop(job.id, None)
+        self.jobs.forget(job.id)
+
+    def chat_turn(self, session: ChatSession, message: str) -> Callable[[Job], str]:
+        """Job function running one chat turn and saving it to the session"""
+        def run(job: Job) -> str:
+            response = self.agent.chat(message, session.chat_history(), session.usage, session.itinerary,
+                                       callbacks=[job.callback_handler()])
+            # A turn cancelled after its last LLM call is not added to the conversation
+            job.check_cancelled()
+            session.add_exchange(message, response)
+            self.store.save(session)
+            return response
+        return run
+
+    def shutdown(self):
+        self.jobs.shutdown(wait=False)
+
+
+def _json_body(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode("utf-8")
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_id(scope) -> str:
+    """Who a request is counted against for per-client limits"""
+    explicit = _header(scope, b"x-client-id")
+    if explicit:
+        return explicit
+    client = scope.get("client")
+    return client[0] if client else "anonymous"
+
+
+class TravelAgentApi:
+    """ASGI application; every route works on the shared ApiRuntime"""
+
+    def __init__(self, runtime: Optional[ApiRuntime] = None):
+        self._runtime = runtime
+
+    @property
+    def runtime(self) -> ApiRuntime:
+        # Built at lifespan startup (or the first request), not when the module is imported
+        if self._runtime is None:
+            self._runtime = ApiRuntime()
+        return self._runtime
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        try:
+            await self._route(scope, receive, send)
+        except ApiError as e:
+            await self._respond(send, e.status, {"error": e.message}, e.headers)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Build the runtime before accepting requests
+                self.runtime
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._runtime is not None:
+                    self._runtime.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _route(self, scope, receive, send):
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        parts = path.strip("/").split("/")
+
+        if path == "/health":
+            self._allow(method, "GET")
+            await self._respond(send, 200, self._health())
+        elif path == "/chat":
+            self._allow(method, "POST")
+            await self._chat(scope, await self._read_json(receive), send)
+        elif path == "/chat/stream":
+            self._allow(method, "POST")
+            await self._chat_stream(scope, await self._read_json(receive), send)
+        elif path == "/tools":
+            self._allow(method, "GET")
+            tools = [{"name": name, "description": tool.description} for name, tool in self.runtime.tools().items()]
+            await self._respond(send, 200, {"tools": tools})
+        elif len(parts) == 2 and parts[0] == "tools":
+            self._allow(method, "POST")
+            await self._call_tool(scope, parts[1], await self._read_json(receive), send)
+        elif len(parts) == 2 and parts[0] == "sessions":
+            self._allow(method, "GET", "DELETE")
+            await self._session(method, parts[1], send)
+        else:
+            raise ApiError(404, f"No route for {path}")
+
+    @staticmethod
+    def _allow(method: str, *allowed: str):
+        if method not in allowed:
+            raise ApiError(405, f"Use {' or '.join(allowed)} for this route", {"Allow": ", ".join(allowed)})
+
+    @staticmethod
+    async def _read_json(receive) -> Dict[str, Any]:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > MAX_BODY_BYTES:
+                raise ApiError(413, f"Request body is larger than {MAX_BODY_BYTES} bytes")
+            if not message.get("more_body"):
+                break
+        if not body:
+            return {}
+        try:
+            data = loads(body)
+        except ValueError:
+            raise ApiError(400, "Request body must be JSON")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        return data
+
+    @staticmethod
+    async def _respond(send, status: int, data: Any, headers: Optional[Dict[str, str]] = None):
+        body = _json_body(data) if data is not None else b""
+        raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        raw_headers += [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def _health(self) -> Dict[str, Any]:
+        runtime = self.runtime
+        return {"status": "ok", "in_flight": runtime.in_flight, "waiting": runtime.waiting,
+                "max_in_flight": runtime.max_in_flight, "max_waiting": runtime.max_waiting}
+
+    async def _chat_request(self, data: Dict[str, Any]) -> Tuple[ChatSession, str]:
+        message = data.get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise ApiError(400, "'message' must be a non-empty string")
+        if len(message) > MAX_MESSAGE_CHARS:
+            raise ApiError(400, f"'message' is longer than {MAX_MESSAGE_CHARS} characters")
+        session_id = data.get("session_id")
+        if session_id is not None and not isinstance(session_id, str):
+            raise ApiError(400, "'session_id' must be a string")
+        # Stores may read from disk, so they are called off the event loop
+        return await asyncio.to_thread(self.runtime.store.get_or_create, session_id), message.strip()
+
+    @staticmethod
+    def _reply(session: ChatSession, job: Job) -> Dict[str, Any]:
+        return {"session_id": session.session_id, "response": job.result, "usage": session.usage.as_dict()}
+
+    async def _chat(self, scope, data, send):
+        session, message = await self._chat_request(data)
+        async with self.runtime.slot(client_id(scope)):
+            job = self.runtime.submit(session.session_id, self.runtime.chat_turn(session, message), message)
+            await self.runtime.wait(job)
+        self.runtime.forget(job)
+        if isinstance(job.error, SessionConflictError):
+            raise ApiError(409, f"{job.error}; send the message again")
+        if job.status != DONE:
+            raise ApiError(500, f"The chat turn {job.status}: {job.error or 'no response'}")
+        await self._respond(send, 200, self._reply(session, job))
+
+    async def _chat_stream(self, scope, data, send):
+        """Server-sent events: the job's progress, then one 'message' (or 'error') event"""
+        session, message = await self._chat_request(data)
+        async with self.runtime.slot(client_id(scope)):
+            job = self.runtime.submit(session.session_id, self.runtime.chat_turn(session, message), message)
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")]})
+            try:
+                async for event in self._progress(job):
+                    await send({"type": "http.response.body", "body": _sse(event.kind, {"detail": event.detail}),
+                                "more_body": True})
+            finally:
+                # The client went away (or the server is stopping): stop the turn at its next step
+                if not job.finished:
+                    self.runtime.jobs.cancel(job.id)
+        self.runtime.forget(job)
+        if job.status == DONE:
+            final = _sse("message", self._reply(session, job))
+        else:
+            final = _sse("error", {"error": f"The chat turn {job.status}", "detail": str(job.error or "")})
+        await send({"type": "http.response.body", "body": final})
+
+    async def _progress(self, job: Job) -> AsyncIterator[JobEvent]:
+        after = 0
+        while True:
+            finished = await self.runtime.wait(job, timeout=STREAM_POLL_INTERVAL)
+            for event in self.runtime.jobs.events(job.session_id, after, job.id):
+                after = event.seq
+                if event.kind not in FINISHED:
+                    yield event
+            if finished:
+                return
+
+    async def _call_tool(self, scope, name: str, arguments: Dict[str, Any], send):
+        tool = self.runtime.tools().get(name)
+        if tool is None:
+            raise ApiError(404, f"Unknown tool {name!r}")
+        async with self.runtime.slot(client_id(scope)):
+            job = self.runtime.submit(uuid.uuid4().hex, lambda job: tool.invoke(arguments), name)
+            await self.runtime.wait(job)
+        self.runtime.forget(job)
+        if job.status == CANCELLED:
+            raise ApiError(503, "The tool call was cancelled")
+        if job.status != DONE:
+            # Tools report provider failures in their output, so an exception means bad arguments
+            raise ApiError(400, f"Could not call {name}: {job.error}")
+        await self._respond(send, 200, {"tool": name, "result": job.result})
+
+    async def _session(self, method: str, session_id: str, send):
+        store = self.runtime.store
+        if method == "DELETE":
+            if not await asyncio.to_thread(store.delete, session_id):
+                raise ApiError(404, f"Unknown session {session_id!r}")
+            await self._respond(send, 200, {"deleted": session_id})
+            return
+        session = await asyncio.to_thread(store.get, session_id)
+        if session is None:
+            raise ApiError(404, f"Unknown session {session_id!r}")
+        await self._respond(send, 200, session.as_dict())
+
+
+def create_app(runtime: Optional[ApiRuntime] = None) -> TravelAgentApi:
+    return TravelAgentApi(runtime)
+
+
+app = create_app()
@@ -1,19 +1,22 @@
 import streamlit as st
 import os
+import importlib.util
 from datetime import datetime, timedelta
-from travel_agent import TravelAgent
-from langchain.schema import HumanMessage, AIMessage
+from travel_agent import TravelAgent, get_shared_agent
+from chat_rendering import plan_chat_view, render_message_html, render_page_html
+from export_cache import ExportCache
+from agent_jobs import DONE as JOB_DONE, FAILED as JOB_FAILED, JobExecutor, JobLimitError
+from itinerary import Itinerary, format_itinerary, itinerary_sections
+from session_store import ChatSession, SessionConflictError, SessionStore, create_session_store
+import re
 import time
 import json
 import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-# Optional import for DOCX support
-try:
-    from docx import Document
-    from docx.shared import Inches
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+# Optional DOCX support; python-docx itself is only imported when a DOCX is built
+DOCX_AVAILABLE = importlib.util.find_spec("docx") is not None
 
 # Page configuration
 st.set_page_config(
@@ -216,12 +219,10 @@ st.markdown("""
 
 def initialize_session_state():
     """Initialize session state variables"""
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
+    if 'chat_session' not in st.session_state:
+        st.session_state.chat_session = load_chat_session()
     if 'agent' not in st.session_state:
         st.session_state.agent = None
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
     if 'planning_step' not in st.session_state:
         st.session_state.planning_step = None
     if 'flight_options' not in st.session_state:
@@ -232,50 +233,199 @@ def initialize_session_state():
         st.session_state.hotel_options = []
     if 'selected_hotel' not in st.session_state:
         st.session_state.selected_hotel = None
+    if 'history_pages_shown' not in st.session_state:
+        st.session_state.history_pages_shown = 0
+    if 'conversation_version' not in st.session_state:
+        st.session_state.conversation_version = 0
+    if 'export_cache' not in st.session_state:
+        st.session_state.export_cache = ExportCache(get_export_executor())
+    if 'active_job' not in st.session_state:
+        st.session_state.active_job = None
+
+@st.cache_resource(show_spinner=False)
+def get_export_executor() -> ThreadPoolExecutor:
+    """Worker threads for slow exports (DOCX), shared by all sessions"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="itinerary-export")
+
+@st.cache_resource(show_spinner=False)
+def get_session_store() -> SessionStore:
+    """Conversation store shared by all sessions (SQLite unless TRAVEL_AGENT_SESSION_STORE=memory)"""
+    return create_session_store()
+
+# Session ids are uuid4 hex; anything else in the URL starts a new conversation
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+def session_id_from_url():
+    if hasattr(st, "query_params"):
+        session_id = st.query_params.get("session")
+    else:
+        session_id = (st.experimental_get_query_params().get("session") or [None])[0]
+    return session_id if session_id and SESSION_ID_PATTERN.fullmatch(session_id) else None
+
+def set_session_id_in_url(session_id):
+    """Keep the conversation id in the URL so a reload or restart reopens the same chat"""
+    if hasattr(st, "query_params"):
+        st.query_params["session"] = session_id
+    else:
+        st.experimental_set_query_params(session=session_id)
+
+def load_chat_session(new=False) -> ChatSession:
+    """The conversation named in the URL (loaded from the store), or a new one"""
+    session = get_session_store().get_or_create(None if new else session_id_from_url())
+    set_session_id_in_url(session.session_id)
+    return session
+
+def record_exchange(user_message, response, notice=False):
+    """Log a finished exchange and move the conversation to a new version"""
+    store = get_session_store()
+    session = st.session_state.chat_session
+    session.add_exchange(user_message, response, notice)
+    try:
+        store.save(session)
+    except SessionConflictError:
+        # Another tab or server added to this conversation meanwhile: append to the latest copy
+        session = store.get_or_create(session.session_id)
+        session.add_exchange(user_message, response, notice)
+        store.save(session)
+        st.session_state.chat_session = session
+    st.session_state.conversation_version += 1
+
+@st.cache_resource(show_spinner=False)
+def get_travel_agent_runtime(api_key: str) -> TravelAgent:
+    """Build the agent runtime once per API key and share it across all sessions"""
+    return get_shared_agent(api_key)
 
 def create_travel_agent():
-    """Create and return a travel agent instance"""
+    """Return the shared travel agent; only conversation state lives in the session"""
     try:
-        return TravelAgent()
+        return get_travel_agent_runtime(os.getenv("OPENAI_API_KEY", ""))
     except ValueError as e:
         st.error(f"Error initializing travel agent: {e}")
         st.info("Please make sure you have set your OPENAI_API_KEY in the .env file")
         return None
 
+@st.cache_resource(show_spinner=False)
+def get_job_executor() -> JobExecutor:
+    """Bounded worker pool for chat turns, shared by all sessions"""
+    return JobExecutor()
+
+# Seconds between progress checks while a turn runs
+JOB_POLL_INTERVAL = 0.5
+
+# Progress line per job event
+JOB_EVENT_LABELS = {
+    "queued": "⏳ Waiting for a free agent...",
+    "running": "🤖 AI Travel Agent is thinking...",
+    "thinking": "🤖 AI Travel Agent is thinking...",
+    "tool_start": "🔧 Using {detail}...",
+    "tool_end": "✅ Got results, writing the answer...",
+    "tool_error": "⚠️ A tool failed, trying to recover...",
+}
+
+def submit_chat_turn(user_message):
+    """Queue a chat turn on the background workers; False if this session may not start one"""
+    agent = st.session_state.agent
+    session = st.session_state.chat_session
+    
+    def run(job):
+        # The LangChain history is derived from the transcript on the worker, never kept
+        return agent.chat(user_message, session.chat_history(), session.usage, session.itinerary,
+                          callbacks=[job.callback_handler()])
+    
+    try:
+        job = get_job_executor().submit(session.session_id, run, description=user_message)
+    except JobLimitError as e:
+        st.warning(f"⏳ {e}")
+        return False
+    # The message joins the transcript with its reply; until then it is shown from the job
+    st.session_state.active_job = job.id
+    return True
+
+def collect_chat_turn():
+    """Add a finished turn's reply to the chat; returns the turn still running, if any"""
+    executor = get_job_executor()
+    job = executor.get(st.session_state.active_job)
+    if job is None:
+        st.session_state.active_job = None
+        return None
+    if not job.finished:
+        return job
+    
+    if job.status == JOB_DONE:
+        response = job.result
+        # Check if response is empty or too short
+        if not response or len(response.strip()) < 10:
+            response = "I apologize, but I didn't receive a proper response. Please try asking your question again."
+        record_exchange(job.description, response)
+    elif job.status == JOB_FAILED:
+        record_exchange(job.description, f"Sorry, I encountered an error: {str(job.error)}. Please try again.",
+                        notice=True)
+    else:
+        record_exchange(job.description, "⏹️ Request cancelled. Ask again whenever you are ready.", notice=True)
+    executor.forget(job.id)
+    st.session_state.active_job = None
+    return None
+
+def display_job_progress(job):
+    """Show the running turn's latest progress, polling until it finishes"""
+    executor = get_job_executor()
+    if st.button("⏹️ Cancel request", key="cancel_job"):
+        executor.cancel(job.id)
+    status = st.empty()
+    # Any click interrupts this loop with a rerun; the turn itself keeps running on its worker
+    while not job.finished:
+        events = executor.events(job.session_id, job_id=job.id)
+        if events:
+            latest = events[-1]
+            label = JOB_EVENT_LABELS.get(latest.kind, JOB_EVENT_LABELS["running"])
+            status.info(label.format(detail=latest.detail.replace("_", " ")))
+        if job.cancel_requested.is_set():
+            status.info("⏹️ Cancelling...")
+        time.sleep(JOB_POLL_INTERVAL)
+    st.rerun()
+
 def display_chat_message(message, is_user=False):
     """Display a chat message with proper styling"""
-    if is_user:
-        st.markdown(f"""
-        <div class="chat-message user-message">
-            <strong>You:</strong><br>
-            {message}
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
-        <div class="chat-message assistant-message">
-            <strong>AI Travel Agent:</strong><br>
-            {message}
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(render_message_html("user" if is_user else "assistant", message), unsafe_allow_html=True)
 
-def create_itinerary_document(conversation_history, format_type="txt"):
-    """Create an itinerary document from conversation history"""
+def display_chat_history(messages):
+    """Render the recent tail of the chat; older pages only when the user asks for them"""
+    view = plan_chat_view(len(messages), st.session_state.history_pages_shown)
+    if view.hidden:
+        if st.button(f"⬆️ Show earlier messages ({view.hidden} hidden)", key="show_earlier_messages"):
+            st.session_state.history_pages_shown += 1
+            st.rerun()
+    for start, end in view.pages:
+        st.markdown(render_page_html(messages[start:end]), unsafe_allow_html=True)
+    for message in messages[view.tail_start:]:
+        display_chat_message(message["content"], is_user=message["role"] == "user")
+
+def create_itinerary_document(conversation_history, format_type="txt", itinerary=None):
+    """Create an itinerary document from the trip state recorded by the agent's tools.
+    
+    Without recorded state (no searches yet, or no itinerary passed) the
+    conversation transcript is exported instead.
+    """
+    from_state = itinerary is not None and not itinerary.is_empty()
     
-    # Extract travel planning information from conversation
     itinerary_content = "✈️ AI Travel Agent - Travel Itinerary\n"
     itinerary_content += "=" * 50 + "\n\n"
     itinerary_content += f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}\n\n"
     
-    # Add conversation summary
-    itinerary_content += "📋 CONVERSATION SUMMARY\n"
-    itinerary_content += "-" * 30 + "\n"
-    
-    for message in conversation_history:
-        if message["role"] == "user":
-            itinerary_content += f"👤 You: {message['content']}\n\n"
-        else:
-            itinerary_content += f"🤖 AI Travel Agent: {message['content']}\n\n"
+    if from_state:
+        itinerary_content += "📋 ITINERARY\n"
+        itinerary_content += "-" * 30 + "\n"
+        itinerary_content += format_itinerary(itinerary) + "\n"
+    else:
+        # Add conversation summary
+        itinerary_content += "📋 CONVERSATION SUMMARY\n"
+        itinerary_content += "-" * 30 + "\n"
+        
+        for message in conversation_history:
+            if message["role"] == "user":
+                itinerary_content += f"👤 You: {message['content']}\n\n"
+            else:
+                itinerary_content += f"🤖 AI Travel Agent: {message['content']}\n\n"
     
     itinerary_content += "\n" + "=" * 50 + "\n"
     itinerary_content += "Built with 🔥 passion by Devansh Swami\n"
@@ -284,16 +434,21 @@ def create_itinerary_document(conversation_history, format_type="txt"):
     if format_type == "txt":
         return itinerary_content
     elif format_type == "json":
-        return json.dumps({
+        document = {
             "title": "AI Travel Agent - Travel Itinerary",
             "generated_on": datetime.now().isoformat(),
-            "conversation": conversation_history,
             "author": "Devansh Swami",
             "version": "1.0"
-        }, indent=2)
+        }
+        if from_state:
+            document["itinerary"] = itinerary.to_dict()
+        else:
+            document["conversation"] = conversation_history
+        return json.dumps(document, indent=2)
     elif format_type == "docx":
         if not DOCX_AVAILABLE:
             raise ImportError("python-docx package not available")
+        from docx import Document
         
         # Create Word document
         doc = Document()
@@ -308,19 +463,25 @@ def create_itinerary_document(conversation_history, format_type="txt"):
         
         doc.add_paragraph()  # Spacing
         
-        # Conversation
-        doc.add_heading('📋 CONVERSATION SUMMARY', level=1)
-        
-        for message in conversation_history:
-            if message["role"] == "user":
-                p = doc.add_paragraph()
-                p.add_run("👤 You: ").bold = True
-                p.add_run(message['content'])
-            else:
-                p = doc.add_paragraph()
-                p.add_run("🤖 AI Travel Agent: ").bold = True
-                p.add_run(message['content'])
-            doc.add_paragraph()  # Spacing
+        if from_state:
+            for title, lines in itinerary_sections(itinerary):
+                doc.add_heading(title, level=1)
+                for line in lines:
+                    doc.add_paragraph(line, style='List Bullet')
+        else:
+            # Conversation
+            doc.add_heading('📋 CONVERSATION SUMMARY', level=1)
+            
+            for message in conversation_history:
+                if message["role"] == "user":
+                    p = doc.add_paragraph()
+                    p.add_run("👤 You: ").bold = True
+                    p.add_run(message['content'])
+                else:
+                    p = doc.add_paragraph()
+                    p.add_run("🤖 AI Travel Agent: ").bold = True
+                    p.add_run(message['content'])
+                doc.add_paragraph()  # Spacing
         
         # Footer
         doc.add_paragraph("=" * 50)
@@ -337,6 +498,56 @@ def create_itinerary_document(conversation_history, format_type="txt"):
     
     return itinerary_content
 
+# label, file extension, MIME type and help text per export format
+EXPORT_FORMATS = {
+    "txt": ("📄 TXT", "txt", "text/plain", "Download as simple text file"),
+    "json": ("📊 JSON", "json", "application/json", "Download as structured JSON data"),
+    "docx": ("📝 DOCX", "docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+             "Download as professional Word document"),
+}
+
+def export_download_button(fmt, conversation_history):
+    """Build an export only when asked for, reuse it until the conversation changes"""
+    label, extension, mime, help_text = EXPORT_FORMATS[fmt]
+    exports = st.session_state.export_cache
+    version = st.session_state.conversation_version
+    def builder():
+        # Builds may run on a worker thread; give them their own copy of the state
+        itinerary = Itinerary.from_dict(st.session_state.chat_session.itinerary.to_dict())
+        return partial(create_itinerary_document, list(conversation_history), fmt, itinerary)
+    
+    artifact = exports.get(fmt, version)
+    if artifact is None:
+        if fmt == "docx":
+            # python-docx is slow on long chats; build on a worker thread
+            if exports.pending(fmt, version):
+                st.caption("⏳ Building DOCX...")
+                st.button("🔄 Refresh", key=f"refresh_{fmt}", use_container_width=True)
+                return
+            error = exports.error(fmt, version)
+            if error is not None:
+                st.error(f"Error creating DOCX: {str(error)}")
+            if st.button(label, key=f"prepare_{fmt}", use_container_width=True, help=f"Prepare the {extension.upper()} export"):
+                artifact = exports.build_in_background(fmt, version, builder())
+                if artifact is None:
+                    st.rerun()
+            else:
+                return
+        elif st.button(label, key=f"prepare_{fmt}", use_container_width=True, help=f"Prepare the {extension.upper()} export"):
+            artifact = exports.build(fmt, version, builder())
+        else:
+            return
+    
+    st.download_button(
+        label=f"⬇️ {label}",
+        data=artifact,
+        file_name=f"travel_itinerary_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}",
+        mime=mime,
+        use_container_width=True,
+        help=help_text,
+        key=f"download_{fmt}"
+    )
+
 def download_itinerary_button(conversation_history):
     """Create download buttons for different formats"""
     
@@ -353,44 +564,14 @@ def download_itinerary_button(conversation_history):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # Download as TXT
-        txt_content = create_itinerary_document(conversation_history, "txt")
-        st.download_button(
-            label="📄 TXT",
-            data=txt_content,
-            file_name=f"travel_itinerary_{datetime.now().strftime('%Y%m%d_%H%M')}.txt",
-            mime="text/plain",
-            use_container_width=True,
-            help="Download as simple text file"
-        )
+        export_download_button("txt", conversation_history)
     
     with col2:
-        # Download as JSON
-        json_content = create_itinerary_document(conversation_history, "json")
-        st.download_button(
-            label="📊 JSON",
-            data=json_content,
-            file_name=f"travel_itinerary_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
-            mime="application/json",
-            use_container_width=True,
-            help="Download as structured JSON data"
-        )
+        export_download_button("json", conversation_history)
     
     with col3:
-        # Download as DOCX
         if DOCX_AVAILABLE:
-            try:
-                docx_content = create_itinerary_document(conversation_history, "docx")
-                st.download_button(
-                    label="📝 DOCX",
-                    data=docx_content,
-                    file_name=f"travel_itinerary_{datetime.now().strftime('%Y%m%d_%H%M')}.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    use_container_width=True,
-                    help="Download as professional Word document"
-                )
-            except Exception as e:
-                st.error(f"Error creating DOCX: {str(e)}")
+            export_download_button("docx", conversation_history)
         else:
             st.info("📝 Install python-docx for DOCX export")
             st.markdown("```bash\npip install python-docx\n```")
@@ -401,6 +582,7 @@ def download_itinerary_button(conversation_history):
 def main():
     # Initialize session state
     initialize_session_state()
+    running_job = collect_chat_turn()
     
     # Load API key from .env file
     from dotenv import load_dotenv
@@ -446,61 +628,43 @@ def main():
         if st.button("Plan a Trip to Paris"):
             if st.session_state.agent:
                 user_message = "I want to plan a 5-day trip to Paris next month. Can you help me with flights, hotels, and activities?"
-                st.session_state.messages.append({"role": "user", "content": user_message})
-                with st.spinner("AI Travel Agent is thinking..."):
-                    try:
-                        response = st.session_state.agent.chat(user_message, st.session_state.chat_history)
-                        st.session_state.messages.append({"role": "assistant", "content": response})
-                        st.session_state.chat_history.extend([
-                            HumanMessage(content=user_message),
-                            AIMessage(content=response)
-                        ])
-                    except Exception as e:
-                        error_msg = f"Sorry, I encountered an error: {str(e)}. Please try again."
-                        st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                st.rerun()
+                if submit_chat_turn(user_message):
+                    st.rerun()
             else:
                 st.error("Please configure your OpenAI API key first")
         if st.button("Find Flights to Tokyo"):
             if st.session_state.agent:
                 user_message = "I need to find flights from New York to Tokyo for next week. What are my options?"
-                st.session_state.messages.append({"role": "user", "content": user_message})
-                with st.spinner("AI Travel Agent is thinking..."):
-                    try:
-                        response = st.session_state.agent.chat(user_message, st.session_state.chat_history)
-                        st.session_state.messages.append({"role": "assistant", "content": response})
-                        st.session_state.chat_history.extend([
-                            HumanMessage(content=user_message),
-                            AIMessage(content=response)
-                        ])
-                    except Exception as e:
-                        error_msg = f"Sorry, I encountered an error: {str(e)}. Please try again."
-                        st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                st.rerun()
+                if submit_chat_turn(user_message):
+                    st.rerun()
             else:
                 st.error("Please configure your OpenAI API key first")
         if st.button("Get Weather for New York"):
             if st.session_state.agent:
                 user_message = "What's the weather like in New York this weekend?"
-                st.session_state.messages.append({"role": "user", "content": user_message})
-                with st.spinner("AI Travel Agent is thinking..."):
-                    try:
-                        response = st.session_state.agent.chat(user_message, st.session_state.chat_history)
-                        st.session_state.messages.append({"role": "assistant", "content": response})
-                        st.session_state.chat_history.extend([
-                            HumanMessage(content=user_message),
-                            AIMessage(content=response)
-                        ])
-                    except Exception as e:
-                        error_msg = f"Sorry, I encountered an error: {str(e)}. Please try again."
-                        st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                st.rerun()
+                if submit_chat_turn(user_message):
+                    st.rerun()
             else:
                 st.error("Please configure your OpenAI API key first")
         st.markdown("---")
+        # Token usage for this session
+        st.header("📊 Session Usage")
+        usage = st.session_state.chat_session.usage
+        st.caption(f"Tokens: {usage.total_tokens:,} | Cost: ${usage.cost:.4f}")
+        st.progress(min(usage.budget_fraction(), 1.0))
+        if usage.should_downgrade():
+            st.info("💡 Nearing this session's budget - using the faster model")
+        st.markdown("---")
         if st.button("🗑️ Clear Chat"):
-            st.session_state.messages = []
-            st.session_state.chat_history = []
+            if st.session_state.active_job:
+                get_job_executor().cancel(st.session_state.active_job)
+                st.session_state.active_job = None
+            # The log is append-only: clearing drops this conversation and starts a new one
+            get_session_store().delete(st.session_state.chat_session.session_id)
+            st.session_state.chat_session = load_chat_session(new=True)
+            st.session_state.history_pages_shown = 0
+            st.session_state.conversation_version += 1
+            st.session_state.export_cache.clear()
             st.rerun()
     
     # Main chat area
@@ -508,11 +672,11 @@ def main():
     
     with col2:
         # Display chat messages
-        for idx, message in enumerate(st.session_state.messages):
-            if message["role"] == "user":
-                display_chat_message(message["content"], is_user=True)
-            else:
-                display_chat_message(message["content"], is_user=False)
+        display_chat_history(st.session_state.chat_session.messages)
+        if running_job is not None:
+            display_chat_message(running_job.description, is_user=True)
+        # Filled in last: polling for a running turn must not hold up the rest of the page
+        progress_area = st.container()
 
 
         
@@ -534,40 +698,15 @@ def main():
                     submit_button = st.form_submit_button("🚀 Send Message", use_container_width=True)
                 
                 if submit_button and user_input.strip():
-                    # Add user message to chat
-                    st.session_state.messages.append({"role": "user", "content": user_input})
-                    
-                    # Get AI response
-                    with st.spinner("AI Travel Agent is thinking..."):
-                        try:
-                            response = st.session_state.agent.chat(
-                                user_input, 
-                                st.session_state.chat_history
-                            )
-                            
-                            # Debug: Check if response is empty or too short
-                            if not response or len(response.strip()) < 10:
-                                response = "I apologize, but I didn't receive a proper response. Please try asking your question again."
-                            
-                            # Add AI response to chat
-                            st.session_state.messages.append({"role": "assistant", "content": response})
-                            
-                            # Update chat history for LangChain
-                            st.session_state.chat_history.extend([
-                                HumanMessage(content=user_input),
-                                AIMessage(content=response)
-                            ])
-                            
-                        except Exception as e:
-                            error_msg = f"Sorry, I encountered an error: {str(e)}. Please try again."
-                            st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                    
-                    st.rerun()
+                    # The reply is produced by a background worker and collected on a later rerun
+                    if submit_chat_turn(user_input):
+                        st.rerun()
             
-            # Download section (only show if there are messages) - positioned below chat
-            if st.session_state.messages:
+            # Download section (only show if there are messages) - positioned below chat;
+            # hidden while a turn may still be writing to the itinerary
+            if st.session_state.chat_session.messages and running_job is None:
                 st.markdown("---")
-                download_itinerary_button(st.session_state.messages)
+                download_itinerary_button(st.session_state.chat_session.messages)
                 
         elif os.getenv("OPENAI_API_KEY") and os.getenv("OPENAI_API_KEY") != "your_openai_api_key_here":
             st.info("🔄 Initializing AI Travel Agent... Please wait.")
@@ -605,5 +744,9 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+    if running_job is not None:
+        with progress_area:
+            display_job_progress(running_job)
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
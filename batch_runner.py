@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Batch runner for offline travel queries
+Reads queries from a JSONL file, answers them with the shared TravelAgent on a
+bounded pool of workers and appends each result to a JSONL file as soon as it
+finishes. Items already answered in the output file are skipped, so an
+interrupted run picks up where it stopped. Reports per-item latency and the
+overall throughput.
+
+    python batch_runner.py queries.jsonl answers.jsonl --concurrency 8
+
+Each input line is {"id": "...", "query": "..."}; "message" is accepted for
+"query", and lines without an id are numbered ("line-7").
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set
+
+from usage_tracking import SessionUsage
+
+DEFAULT_CONCURRENCY = int(os.getenv("TRAVEL_AGENT_BATCH_CONCURRENCY", "4"))
+
+# Items submitted ahead of the workers, per worker; keeps memory flat for large inputs
+SUBMIT_AHEAD = 2
+
+# Progress is printed every this many finished items
+PROGRESS_EVERY = 25
+
+
+class BatchItem(NamedTuple):
+    id: str
+    query: str
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of unsorted values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(latencies, 50), 3),
+        "p95": round(percentile(latencies, 95), 3),
+        "p99": round(percentile(latencies, 99), 3),
+        "max": round(max(latencies, default=0.0), 3),
+    }
+
+
+def read_items(path: Path, invalid: Optional[List[str]] = None) -> Iterator[BatchItem]:
+    """Queries from a JSONL file; unusable lines are described in invalid and skipped"""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                query = record.get("query") or record.get("message")
+            except (ValueError, AttributeError):
+                record, query = None, None
+            if not isinstance(query, str) or not query.strip():
+                if invalid is not None:
+                    invalid.append(f"line {number}: expected an object with a non-empty 'query'")
+                continue
+            yield BatchItem(str(record.get("id") or f"line-{number}"), query.strip())
+
+
+def completed_ids(path: Path, retry_failed: bool = True) -> Set[str]:
+    """Ids already answered in an output file (failed ones too unless they are to be retried)"""
+    done: Set[str] = set()
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run
+                continue
+            if record.get("status") == "ok" or not retry_failed:
+                done.add(str(record.get("id")))
+    return done
+
+
+def run_item(agent, item: BatchItem) -> Dict[str, Any]:
+    """Answer one query as a fresh conversation and describe the outcome"""
+    usage = SessionUsage(session_id=f"batch-{item.id}")
+    start = time.perf_counter()
+    result: Dict[str, Any] = {"id": item.id, "query": item.query}
+    try:
+        result["response"] = agent.chat(item.query, [], usage, raise_errors=True)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency"] = round(time.perf_counter() - start, 3)
+    result["tokens"] = usage.total_tokens
+    result["cost"] = round(usage.cost, 6)
+    return result
+
+
+@dataclass
+class BatchStats:
+    """Totals of one batch run"""
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    invalid: List[str] = field(default_factory=list)
+    latencies: List[float] = field(default_factory=list)
+    tokens: int = 0
+    cost: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + self.failed
+
+    def record(self, result: Dict[str, Any]):
+        if result["status"] == "ok":
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.latencies.append(result["latency"])
+        self.tokens += result["tokens"]
+        self.cost += result["cost"]
+        self.elapsed = time.perf_counter() - self.started
+
+    def throughput(self) -> float:
+        """Finished items per second of wall time"""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "invalid": len(self.invalid),
+            "seconds": round(self.elapsed, 2),
+            "items_per_second": round(self.throughput(), 3),
+            "latency": latency_summary(self.latencies),
+            "tokens": self.tokens,
+            "cost": round(self.cost, 4),
+        }
+
+
+def run_batch(agent, input_path: Path, output_path: Path, concurrency: int = DEFAULT_CONCURRENCY,
+              resume: bool = True, retry_failed: bool = True, limit: Optional[int] = None,
+              progress=None) -> BatchStats:
+    """Answer every query of input_path not yet in output_path, appending results as they finish.
+
+    progress(stats) is called after each finished item.
+    """
+    stats = BatchStats()
+    done = completed_ids(output_path, retry_failed) if resume else set()
+    needs_newline = False
+    if resume and output_path.exists() and output_path.stat().st_size:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+
+    pending: Set[Future] = set()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool, \
+            open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+        if needs_newline:
+            # Start on a fresh line after a record cut off by an interrupted run
+            out.write("\n")
+
+        def drain():
+            nonlocal pending
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                stats.record(result)
+                if progress is not None:
+                    progress(stats)
+
+        try:
+            submitted = 0
+            for item in read_items(input_path, stats.invalid):
+                if item.id in done:
+                    stats.skipped += 1
+                    continue
+                if limit is not None and submitted >= limit:
+                    break
+                # Duplicate ids in one input are answered once
+                done.add(item.id)
+                pending.add(pool.submit(run_item, agent, item))
+                submitted += 1
+                if len(pending) >= concurrency * SUBMIT_AHEAD:
+                    drain()
+            while pending:
+                drain()
+        except KeyboardInterrupt:
+            # Keep what already finished; the rest is picked up by the next (resumed) run
+            for future in pending:
+                future.cancel()
+            pending = {future for future in pending if not future.cancelled()}
+            while pending:
+                drain()
+            raise
+        finally:
+            stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+
+def print_progress(stats: BatchStats):
+    if stats.processed % PROGRESS_EVERY == 0:
+        print(f"⏳ {stats.processed} done ({stats.failed} failed), {stats.throughput():.2f} items/s",
+              file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of travel queries with the AI Travel Agent")
+    parser.add_argument("input", type=Path, help="JSONL file with one {\"id\", \"query\"} object per line")
+    parser.add_argument("output", type=Path, help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="queries answered at once")
+    parser.add_argument("--limit", type=int, help="answer at most this many new queries")
+    parser.add_argument("--restart", action="store_true", help="overwrite the output instead of resuming")
+    parser.add_argument("--skip-failed", action="store_true", help="do not retry items that failed in earlier runs")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from travel_agent import get_shared_agent
+    load_dotenv()
+    # One agent for the whole batch, so LLM clients and API caches are shared by every worker
+    agent = get_shared_agent()
+
+    try:
+        stats = run_batch(agent, args.input, args.output, args.concurrency, resume=not args.restart,
+                          retry_failed=not args.skip_failed, limit=args.limit, progress=print_progress)
+    except KeyboardInterrupt:
+        print("⏹️ Interrupted; run the same command again to resume", file=sys.stderr)
+        sys.exit(130)
+
+    summary = stats.as_dict()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print("📦 Batch complete")
+    print("=" * 50)
+    print(f"Answered: {stats.succeeded}  Failed: {stats.failed}  Skipped (already done): {stats.skipped}")
+    for problem in stats.invalid:
+        print(f"⚠️  Ignored {problem}")
+    print(f"Wall time: {summary['seconds']}s  Throughput: {summary['items_per_second']} items/s")
+    latency = summary["latency"]
+    print(f"Latency p50 {latency['p50']}s  p95 {latency['p95']}s  p99 {latency['p99']}s  max {latency['max']}s")
+    print(f"Tokens: {stats.tokens}  Estimated cost: ${summary['cost']}")
+
+
+if __name__ == "__main__":
+    main()
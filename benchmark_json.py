@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+JSON decoding benchmark for provider payloads
+Compares decode time and peak memory of every available decoder, with and
+without field projection, on recorded Amadeus responses (or synthetic ones of
+the same shape when none are given).
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+import json_codec
+from flight_search import FLIGHT_OFFER_FIELDS
+from hotel_pricing import HOTEL_LIST_FIELDS, HOTEL_OFFER_FIELDS
+
+
+def synthetic_flight_offers(count: int = 250) -> dict:
+    """Flight-offers response shaped like /v2/shopping/flight-offers"""
+    rng = random.Random(42)
+
+    def segment(origin, destination, day):
+        return {
+            "departure": {"iataCode": origin, "terminal": "4", "at": f"2025-03-{day:02d}T{rng.randint(6, 22):02d}:15:00"},
+            "arrival": {"iataCode": destination, "terminal": "5", "at": f"2025-03-{day:02d}T{rng.randint(6, 22):02d}:40:00"},
+            "carrierCode": rng.choice(["BA", "AA", "VS", "DL"]),
+            "number": str(rng.randint(100, 999)),
+            "aircraft": {"code": "77W"},
+            "operating": {"carrierCode": "BA"},
+            "duration": "PT7H25M",
+            "id": str(rng.randint(1, 10 ** 6)),
+            "numberOfStops": 0,
+            "blacklistedInEU": False,
+        }
+
+    def fare_details(segment_id):
+        return {
+            "segmentId": segment_id,
+            "cabin": "ECONOMY",
+            "fareBasis": "OLN8Z7B1",
+            "brandedFare": "BASIC",
+            "class": "O",
+            "includedCheckedBags": {"quantity": 0},
+            "amenities": [{"description": f"AMENITY {i}", "isChargeable": True, "amenityType": "BAGGAGE"} for i in range(4)],
+        }
+
+    offers = []
+    for i in range(count):
+        itineraries = [
+            {"duration": "PT9H40M", "segments": [segment("JFK", "LHR", 15), segment("LHR", "CDG", 16)]},
+            {"duration": "PT8H10M", "segments": [segment("CDG", "JFK", 20)]},
+        ]
+        total = f"{rng.uniform(350, 1800):.2f}"
+        offers.append({
+            "type": "flight-offer",
+            "id": str(i + 1),
+            "source": "GDS",
+            "instantTicketingRequired": False,
+            "lastTicketingDate": "2025-03-10",
+            "numberOfBookableSeats": 9,
+            "itineraries": itineraries,
+            "price": {"currency": "USD", "total": total, "base": total, "grandTotal": total,
+                      "fees": [{"amount": "0.00", "type": "SUPPLIER"}, {"amount": "0.00", "type": "TICKETING"}]},
+            "pricingOptions": {"fareType": ["PUBLISHED"], "includedCheckedBagsOnly": False},
+            "validatingAirlineCodes": ["BA"],
+            "travelerPricings": [{
+                "travelerId": "1",
+                "fareOption": "STANDARD",
+                "travelerType": "ADULT",
+                "price": {"currency": "USD", "total": total, "base": total},
+                "fareDetailsBySegment": [fare_details(str(n)) for n in range(3)],
+            }],
+        })
+    return {"meta": {"count": count}, "data": offers, "dictionaries": {"carriers": {"BA": "BRITISH AIRWAYS"}}}
+
+
+def synthetic_hotel_list(count: int = 500) -> dict:
+    """Hotel list response shaped like /v1/reference-data/locations/hotels/by-city"""
+    rng = random.Random(7)
+    return {"data": [{
+        "chainCode": rng.choice(["HI", "MA", "AC", "ZZ"]),
+        "iataCode": "PAR",
+        "dupeId": rng.randint(10 ** 8, 10 ** 9),
+        "name": f"HOTEL {i}",
+        "hotelId": f"HIPAR{i:03d}",
+        "geoCode": {"latitude": 48.85 + rng.uniform(-0.05, 0.05), "longitude": 2.35 + rng.uniform(-0.05, 0.05)},
+        "address": {"countryCode": "FR", "postalCode": "75001", "cityName": "PARIS", "lines": ["1 RUE DE RIVOLI"]},
+        "distance": {"value": round(rng.uniform(0.1, 5), 2), "unit": "KM"},
+        "lastUpdate": "2025-01-01T00:00:00",
+    } for i in range(count)]}
+
+
+def synthetic_hotel_offers(count: int = 20) -> dict:
+    """Multi-hotel offers response shaped like /v3/shopping/hotel-offers"""
+    rng = random.Random(11)
+    return {"data": [{
+        "type": "hotel-offers",
+        "hotel": {"type": "hotel", "hotelId": f"HIPAR{i:03d}", "chainCode": "HI", "name": f"HOTEL {i}",
+                  "cityCode": "PAR", "latitude": 48.85, "longitude": 2.35},
+        "available": True,
+        "offers": [{
+            "id": f"OFFER{i}{n}",
+            "checkInDate": "2025-03-15",
+            "checkOutDate": "2025-03-19",
+            "rateCode": "RAC",
+            "room": {"type": "A1K", "typeEstimated": {"category": "DOUBLE_ROOM", "beds": 1, "bedType": "DOUBLE"},
+                     "description": {"text": "Non-refundable rate. " * 20, "lang": "EN"}},
+            "guests": {"adults": 2},
+            "price": {"currency": "EUR", "base": f"{rng.uniform(400, 1200):.2f}", "total": f"{rng.uniform(450, 1300):.2f}",
+                      "variations": {"average": {"base": "150.00"}, "changes": [
+                          {"startDate": "2025-03-15", "endDate": "2025-03-16", "total": "150.00"}] * 4}},
+            "policies": {"cancellations": [{"description": {"text": "NON-REFUNDABLE RATE"}, "type": "FULL_STAY"}],
+                         "paymentType": "deposit"},
+        } for n in range(5)],
+    } for i in range(count)]}
+
+
+def load_payloads(paths):
+    """Recorded responses by file name, with the fields used for each endpoint"""
+    if not paths:
+        return [
+            ("flight-offers (synthetic)", json.dumps(synthetic_flight_offers()).encode(), FLIGHT_OFFER_FIELDS),
+            ("hotel list (synthetic)", json.dumps(synthetic_hotel_list()).encode(), HOTEL_LIST_FIELDS),
+            ("hotel offers (synthetic)", json.dumps(synthetic_hotel_offers()).encode(), HOTEL_OFFER_FIELDS),
+        ]
+    payloads = []
+    for path in paths:
+        body = Path(path).read_bytes()
+        sample = json.loads(body).get("data") or [{}]
+        first = sample[0] if isinstance(sample, list) else sample
+        if "itineraries" in first:
+            fields = FLIGHT_OFFER_FIELDS
+        elif "offers" in first:
+            fields = HOTEL_OFFER_FIELDS
+        else:
+            fields = HOTEL_LIST_FIELDS
+        payloads.append((Path(path).name, body, fields))
+    return payloads
+
+
+def measure(fn, repeat):
+    """Best wall time over repeat runs, then peak traced memory of one extra run"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure JSON decoding cost of provider payloads")
+    parser.add_argument("payloads", nargs="*", help="recorded Amadeus response bodies (JSON files)")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement (best is reported)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = {}
+    for name, body, fields in load_payloads(args.payloads):
+        rows = {}
+        for decoder in json_codec.DECODERS:
+            json_codec.set_decoder(decoder)
+            rows[f"{decoder} full"] = measure(lambda: json_codec.loads(body), args.repeat)
+            rows[f"{decoder} projected"] = measure(
+                lambda: json_codec.loads_projected(body, fields, stream=False), args.repeat)
+        if json_codec.IJSON_AVAILABLE:
+            rows["ijson streamed"] = measure(lambda: json_codec.loads_projected(body, fields, stream=True), args.repeat)
+        results[name] = {"bytes": len(body), "results": rows}
+
+    if args.json:
+        print(json.dumps({"ijson": json_codec.IJSON_AVAILABLE, "payloads": results}, indent=2))
+        return
+
+    print("⏱️  JSON Decoding Benchmark")
+    if not json_codec.IJSON_AVAILABLE:
+        print("ijson not installed: streamed projection not measured")
+    print("=" * 60)
+    for name, payload in results.items():
+        print(f"\n📦 {name} ({payload['bytes'] / 1024:.0f} KB)")
+        print(f"{'Decoder':<24}{'Time (ms)':>12}{'Peak (KB)':>14}")
+        print("-" * 50)
+        for label, result in payload["results"].items():
+            print(f"{label:<24}{result['seconds'] * 1000:>12.2f}{result['peak_bytes'] / 1024:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
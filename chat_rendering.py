@@ -0,0 +1,67 @@
+"""
+Chat transcript rendering for the Streamlit app
+Each message's HTML is built once and memoized. A rerun emits only the recent
+tail of the conversation message by message; older history is split into
+fixed pages that are joined into one cached block each and only rendered when
+the user asks for them, so rerun cost stays flat as conversations grow.
+"""
+
+import os
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+# Messages per history page; the live tail holds between one and two pages
+CHAT_PAGE_SIZE = int(os.getenv("TRAVEL_AGENT_CHAT_PAGE_SIZE", "20"))
+
+# CSS class and speaker label per message role
+ROLE_STYLES = {
+    "user": ("user-message", "You"),
+    "assistant": ("assistant-message", "AI Travel Agent"),
+}
+
+MessageKey = Tuple[str, str]
+
+
+@lru_cache(maxsize=4096)
+def render_message_html(role: str, content: str) -> str:
+    """Styled HTML block for one message"""
+    css_class, label = ROLE_STYLES.get(role, ROLE_STYLES["assistant"])
+    return f"""
+        <div class="chat-message {css_class}">
+            <strong>{label}:</strong><br>
+            {content}
+        </div>
+        """
+
+
+@lru_cache(maxsize=256)
+def _render_page_html(page: Tuple[MessageKey, ...]) -> str:
+    return "".join(render_message_html(role, content) for role, content in page)
+
+
+def render_page_html(messages: Sequence[Dict[str, str]]) -> str:
+    """One HTML block for a page of older messages (cached per page content)"""
+    return _render_page_html(tuple((message["role"], message["content"]) for message in messages))
+
+
+class ChatView(NamedTuple):
+    # Messages before the first rendered page
+    hidden: int
+    # (start, end) of the older pages rendered as blocks, oldest first
+    pages: List[Tuple[int, int]]
+    # Index of the first message rendered on its own
+    tail_start: int
+
+
+def plan_chat_view(total: int, pages_shown: int = 0, page_size: int = CHAT_PAGE_SIZE) -> ChatView:
+    """Which messages a rerun renders, and how.
+
+    Pages are aligned to the start of the conversation so that a page's
+    content, and therefore its cached HTML, never changes once the tail has
+    moved past it.
+    """
+    page_size = max(page_size, 1)
+    tail_start = max(0, (total - page_size) // page_size * page_size)
+    first_page = max(0, tail_start - pages_shown * page_size)
+    pages = [(start, start + page_size) for start in range(first_page, tail_start, page_size)]
+    return ChatView(hidden=first_page, pages=pages, tail_start=tail_start)
@@ -0,0 +1,106 @@
+"""
+Normalized city index shared by the hotel and recommendation tools
+Maps free-form city text ("NYC", "downtown Tokyo", "Barcelonna") to one
+canonical city key using alias tables and trigram fuzzy matching.
+"""
+
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from text_index import TrigramIndex, edit_distance, max_typo_edits, normalize
+from travel_data import CURATED_HOTEL_CITIES, DATA_DIR
+
+
+# Aliases this short ("la", "dc") are too ambiguous to find inside longer text
+MIN_WINDOW_ALIAS_CHARS = 3
+
+
+class CityIndex:
+    """Alias table plus trigram index over canonical city keys"""
+
+    def __init__(self, min_fuzzy_score: float = 0.8):
+        self.min_fuzzy_score = min_fuzzy_score
+        self._aliases: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+        self._trigrams = TrigramIndex()
+        self._max_alias_words = 1
+
+    def add_city(self, name: str, aliases: Iterable[str] = ()):
+        key = normalize(name)
+        self._names.setdefault(key, name)
+        for alias in (name, *aliases):
+            alias_key = normalize(alias)
+            # The first city to claim an alias keeps it
+            if alias_key and alias_key not in self._aliases:
+                self._aliases[alias_key] = key
+                self._trigrams.add(alias_key, key)
+                self._max_alias_words = max(self._max_alias_words, len(alias_key.split()))
+
+    def lookup(self, city: str, fuzzy: bool = True) -> Optional[str]:
+        """Canonical key for a city mention, or None if nothing is close enough.
+
+        Only exact names and aliases match unless fuzzy is set, which also
+        accepts a misspelling ("Barcelonna") of a known name of similar length.
+        """
+        text = normalize(city)
+        if not text:
+            return None
+        if text in self._aliases:
+            return self._aliases[text]
+
+        # Known names inside longer text ("Paris, France", "downtown Tokyo"); the
+        # longest alias wins so "la" does not beat "barcelona" in "La Rambla Barcelona"
+        words = text.split()
+        best = None
+        for size in range(min(self._max_alias_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                window = " ".join(words[start:start + size])
+                if (len(window) >= MIN_WINDOW_ALIAS_CHARS and window in self._aliases
+                        and (best is None or len(window) > len(best))):
+                    best = window
+        if best:
+            return self._aliases[best]
+
+        if not fuzzy:
+            return None
+        for alias, key, _ in self._trigrams.search_keys(text, limit=1, min_score=self.min_fuzzy_score):
+            if edit_distance(text, alias) <= max_typo_edits(text):
+                return key
+        return None
+
+    def display_name(self, key: str) -> str:
+        return self._names.get(key, key.title())
+
+    def __contains__(self, city: str) -> bool:
+        return self.lookup(city) is not None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+@lru_cache(maxsize=None)
+def get_city_index() -> CityIndex:
+    """City index over every curated city plus the airport dataset's cities and aliases"""
+    index = CityIndex()
+    for city in CURATED_HOTEL_CITIES.values():
+        index.add_city(city["display_name"], city["match"])
+    from recommendations_catalog import get_catalog
+
+    for city in get_catalog().city_names.values():
+        index.add_city(city)
+
+    with open(DATA_DIR / "airports.json", encoding="utf-8") as f:
+        airport_data = json.load(f)
+    aliases_by_city: Dict[str, list] = {}
+    for alias, city in airport_data["city_aliases"].items():
+        aliases_by_city.setdefault(city, []).append(alias)
+    for row in airport_data["airports"]:
+        city = row[2]
+        index.add_city(city, aliases_by_city.get(city, ()))
+    return index
+
+
+def lookup_city(city: str, fuzzy: bool = True) -> Optional[str]:
+    """Canonical city key for free-form city text"""
+    return get_city_index().lookup(city, fuzzy)
@@ -0,0 +1,158 @@
+"""
+Currency conversion for displayed prices
+Searches always run in one upstream currency and their results are converted
+for display with a cached exchange-rate table (ECB reference rates from the
+Frankfurter API, stored on disk like the other reference data). Switching the
+display currency therefore reuses cached searches instead of repeating them.
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, TypeVar
+
+from disk_cache import CACHE_DIR, DiskCache
+
+EXCHANGE_RATES_URL = os.getenv("TRAVEL_AGENT_EXCHANGE_RATES_URL", "https://api.frankfurter.dev/v1/latest")
+
+# Currency of every upstream flight search; prices are converted from it for display
+SEARCH_CURRENCY = os.getenv("TRAVEL_AGENT_SEARCH_CURRENCY", "USD").upper()
+
+# Reference rates are published once per working day
+EXCHANGE_RATE_TTL = float(os.getenv("TRAVEL_AGENT_EXCHANGE_RATE_TTL", str(12 * 3600)))
+
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "INR": "₹"}
+
+K = TypeVar("K")
+
+
+def normalize_currency(currency: Optional[str], default: str = SEARCH_CURRENCY) -> str:
+    """ISO 4217 code from user input ('usd', '$', '€'), or default when unrecognized"""
+    text = (currency or "").strip().upper()
+    for code, symbol in CURRENCY_SYMBOLS.items():
+        if text == symbol:
+            return code
+    return text if len(text) == 3 and text.isalpha() else default
+
+
+def format_money(amount: float, currency: str) -> str:
+    """'$1,234.50' for currencies with a symbol, '1,234.50 CHF' otherwise"""
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    return f"{symbol}{amount:,.2f}" if symbol else f"{amount:,.2f} {currency}"
+
+
+class RateTable(NamedTuple):
+    base: str
+    date: str
+    # Units of each currency per one unit of base
+    rates: Dict[str, float]
+
+    def rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """Multiplier from one currency to another (cross rate through the base), None if unknown"""
+        if from_currency == to_currency:
+            return 1.0
+        source = self.rates.get(from_currency)
+        target = self.rates.get(to_currency)
+        if not source or not target:
+            return None
+        return target / source
+
+
+def fetch_rates(base: str) -> Optional[Dict[str, Any]]:
+    """Latest reference rates for a base currency; None when the base is not quoted"""
+    import requests
+
+    response = requests.get(EXCHANGE_RATES_URL, params={"base": base}, timeout=10)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    data = response.json()
+    rates = {code.upper(): float(rate) for code, rate in data.get("rates", {}).items()}
+    rates[base] = 1.0
+    return {"base": base, "date": data.get("date", ""), "rates": rates}
+
+
+@lru_cache(maxsize=None)
+def get_rate_cache() -> DiskCache:
+    return DiskCache(CACHE_DIR / "exchange_rates.sqlite3", fetch_rates, ttl=EXCHANGE_RATE_TTL)
+
+
+def get_rate_table(base: str = SEARCH_CURRENCY) -> Optional[RateTable]:
+    """Rate table for base from the disk cache, or None when no rates can be had"""
+    try:
+        data = get_rate_cache().get(base)
+    except Exception:
+        return None
+    return RateTable(data["base"], data["date"], data["rates"]) if data else None
+
+
+class CurrencyConverter:
+    """Converts prices into one display currency.
+
+    The rate table is loaded once, on the first conversion between different
+    currencies, and every rate it yields is memoized, so converting a whole
+    result set costs one lookup per source currency. Prices that cannot be
+    converted stay in their own currency.
+    """
+
+    def __init__(self, currency: str, table: Optional[RateTable] = None):
+        self.currency = normalize_currency(currency)
+        self._table = table
+        self._rates: Dict[str, Optional[float]] = {self.currency: 1.0}
+
+    @property
+    def table(self) -> Optional[RateTable]:
+        if self._table is None:
+            self._table = get_rate_table()
+        return self._table
+
+    def rate(self, from_currency: str) -> Optional[float]:
+        if from_currency not in self._rates:
+            table = self.table
+            self._rates[from_currency] = table.rate(from_currency, self.currency) if table else None
+        return self._rates[from_currency]
+
+    def display_currency(self, from_currency: str) -> str:
+        """Currency prices from from_currency are shown in"""
+        return self.currency if self.rate(from_currency) is not None else from_currency
+
+    def convert(self, amount: float, from_currency: str) -> Tuple[float, str]:
+        rate = self.rate(from_currency)
+        if rate is None:
+            return amount, from_currency
+        return round(amount * rate, 2), self.currency
+
+    def convert_or_none(self, amount: float, from_currency: str) -> Optional[float]:
+        """Amount in the display currency, None when there is no rate for from_currency"""
+        rate = self.rate(from_currency)
+        return None if rate is None else round(amount * rate, 2)
+
+    def convert_map(self, prices: Dict[K, Optional[float]], from_currency: str) -> Dict[K, Optional[float]]:
+        """Same mapping with every price converted (None values are kept)"""
+        rate = self.rate(from_currency)
+        if rate is None:
+            return dict(prices)
+        return {key: None if price is None else round(price * rate, 2) for key, price in prices.items()}
+
+    def convert_offers(self, offers: Iterable[Dict[str, Any]],
+                       default_currency: str = SEARCH_CURRENCY) -> List[Dict[str, Any]]:
+        """Copies of flight offers with price.total and price.currency in the display currency"""
+        converted = []
+        for offer in offers:
+            price = offer.get("price", {})
+            source = price.get("currency") or default_currency
+            rate = self.rate(source)
+            try:
+                total = float(price["total"])
+            except (KeyError, TypeError, ValueError):
+                rate = None
+            if rate is None:
+                converted.append({**offer, "price": {**price, "currency": source}})
+            else:
+                converted.append({**offer, "price": {**price, "total": f"{total * rate:.2f}", "currency": self.currency}})
+        return converted
+
+    def note(self, from_currency: str) -> str:
+        """Footnote naming the rates used, empty when nothing was converted"""
+        if from_currency == self.currency or self.rate(from_currency) is None:
+            return ""
+        return f"Prices converted from {from_currency} at reference rates of {self.table.date}."
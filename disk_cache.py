@@ -0,0 +1,162 @@
+"""
+SQLite-backed TTL cache for slow third-party lookups
+Values are stored as JSON next to their fetch time and hit count. Popular
+entries are refreshed in the background before they expire, so callers keep
+getting an answer from disk instead of waiting on the remote endpoint.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional
+
+CACHE_DIR = Path(os.getenv("TRAVEL_AGENT_CACHE_DIR", Path(__file__).resolve().parent / ".cache"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+class DiskCache:
+    """Key -> JSON value cache with stale-while-revalidate for popular keys.
+
+    loader(key) produces the value for a key; it may return None for "nothing
+    found", which is cached for the shorter negative_ttl. Loader exceptions
+    are never cached. An entry is refreshed in the background once it is older
+    than refresh_after and has been read at least popular_hits times; such
+    entries are still served after ttl while the refresh runs, up to max_stale.
+    """
+
+    def __init__(self, path: Path, loader: Callable[[str], Any], ttl: float,
+                 negative_ttl: float = 86400, refresh_after: Optional[float] = None,
+                 popular_hits: int = 3, max_stale: Optional[float] = None):
+        self.path = Path(path)
+        self.loader = loader
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_after = refresh_after if refresh_after is not None else ttl * 0.8
+        self.popular_hits = popular_hits
+        self.max_stale = max_stale if max_stale is not None else ttl * 2
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        self._refresher: Optional[threading.Thread] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation keeps the cache safe to share across threads
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _store(self, key: str, value: Any, hits: int = 0):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO cache (key, value, fetched_at, hits) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at",
+                (key, json.dumps(value), time.time(), hits),
+            )
+
+    def _load(self, key: str, hits: int = 0) -> Any:
+        value = self.loader(key)
+        self._store(key, value, hits)
+        return value
+
+    def _refresh(self, key: str):
+        try:
+            self._load(key)
+        except Exception:
+            # Keep serving the cached value; the next read will try again
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: str):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, key)
+
+    def get(self, key: str) -> Any:
+        """Cached value for key, loading it synchronously on a miss or expired entry"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, fetched_at, hits FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE cache SET hits = hits + 1 WHERE key = ?", (key,))
+        if row is None:
+            return self._load(key, hits=1)
+
+        value = json.loads(row[0])
+        age = time.time() - row[1]
+        popular = row[2] + 1 >= self.popular_hits
+        ttl = self.ttl if value is not None else self.negative_ttl
+
+        if age < ttl:
+            if popular and age >= self.refresh_after:
+                self._schedule_refresh(key)
+            return value
+        if popular and age < self.max_stale:
+            self._schedule_refresh(key)
+            return value
+        try:
+            return self._load(key)
+        except Exception:
+            # The endpoint is down; an old answer beats none
+            return value
+
+    def popular_keys(self, limit: int = 20) -> List[str]:
+        """Most-read keys that are due for a refresh"""
+        cutoff = time.time() - self.refresh_after
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key FROM cache WHERE hits >= ? AND fetched_at <= ? ORDER BY hits DESC LIMIT ?",
+                (self.popular_hits, cutoff, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def refresh_popular(self, limit: int = 20) -> int:
+        """Queue background refreshes for popular keys that are due; returns how many were queued"""
+        keys = self.popular_keys(limit)
+        for key in keys:
+            self._schedule_refresh(key)
+        return len(keys)
+
+    def start_background_refresh(self, interval: float = 3600):
+        """Periodically refresh popular keys from a daemon thread (idempotent)"""
+        with self._lock:
+            if self._refresher is not None:
+                return
+
+            def run():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        self.refresh_popular()
+                    except sqlite3.Error:
+                        pass
+
+            self._refresher = threading.Thread(target=run, name="cache-refresher", daemon=True)
+            self._refresher.start()
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
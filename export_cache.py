@@ -0,0 +1,86 @@
+"""
+Itinerary export artifacts cached per conversation version
+An artifact is built only when the user asks for that format and is reused
+until the conversation changes (its version counter moves on). Slow formats
+can be built on a worker thread; the UI picks the result up on a later rerun.
+"""
+
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ExportCache:
+    """Latest artifact per export format, tagged with the conversation version it was built from"""
+
+    def __init__(self, executor: Optional[Executor] = None):
+        self.executor = executor
+        self._artifacts: Dict[str, Tuple[int, Any]] = {}
+        self._pending: Dict[str, Tuple[int, Future]] = {}
+        self._errors: Dict[str, Tuple[int, BaseException]] = {}
+        self._lock = threading.Lock()
+
+    def _collect(self, fmt: str):
+        """Move a finished background build into the artifacts (or errors)"""
+        with self._lock:
+            pending = self._pending.get(fmt)
+            if pending is None or not pending[1].done():
+                return
+            del self._pending[fmt]
+            version, future = pending
+            error = future.exception()
+            if error is not None:
+                self._errors[fmt] = (version, error)
+            else:
+                self._artifacts[fmt] = (version, future.result())
+
+    def get(self, fmt: str, version: int) -> Optional[Any]:
+        """Artifact for this exact version, or None if it has not been built"""
+        self._collect(fmt)
+        entry = self._artifacts.get(fmt)
+        return entry[1] if entry and entry[0] == version else None
+
+    def build(self, fmt: str, version: int, builder: Callable[[], Any]) -> Any:
+        """Artifact for this version, building it now on a miss"""
+        artifact = self.get(fmt, version)
+        if artifact is None:
+            artifact = builder()
+            with self._lock:
+                self._artifacts[fmt] = (version, artifact)
+        return artifact
+
+    def build_in_background(self, fmt: str, version: int, builder: Callable[[], Any]) -> Optional[Any]:
+        """Artifact for this version if ready; otherwise start building it and return None.
+
+        builder runs on the executor, so it must not touch UI state and should
+        work on a snapshot of the conversation.
+        """
+        if self.executor is None:
+            return self.build(fmt, version, builder)
+        artifact = self.get(fmt, version)
+        if artifact is not None:
+            return artifact
+        with self._lock:
+            pending = self._pending.get(fmt)
+            if pending is None or pending[0] != version:
+                # A build for an older version finishes unobserved and is discarded
+                self._pending[fmt] = (version, self.executor.submit(builder))
+                self._errors.pop(fmt, None)
+        return None
+
+    def pending(self, fmt: str, version: int) -> bool:
+        self._collect(fmt)
+        pending = self._pending.get(fmt)
+        return pending is not None and pending[0] == version
+
+    def error(self, fmt: str, version: int) -> Optional[BaseException]:
+        """Why the last build for this version failed, if it did"""
+        self._collect(fmt)
+        entry = self._errors.get(fmt)
+        return entry[1] if entry and entry[0] == version else None
+
+    def clear(self):
+        with self._lock:
+            self._artifacts.clear()
+            self._pending.clear()
+            self._errors.clear()
@@ -0,0 +1,118 @@
+"""
+Ranking of large flight-offer result sets
+Offers are consumed one at a time (e.g. straight from a streaming parser) and
+only a bounded top-k heap plus the price/duration Pareto frontier are kept, so
+memory stays flat however many offers the API returns.
+"""
+
+import heapq
+import itertools
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+# Amadeus accepts up to 250 offers per search
+LARGE_RESULT_MAX = 250
+
+SORT_KEYS = ("price", "duration", "stops")
+
+_ISO_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+
+
+def duration_minutes(iso_duration: str) -> int:
+    """'PT7H30M' -> 450, 'P1DT2H' -> 1560"""
+    match = _ISO_DURATION.fullmatch(iso_duration or "")
+    if not match:
+        return 0
+    days, hours, minutes = (int(value or 0) for value in match.groups())
+    return days * 1440 + hours * 60 + minutes
+
+
+class OfferMetrics(NamedTuple):
+    price: float
+    duration: int  # total minutes across all itineraries
+    stops: int  # total connections across all itineraries
+
+
+def offer_metrics(offer: Dict[str, Any]) -> OfferMetrics:
+    itineraries = offer.get("itineraries", [])
+    return OfferMetrics(
+        price=float(offer["price"]["total"]),
+        duration=sum(duration_minutes(itinerary.get("duration", "")) for itinerary in itineraries),
+        stops=sum(max(len(itinerary.get("segments", [])) - 1, 0) for itinerary in itineraries),
+    )
+
+
+def sort_key(metrics: OfferMetrics, sort_by: str) -> Tuple[float, ...]:
+    """Primary criterion first, the others as tie-breakers"""
+    if sort_by == "duration":
+        return (metrics.duration, metrics.price, metrics.stops)
+    if sort_by == "stops":
+        return (metrics.stops, metrics.price, metrics.duration)
+    return (metrics.price, metrics.duration, metrics.stops)
+
+
+class TopK:
+    """The k items with the smallest keys seen so far, kept in a bounded max-heap"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[Tuple[float, ...], int, Any]] = []
+        self._counter = itertools.count()
+
+    def push(self, key: Tuple[float, ...], item: Any):
+        # Keys are negated so the heap root is the worst item kept; the counter keeps
+        # insertion order among equal keys and avoids comparing the items themselves
+        entry = (tuple(-value for value in key), -next(self._counter), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Any]:
+        """Kept items, best first"""
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
+
+
+class ParetoFrontier:
+    """Offers not beaten on both price and duration by any other offer seen so far"""
+
+    def __init__(self):
+        self._points: List[Tuple[OfferMetrics, Any]] = []
+
+    def add(self, metrics: OfferMetrics, item: Any):
+        for kept, _ in self._points:
+            if kept.price <= metrics.price and kept.duration <= metrics.duration:
+                return
+        self._points = [
+            (kept, kept_item) for kept, kept_item in self._points
+            if not (metrics.price <= kept.price and metrics.duration <= kept.duration)
+        ]
+        self._points.append((metrics, item))
+
+    def items(self) -> List[Tuple[OfferMetrics, Any]]:
+        """Frontier from cheapest (slowest) to fastest (most expensive)"""
+        return sorted(self._points, key=lambda point: (point[0].price, point[0].duration))
+
+
+class RankedOffers(NamedTuple):
+    top: List[Tuple[OfferMetrics, Dict[str, Any]]]
+    frontier: List[Tuple[OfferMetrics, Dict[str, Any]]]
+    scanned: int
+
+
+def rank_offers(offers: Iterable[Dict[str, Any]], sort_by: str = "price", k: int = 5) -> RankedOffers:
+    """Single pass over offers keeping the k best by sort_by and the price/duration frontier"""
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"sort_by must be one of {', '.join(SORT_KEYS)}")
+    top = TopK(k)
+    frontier = ParetoFrontier()
+    scanned = 0
+    for offer in offers:
+        scanned += 1
+        try:
+            metrics = offer_metrics(offer)
+        except (KeyError, TypeError, ValueError):
+            continue
+        top.push(sort_key(metrics, sort_by), (metrics, offer))
+        frontier.add(metrics, offer)
+    return RankedOffers(top.items(), frontier.items(), scanned)
@@ -0,0 +1,208 @@
+"""
+Flight offer searches on top of the shared Amadeus client
+Flexible-date searches fan the departure/return date combinations out
+concurrently through the client's rate limiter and response cache, and reduce
+them to a price matrix plus the cheapest options.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from airports import airports_near, get_airport_index, resolve_location_code
+from amadeus_client import AmadeusClient
+from currency import SEARCH_CURRENCY
+from flight_ranking import LARGE_RESULT_MAX
+from travel_data import get_airline_name
+
+FLIGHT_OFFERS_PATH = "/v2/shopping/flight-offers"
+
+# Fares move, but identical searches within a conversation can share a response
+FLIGHT_OFFERS_TTL = float(os.getenv("TRAVEL_AGENT_FLIGHT_OFFERS_TTL", "600"))
+
+# Fields the flight tools read from each offer
+FLIGHT_OFFER_FIELDS = (
+    "data[].price.total",
+    "data[].price.currency",
+    "data[].itineraries[].duration",
+    "data[].itineraries[].segments[].departure",
+    "data[].itineraries[].segments[].arrival",
+    "data[].itineraries[].segments[].carrierCode",
+    "data[].itineraries[].segments[].number",
+)
+
+# ±3 days on both legs is at most 49 searches
+MAX_FLEX_DAYS = 3
+
+# Nearby-airport searches cover at most 3 x 3 airport pairs
+MAX_AIRPORTS_PER_SIDE = 3
+
+
+def _offer_params(origin: str, destination: str, departure_date: str, return_date: Optional[str],
+                  adults: int, currency: str, max_results: int) -> Dict[str, Any]:
+    params = {
+        "originLocationCode": origin,
+        "destinationLocationCode": destination,
+        "departureDate": departure_date,
+        "adults": adults,
+        "currencyCode": currency,
+        "max": max_results
+    }
+    if return_date:
+        params["returnDate"] = return_date
+    return params
+
+
+def search_flight_offers(client: AmadeusClient, origin: str, destination: str, departure_date: str,
+                         return_date: Optional[str] = None, adults: int = 1, currency: str = SEARCH_CURRENCY,
+                         max_results: int = 5) -> List[Dict[str, Any]]:
+    """Flight offers for one date pair (one-way when return_date is None)"""
+    params = _offer_params(origin, destination, departure_date, return_date, adults, currency, max_results)
+    return client.get(FLIGHT_OFFERS_PATH, params, cache_ttl=FLIGHT_OFFERS_TTL,
+                      fields=FLIGHT_OFFER_FIELDS).get("data", [])
+
+
+def stream_flight_offers(client: AmadeusClient, origin: str, destination: str, departure_date: str,
+                         return_date: Optional[str] = None, adults: int = 1, currency: str = SEARCH_CURRENCY,
+                         max_results: int = LARGE_RESULT_MAX) -> Iterator[Dict[str, Any]]:
+    """Large result set for one date pair, yielded offer by offer as the response is parsed"""
+    params = _offer_params(origin, destination, departure_date, return_date, adults, currency, max_results)
+    return client.stream_items(FLIGHT_OFFERS_PATH, params)
+
+
+def date_window(center: str, days: int) -> List[str]:
+    """ISO dates from center - days to center + days, skipping dates in the past"""
+    center_date = datetime.strptime(center, "%Y-%m-%d").date()
+    today = date.today()
+    dates = (center_date + timedelta(days=offset) for offset in range(-days, days + 1))
+    return [d.isoformat() for d in dates if d >= today]
+
+
+def describe_segments(segments: List[Dict[str, Any]]) -> str:
+    """One-line route such as 'JFK → HKG (Cathay Pacific CX 841, Jul 20) → HND (...)'"""
+    parts = []
+    for segment in segments:
+        departure = segment.get("departure", {})
+        arrival = segment.get("arrival", {})
+        carrier = segment.get("carrierCode", "N/A")
+        number = segment.get("flightNumber") or segment.get("number", "N/A")
+        try:
+            day = datetime.fromisoformat(departure["at"].replace("Z", "+00:00")).strftime("%b %d")
+        except (KeyError, ValueError):
+            day = "N/A"
+        if not parts:
+            parts.append(departure.get("iataCode", "N/A"))
+        parts.append(f"{arrival.get('iataCode', 'N/A')} ({get_airline_name(carrier)} {carrier} {number}, {day})")
+    return " → ".join(parts)
+
+
+class FlexibleDateResult(NamedTuple):
+    departure_dates: List[str]
+    return_dates: List[str]
+    # (departure, return) -> cheapest total price, None when no offers, missing when the search failed
+    prices: Dict[Tuple[str, str], Optional[float]]
+    # (departure, return) -> the cheapest offer for that pair
+    best_offers: Dict[Tuple[str, str], Dict[str, Any]]
+    failed: int
+
+    def cheapest(self, limit: int = 3) -> List[Tuple[Tuple[str, str], float]]:
+        priced = [(pair, price) for pair, price in self.prices.items() if price is not None]
+        return sorted(priced, key=lambda item: (item[1], item[0]))[:limit]
+
+
+def flexible_date_search(client: AmadeusClient, origin: str, destination: str, departure_date: str,
+                         return_date: str, departure_flex: int = 3, return_flex: int = 3,
+                         adults: int = 1, currency: str = SEARCH_CURRENCY) -> FlexibleDateResult:
+    """Cheapest offer for every departure/return combination within the date windows"""
+    departure_dates = date_window(departure_date, min(departure_flex, MAX_FLEX_DAYS))
+    return_dates = date_window(return_date, min(return_flex, MAX_FLEX_DAYS))
+    pairs = [(dep, ret) for dep in departure_dates for ret in return_dates if ret > dep]
+
+    def search(pair):
+        return search_flight_offers(client, origin, destination, pair[0], pair[1], adults, currency)
+
+    prices: Dict[Tuple[str, str], Optional[float]] = {}
+    best_offers: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    failed = 0
+    for pair, offers in zip(pairs, client.map_concurrent(search, pairs)):
+        if isinstance(offers, Exception):
+            failed += 1
+            continue
+        best = min(offers, key=lambda offer: float(offer["price"]["total"]), default=None)
+        prices[pair] = float(best["price"]["total"]) if best else None
+        if best:
+            best_offers[pair] = best
+    return FlexibleDateResult(departure_dates, return_dates, prices, best_offers, failed)
+
+
+def format_price_matrix(result: FlexibleDateResult, currency: str) -> str:
+    """Markdown table with departure dates as rows and return dates as columns"""
+    def short(iso: str) -> str:
+        return datetime.strptime(iso, "%Y-%m-%d").strftime("%b %d")
+
+    cheapest = result.cheapest(1)
+    cheapest_pair = cheapest[0][0] if cheapest else None
+    lines = [
+        "| Depart \\ Return | " + " | ".join(short(ret) for ret in result.return_dates) + " |",
+        "|---" * (len(result.return_dates) + 1) + "|",
+    ]
+    for dep in result.departure_dates:
+        cells = []
+        for ret in result.return_dates:
+            price = result.prices.get((dep, ret))
+            if ret <= dep:
+                cells.append("")
+            elif (dep, ret) not in result.prices:
+                cells.append("?")
+            elif price is None:
+                cells.append("-")
+            else:
+                cell = f"{price:,.0f}"
+                cells.append(f"**{cell}**" if (dep, ret) == cheapest_pair else cell)
+        lines.append(f"| {short(dep)} | " + " | ".join(cells) + " |")
+    return "\n".join(lines) + f"\n\nPrices are the cheapest round-trip total per date pair in {currency} (- = no offers, ? = search failed)."
+
+
+def airports_around(place: str, radius_km: float, limit: int = MAX_AIRPORTS_PER_SIDE) -> List[Tuple[str, float]]:
+    """(IATA code, distance km) of the airports serving a city or airport, nearest first.
+
+    The point searched is the airport itself for an airport code and the
+    geocoded city otherwise; without any match the resolved code is used alone,
+    and a place that resolves to nothing gives [].
+    """
+    from geocoding import geocode_city
+
+    airport = get_airport_index().by_code.get(place.strip().upper()) if len(place.strip()) == 3 else None
+    point = (airport.latitude, airport.longitude) if airport else geocode_city(place)
+    nearby = airports_near(point[0], point[1], radius_km, limit) if point else []
+    if not nearby:
+        code = resolve_location_code(place)
+        return [(code, 0.0)] if code else []
+    return [(found.iata, distance) for found, distance in nearby]
+
+
+class NearbyAirportResult(NamedTuple):
+    # (offer, origin code, destination code), cheapest first
+    offers: List[Tuple[Dict[str, Any], str, str]]
+    searched: List[Tuple[str, str]]
+    failed: List[Tuple[str, str]]
+
+
+def nearby_airports_search(client: AmadeusClient, origins: List[str], destinations: List[str],
+                           departure_date: str, return_date: Optional[str] = None, adults: int = 1,
+                           currency: str = SEARCH_CURRENCY) -> NearbyAirportResult:
+    """Search every origin/destination airport pair concurrently and merge the offers by price"""
+    pairs = [(origin, destination) for origin in origins for destination in destinations if origin != destination]
+
+    def search(pair):
+        return search_flight_offers(client, pair[0], pair[1], departure_date, return_date, adults, currency)
+
+    merged = []
+    failed = []
+    for pair, offers in zip(pairs, client.map_concurrent(search, pairs)):
+        if isinstance(offers, Exception):
+            failed.append(pair)
+            continue
+        merged.extend((offer, pair[0], pair[1]) for offer in offers)
+    merged.sort(key=lambda item: float(item[0]["price"]["total"]))
+    return NearbyAirportResult(merged, pairs, failed)
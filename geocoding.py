@@ -0,0 +1,56 @@
+"""
+City geocoding shared by the weather and flight tools
+Coordinates come from the OpenWeatherMap geocoding API when a key is set and
+from the bundled airport dataset otherwise (or when the API has no match).
+Successful API lookups are remembered for the life of the process.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from text_index import normalize
+
+GEOCODING_URL = "http://api.openweathermap.org/geo/1.0/direct"
+
+_coordinates: Dict[str, Tuple[float, float]] = {}
+_lock = threading.Lock()
+
+
+def _openweather_coordinates(city: str, api_key: str) -> Optional[Tuple[float, float]]:
+    import requests
+
+    geo_resp = requests.get(GEOCODING_URL, params={"q": city, "limit": 1, "appid": api_key}, timeout=10)
+    geo_data = geo_resp.json() if geo_resp.status_code == 200 else []
+    if not geo_data or geo_data[0].get("lat") is None or geo_data[0].get("lon") is None:
+        return None
+    return geo_data[0]["lat"], geo_data[0]["lon"]
+
+
+def geocode_city(city: str, use_bundled: bool = True) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) for a city name, or None if it cannot be located.
+
+    use_bundled=False restricts the answer to the geocoding API, for callers
+    that need the exact city rather than the nearest airports' area.
+    """
+    key = normalize(city)
+    if not key:
+        return None
+    with _lock:
+        coordinates = _coordinates.get(key)
+
+    api_key = os.getenv("OPENWEATHER_API_KEY")
+    if coordinates is None and api_key:
+        try:
+            coordinates = _openweather_coordinates(city, api_key)
+        except Exception:
+            coordinates = None
+        if coordinates is not None:
+            with _lock:
+                _coordinates[key] = coordinates
+
+    if coordinates is None and use_bundled:
+        from airports import get_airport_index
+
+        coordinates = get_airport_index().city_center(city)
+    return coordinates
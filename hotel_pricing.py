@@ -0,0 +1,140 @@
+"""
+Bulk hotel pricing through Amadeus multi-hotel offers requests
+Candidate hotel IDs are priced in batches (one request per batch, batches in
+parallel through the shared client's rate limiter) and each hotel's cheapest
+offer is cached per (hotelId, dates, guests).
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from amadeus_client import AmadeusClient, AmadeusError
+
+HOTEL_OFFERS_PATH = "/v3/shopping/hotel-offers"
+
+# hotelIds per offers request and how many candidates a search prices at most
+HOTEL_IDS_PER_REQUEST = int(os.getenv("TRAVEL_AGENT_HOTEL_IDS_PER_REQUEST", "20"))
+MAX_PRICED_HOTELS = int(os.getenv("TRAVEL_AGENT_MAX_PRICED_HOTELS", "40"))
+
+# Room prices move quickly; unavailable hotels are cached for the same time
+HOTEL_PRICE_TTL = float(os.getenv("TRAVEL_AGENT_HOTEL_PRICE_TTL", "900"))
+
+# Hotel list fields shown in search results; the rest of the payload is never decoded
+HOTEL_LIST_FIELDS = (
+    "data[].hotelId",
+    "data[].name",
+    "data[].chainCode",
+    "data[].iataCode",
+    "data[].geoCode",
+    "data[].distance",
+    "data[].address.countryCode",
+    "data[].rating",
+)
+
+# Nightly price estimate in USD by hotel chain for hotels without a live offer
+CHAIN_PRICE_ESTIMATES = {
+    "HI": 150, "AC": 150, "CP": 150,  # Holiday Inn, Accor, Choice
+    "MA": 300, "RI": 300, "SH": 300,  # Marriott, Ritz, Sheraton
+    "ZZ": 180, "NN": 180,  # Independent hotels
+}
+DEFAULT_PRICE_ESTIMATE = 200
+
+# The only parts of an offers response used for pricing
+HOTEL_OFFER_FIELDS = (
+    "data[].hotel.hotelId",
+    "data[].available",
+    "data[].offers[].price",
+    "data[].offers[].room.typeEstimated.category",
+)
+
+_MISSING = object()
+
+
+class HotelPrice(NamedTuple):
+    total: float
+    currency: str
+    per_night: float
+    room: str
+
+
+def _cache_key(hotel_id: str, check_in: str, check_out: str, adults: int):
+    return ("hotel-price", hotel_id, check_in, check_out, adults)
+
+
+def _cheapest_offer(hotel_offers: dict, nights: int) -> Optional[HotelPrice]:
+    best = None
+    for offer in hotel_offers.get("offers", []):
+        price = offer.get("price", {})
+        try:
+            total = float(price.get("total") or price.get("base"))
+        except (TypeError, ValueError):
+            continue
+        if best is None or total < best.total:
+            room = offer.get("room", {}).get("typeEstimated", {}).get("category", "")
+            best = HotelPrice(
+                total=total,
+                currency=price.get("currency", ""),
+                per_night=round(total / max(nights, 1), 2),
+                room=room.replace("_", " ").title(),
+            )
+    return best
+
+
+def estimate_nightly_price(chain_code: str) -> int:
+    return CHAIN_PRICE_ESTIMATES.get(chain_code, DEFAULT_PRICE_ESTIMATE)
+
+
+def _batches(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def price_hotels(client: AmadeusClient, hotel_ids: Iterable[str], check_in: str, check_out: str,
+                 adults: int = 1) -> Dict[str, Optional[HotelPrice]]:
+    """Cheapest offer per hotel ID (None when the hotel has no availability).
+
+    Hotels whose batch failed are left out of the result so callers can fall
+    back to an estimate for them.
+    """
+    nights = (datetime.strptime(check_out, "%Y-%m-%d") - datetime.strptime(check_in, "%Y-%m-%d")).days
+    prices: Dict[str, Optional[HotelPrice]] = {}
+    to_fetch: List[str] = []
+    for hotel_id in dict.fromkeys(hotel_ids):
+        if not hotel_id:
+            continue
+        cached = client.cache.get(_cache_key(hotel_id, check_in, check_out, adults), _MISSING)
+        if cached is _MISSING:
+            to_fetch.append(hotel_id)
+        else:
+            prices[hotel_id] = cached
+
+    def fetch_batch(batch: List[str]) -> Dict[str, Optional[HotelPrice]]:
+        params = {
+            "hotelIds": ",".join(batch),
+            "checkInDate": check_in,
+            "checkOutDate": check_out,
+            "adults": adults,
+            "bestRateOnly": "true",
+        }
+        try:
+            data = client.get(HOTEL_OFFERS_PATH, params, fields=HOTEL_OFFER_FIELDS).get("data", [])
+        except AmadeusError as e:
+            # A batch where no hotel has rooms comes back as an error rather than empty data
+            if e.status_code == 400 and "NO ROOMS AVAILABLE" in e.text.upper():
+                data = []
+            else:
+                raise
+        batch_prices = dict.fromkeys(batch)
+        for hotel_offers in data:
+            hotel_id = hotel_offers.get("hotel", {}).get("hotelId")
+            if hotel_id in batch_prices and hotel_offers.get("available", True):
+                batch_prices[hotel_id] = _cheapest_offer(hotel_offers, nights)
+        return batch_prices
+
+    for batch_prices in client.map_concurrent(fetch_batch, _batches(to_fetch, HOTEL_IDS_PER_REQUEST)):
+        if isinstance(batch_prices, Exception):
+            continue
+        for hotel_id, price in batch_prices.items():
+            client.cache.set(_cache_key(hotel_id, check_in, check_out, adults), price, HOTEL_PRICE_TTL)
+            prices[hotel_id] = price
+    return prices
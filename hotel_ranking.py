@@ -0,0 +1,193 @@
+"""
+Hotel ranking by location, price and rating
+Distances from every candidate hotel to the city center and to each point of
+interest are computed in one vectorized haversine pass and combined with
+price and rating into a single score, so cities with hundreds of properties
+rank in about a millisecond.
+"""
+
+import importlib.util
+import math
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from airports import EARTH_RADIUS_KM, haversine_km
+
+# Optional numpy for vectorized ranking, imported on first use so loading this module stays cheap
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    import numpy
+    return numpy
+
+
+# Relative weight of each criterion; each one is scaled to 0..1 across the candidates
+RANKING_WEIGHTS = {"center": 0.3, "poi": 0.4, "price": 0.2, "rating": 0.1}
+
+# Used when the API gives no star rating
+DEFAULT_RATING = 3.0
+
+Point = Tuple[float, float]
+
+_COORDINATE_PAIR = re.compile(r"(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)")
+_PLACE_SEPARATOR = re.compile(r"[;,|]|\band\b")
+
+
+class HotelRanking(NamedTuple):
+    # Candidate indexes, best first
+    order: List[int]
+    # Per candidate, in input order (None when the hotel has no coordinates)
+    center_km: List[Optional[float]]
+    # Distance to the nearest point of interest and which one it is (None without POIs)
+    poi_km: List[Optional[float]]
+    nearest_poi: List[Optional[int]]
+
+
+def hotel_coordinates(hotel: Dict) -> Optional[Point]:
+    geo_code = hotel.get("geoCode") or {}
+    try:
+        return float(geo_code["latitude"]), float(geo_code["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def hotel_rating(hotel: Dict) -> Optional[float]:
+    try:
+        return float(hotel["rating"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def resolve_points_of_interest(text: str, city: str) -> List[Tuple[str, Point]]:
+    """(label, point) for each POI in text: 'lat,lon' pairs or place names, separated by ';' or ','.
+
+    Place names are geocoded within the city; names that cannot be located are dropped.
+    """
+    from geocoding import geocode_city
+
+    points = []
+    for match in _COORDINATE_PAIR.finditer(text or ""):
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            points.append((f"{lat:.4f}, {lon:.4f}", (lat, lon)))
+    for name in _PLACE_SEPARATOR.split(_COORDINATE_PAIR.sub("", text or "")):
+        name = name.strip()
+        if not name:
+            continue
+        point = geocode_city(f"{name}, {city}", use_bundled=False)
+        if point:
+            points.append((name, point))
+    return points
+
+
+def _haversine_matrix(lat, lon, points):
+    """(hotels x points) distance matrix in km; NaN rows for hotels without coordinates"""
+    np = _numpy()
+    lat1 = np.radians(lat)[:, None]
+    lon1 = np.radians(lon)[:, None]
+    lat2 = np.radians(points[:, 0])[None, :]
+    lon2 = np.radians(points[:, 1])[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _scaled(values):
+    """Min-max scale to 0..1; missing values count as the worst"""
+    np = _numpy()
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return np.zeros_like(values)
+    low, high = finite.min(), finite.max()
+    scaled = (values - low) / (high - low) if high > low else np.zeros_like(values)
+    return np.where(np.isfinite(scaled), scaled, 1.0)
+
+
+def _rank_numpy(coordinates, prices, ratings, center, pois, k, weights) -> HotelRanking:
+    np = _numpy()
+    n = len(coordinates)
+    coords = np.array([c if c is not None else (np.nan, np.nan) for c in coordinates], dtype=np.float64).reshape(n, 2)
+    points = [p for p in ([center] if center else []) + list(pois)]
+    distances = _haversine_matrix(coords[:, 0], coords[:, 1], np.array(points, dtype=np.float64).reshape(-1, 2))
+
+    score = np.zeros(n)
+    center_km = distances[:, 0] if center else np.full(n, np.nan)
+    if center:
+        score += weights["center"] * _scaled(center_km)
+    poi_km = np.full(n, np.nan)
+    nearest = np.full(n, -1)
+    if pois:
+        poi_distances = distances[:, 1:] if center else distances
+        has_coords = np.isfinite(coords[:, 0])
+        nearest = np.where(has_coords, np.argmin(np.nan_to_num(poi_distances, nan=np.inf), axis=1), -1)
+        poi_km = np.nanmin(np.where(has_coords[:, None], poi_distances, np.inf), axis=1)
+        poi_km[~has_coords] = np.nan
+        score += weights["poi"] * _scaled(poi_km)
+    score += weights["price"] * _scaled(np.array([np.nan if p is None else p for p in prices], dtype=np.float64))
+    rating_values = np.array([DEFAULT_RATING if r is None else r for r in ratings], dtype=np.float64)
+    score += weights["rating"] * (1.0 - _scaled(rating_values))
+
+    # A stable sort keeps API order among equal scores (n is at most a few thousand)
+    order = np.argsort(score, kind="stable")[:k]
+
+    def to_list(values):
+        return [None if not math.isfinite(v) else float(v) for v in values]
+
+    return HotelRanking(
+        order=[int(i) for i in order],
+        center_km=to_list(center_km),
+        poi_km=to_list(poi_km),
+        nearest_poi=[None if i < 0 else int(i) for i in nearest],
+    )
+
+
+def _scaled_list(values: List[Optional[float]]) -> List[float]:
+    finite = [v for v in values if v is not None]
+    if not finite:
+        return [0.0] * len(values)
+    low, high = min(finite), max(finite)
+    return [1.0 if v is None else ((v - low) / (high - low) if high > low else 0.0) for v in values]
+
+
+def _rank_python(coordinates, prices, ratings, center, pois, k, weights) -> HotelRanking:
+    n = len(coordinates)
+    center_km = [haversine_km(*c, *center) if c and center else None for c in coordinates]
+    poi_km: List[Optional[float]] = [None] * n
+    nearest: List[Optional[int]] = [None] * n
+    for i, c in enumerate(coordinates):
+        if c and pois:
+            distances = [haversine_km(*c, *poi) for poi in pois]
+            nearest[i] = min(range(len(pois)), key=distances.__getitem__)
+            poi_km[i] = distances[nearest[i]]
+
+    score = [0.0] * n
+    parts = [("price", _scaled_list(list(prices)))]
+    if center:
+        parts.append(("center", _scaled_list(center_km)))
+    if pois:
+        parts.append(("poi", _scaled_list(poi_km)))
+    for name, values in parts:
+        score = [s + weights[name] * v for s, v in zip(score, values)]
+    rating_scaled = _scaled_list([DEFAULT_RATING if r is None else r for r in ratings])
+    score = [s + weights["rating"] * (1.0 - v) for s, v in zip(score, rating_scaled)]
+
+    order = sorted(range(n), key=score.__getitem__)[:k]
+    return HotelRanking(order, center_km, poi_km, nearest)
+
+
+def rank_hotels(coordinates: Sequence[Optional[Point]], prices: Sequence[Optional[float]],
+                ratings: Sequence[Optional[float]], center: Optional[Point] = None,
+                pois: Sequence[Point] = (), k: int = 6,
+                weights: Optional[Dict[str, float]] = None) -> HotelRanking:
+    """Best k hotels (lowest combined score) by distance to center and POIs, price and rating.
+
+    All sequences are per candidate hotel; None marks a missing value, which
+    ranks as the worst for that criterion.
+    """
+    weights = {**RANKING_WEIGHTS, **(weights or {})}
+    if not coordinates:
+        return HotelRanking([], [], [], [])
+    rank = _rank_numpy if NUMPY_AVAILABLE else _rank_python
+    return rank(list(coordinates), list(prices), list(ratings), center, list(pois), k, weights)
@@ -0,0 +1,217 @@
+"""
+Structured trip state collected from tool results
+While TravelAgent.chat runs with an Itinerary attached, the tools record what
+they showed the user (the latest flight and hotel options, weather, highlights)
+and what was booked. Exports are built from this state directly, so they stay
+small however long the chat gets and need no extra LLM pass.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from currency import format_money
+
+# Attractions kept per city
+MAX_HIGHLIGHTS = 5
+
+
+@dataclass
+class FlightOption:
+    option: int
+    airline: str
+    price: float
+    currency: str
+    origin: str
+    destination: str
+    outbound: str
+    inbound: str = ""
+
+
+@dataclass
+class FlightSearch:
+    origin: str
+    destination: str
+    departure_date: str
+    return_date: str
+    options: List[FlightOption] = field(default_factory=list)
+
+
+@dataclass
+class HotelOption:
+    option: int
+    name: str
+    location: str
+    per_night: float
+    total: float
+    currency: str
+    estimated: bool = False
+
+
+@dataclass
+class HotelSearch:
+    city: str
+    check_in: str
+    check_out: str
+    options: List[HotelOption] = field(default_factory=list)
+
+    @property
+    def nights(self) -> int:
+        return (datetime.strptime(self.check_out, "%Y-%m-%d") - datetime.strptime(self.check_in, "%Y-%m-%d")).days
+
+
+@dataclass
+class FlightBooking:
+    reference: str
+    departure_date: str
+    return_date: str
+    flight: Optional[FlightOption]
+
+
+@dataclass
+class HotelBooking:
+    reference: str
+    city: str
+    check_in: str
+    check_out: str
+    hotel: Optional[HotelOption]
+
+
+@dataclass
+class Itinerary:
+    """Latest searches, bookings, weather and highlights of one conversation"""
+    flight_search: Optional[FlightSearch] = None
+    hotel_search: Optional[HotelSearch] = None
+    flight_booking: Optional[FlightBooking] = None
+    hotel_booking: Optional[HotelBooking] = None
+    # city -> one-line forecast
+    weather: Dict[str, str] = field(default_factory=dict)
+    # city -> top attractions
+    highlights: Dict[str, List[str]] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        return not (self.flight_search or self.hotel_search or self.flight_booking or self.hotel_booking
+                    or self.weather or self.highlights)
+
+    def book_flight(self, option: int, reference: str, departure_date: str, return_date: str) -> FlightBooking:
+        """Record a flight booking, resolving the option number against the latest search"""
+        options = self.flight_search.options if self.flight_search else []
+        flight = next((candidate for candidate in options if candidate.option == option), None)
+        self.flight_booking = FlightBooking(reference, departure_date, return_date, flight)
+        return self.flight_booking
+
+    def book_hotel(self, option: int, reference: str, city: str, check_in: str, check_out: str) -> HotelBooking:
+        options = self.hotel_search.options if self.hotel_search else []
+        hotel = next((candidate for candidate in options if candidate.option == option), None)
+        self.hotel_booking = HotelBooking(reference, city, check_in, check_out, hotel)
+        return self.hotel_booking
+
+    def total_cost(self) -> Optional[Tuple[float, str]]:
+        """Booked flight plus hotel, when both are priced in the same currency"""
+        prices = []
+        if self.flight_booking and self.flight_booking.flight:
+            prices.append((self.flight_booking.flight.price, self.flight_booking.flight.currency))
+        if self.hotel_booking and self.hotel_booking.hotel:
+            prices.append((self.hotel_booking.hotel.total, self.hotel_booking.hotel.currency))
+        if not prices or len({currency for _, currency in prices}) != 1:
+            return None
+        return round(sum(amount for amount, _ in prices), 2), prices[0][1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Itinerary":
+        def build(kind, value, **nested):
+            if value is None:
+                return None
+            value = dict(value)
+            for key, (item_kind, many) in nested.items():
+                if value.get(key) is not None:
+                    value[key] = [item_kind(**item) for item in value[key]] if many else item_kind(**value[key])
+            return kind(**value)
+
+        return cls(
+            flight_search=build(FlightSearch, data.get("flight_search"), options=(FlightOption, True)),
+            hotel_search=build(HotelSearch, data.get("hotel_search"), options=(HotelOption, True)),
+            flight_booking=build(FlightBooking, data.get("flight_booking"), flight=(FlightOption, False)),
+            hotel_booking=build(HotelBooking, data.get("hotel_booking"), hotel=(HotelOption, False)),
+            weather=dict(data.get("weather") or {}),
+            highlights={city: list(items) for city, items in (data.get("highlights") or {}).items()},
+        )
+
+
+_active: contextvars.ContextVar[Optional[Itinerary]] = contextvars.ContextVar("itinerary", default=None)
+
+
+@contextmanager
+def recording(itinerary: Optional[Itinerary]) -> Iterator[Optional[Itinerary]]:
+    """Make tool calls in this context record into itinerary (None records nothing)"""
+    token = _active.set(itinerary)
+    try:
+        yield itinerary
+    finally:
+        _active.reset(token)
+
+
+def current_itinerary() -> Optional[Itinerary]:
+    """Itinerary of the chat turn being run, if the caller attached one"""
+    return _active.get()
+
+
+def itinerary_sections(itinerary: Itinerary) -> List[Tuple[str, List[str]]]:
+    """(title, lines) per section: bookings first, then the options still open, weather and highlights"""
+    def flight_lines(flight: FlightOption) -> List[str]:
+        lines = [f"{flight.airline} — {format_money(flight.price, flight.currency)}",
+                 f"Outbound: {flight.outbound}"]
+        if flight.inbound:
+            lines.append(f"Return: {flight.inbound}")
+        return lines
+
+    def hotel_line(hotel: HotelOption, nights: int) -> str:
+        estimate = " (estimated)" if hotel.estimated else ""
+        return (f"{hotel.name}, {hotel.location} — {format_money(hotel.per_night, hotel.currency)} per night, "
+                f"{format_money(hotel.total, hotel.currency)} for {nights} nights{estimate}")
+
+    sections = []
+    booking = itinerary.flight_booking
+    if booking:
+        lines = [f"Booking reference: {booking.reference}", f"Dates: {booking.departure_date} to {booking.return_date}"]
+        lines += flight_lines(booking.flight) if booking.flight else ["Flight details were not captured"]
+        sections.append(("🛫 FLIGHT", lines))
+    elif itinerary.flight_search and itinerary.flight_search.options:
+        search = itinerary.flight_search
+        lines = [f"{search.origin} → {search.destination}, {search.departure_date} to {search.return_date}"]
+        for flight in search.options:
+            lines.append(f"Option {flight.option}: " + " | ".join(flight_lines(flight)))
+        sections.append(("🛫 FLIGHT OPTIONS", lines))
+
+    stay = itinerary.hotel_booking
+    if stay:
+        nights = (datetime.strptime(stay.check_out, "%Y-%m-%d") - datetime.strptime(stay.check_in, "%Y-%m-%d")).days
+        lines = [f"Booking reference: {stay.reference}", f"{stay.city}: {stay.check_in} to {stay.check_out}"]
+        lines.append(hotel_line(stay.hotel, nights) if stay.hotel else "Hotel details were not captured")
+        sections.append(("🏨 HOTEL", lines))
+    elif itinerary.hotel_search and itinerary.hotel_search.options:
+        search = itinerary.hotel_search
+        lines = [f"{search.city}: {search.check_in} to {search.check_out}"]
+        lines += [f"Option {hotel.option}: {hotel_line(hotel, search.nights)}" for hotel in search.options]
+        sections.append(("🏨 HOTEL OPTIONS", lines))
+
+    total = itinerary.total_cost()
+    if total:
+        sections.append(("💰 TOTAL TRIP COST", [format_money(*total)]))
+    if itinerary.weather:
+        sections.append(("🌤️ WEATHER", list(itinerary.weather.values())))
+    for city, attractions in itinerary.highlights.items():
+        sections.append((f"🎯 HIGHLIGHTS — {city}", attractions))
+
+    return sections
+
+
+def format_itinerary(itinerary: Itinerary) -> str:
+    """Plain-text itinerary with bulleted sections"""
+    return "\n\n".join(title + "\n" + "\n".join(f"• {line}" for line in lines)
+                       for title, lines in itinerary_sections(itinerary))
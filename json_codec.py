@@ -0,0 +1,184 @@
+"""
+JSON decoding for provider payloads
+loads() uses the fastest installed decoder (orjson, then the standard library)
+unless TRAVEL_AGENT_JSON_DECODER picks one. loads_projected() keeps only the
+requested field paths; for very large bodies, with ijson installed, it builds
+just those fields from the parser's event stream instead of decoding the whole
+document first.
+"""
+
+import io
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+# Optional imports for faster and projected decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+Payload = Union[bytes, str]
+
+DECODERS: Dict[str, Callable[[Payload], Any]] = {"json": json.loads}
+if ORJSON_AVAILABLE:
+    DECODERS["orjson"] = orjson.loads
+
+_decoder_name = os.getenv("TRAVEL_AGENT_JSON_DECODER") or ("orjson" if ORJSON_AVAILABLE else "json")
+if _decoder_name not in DECODERS:
+    _decoder_name = "json"
+
+
+# Smallest body for which loads_projected streams instead of decoding in full
+STREAMING_PROJECTION_MIN_BYTES = int(os.getenv("TRAVEL_AGENT_STREAMING_JSON_MIN_BYTES", str(2 * 1024 * 1024)))
+
+
+def register_decoder(name: str, decoder: Callable[[Payload], Any]):
+    """Make another decoder selectable with set_decoder or TRAVEL_AGENT_JSON_DECODER"""
+    DECODERS[name] = decoder
+
+
+def set_decoder(name: str):
+    global _decoder_name
+    if name not in DECODERS:
+        raise ValueError(f"Unknown JSON decoder {name!r}; available: {', '.join(DECODERS)}")
+    _decoder_name = name
+
+
+def decoder_name() -> str:
+    return _decoder_name
+
+
+def loads(data: Payload) -> Any:
+    return DECODERS[_decoder_name](data)
+
+
+def _to_prefix(path: str) -> str:
+    """'data[].price.total' -> ijson prefix 'data.item.price.total'"""
+    return path.replace("[]", ".item").strip(".")
+
+
+class _Projection:
+    """Which ijson prefixes to materialize for a set of field paths"""
+
+    def __init__(self, paths: Iterable[str]):
+        self.targets = {_to_prefix(path) for path in paths}
+        self.ancestors = {""}
+        for target in self.targets:
+            parts = target.split(".")
+            self.ancestors.update(".".join(parts[:i]) for i in range(1, len(parts)))
+        self._cache: Dict[str, str] = {}
+
+    def status(self, prefix: str) -> str:
+        """'keep' (requested or inside a requested subtree), 'descend' (on the way to one) or 'skip'"""
+        status = self._cache.get(prefix)
+        if status is None:
+            if prefix in self.targets or any(prefix.startswith(target + ".") for target in self.targets):
+                status = "keep"
+            elif prefix in self.ancestors:
+                status = "descend"
+            else:
+                status = "skip"
+            self._cache[prefix] = status
+        return status
+
+
+def _field_tree(paths: Iterable[str]) -> Dict[str, Any]:
+    """["data[].price.total", "data[].id"] -> {"data": {"[]": {"price": {"total": None}, "id": None}}}
+
+    None marks a selected value; selecting a path overrides narrower selections below it.
+    """
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        parts = path.replace("[]", ".[]").strip(".").split(".")
+        node = tree
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _project(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        item_tree = tree.get("[]")
+        return [_project(item, item_tree) for item in value] if "[]" in tree else []
+    if isinstance(value, dict):
+        # Walk the (small) selection rather than the (large) object
+        return {key: _project(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+
+def project(value: Any, paths: Iterable[str]) -> Any:
+    """Copy of an already decoded document with only the given field paths"""
+    return _project(value, _field_tree(paths))
+
+
+def _attach(stack: List[list], value: Any):
+    container, key = stack[-1]
+    if isinstance(container, list):
+        container.append(value)
+    else:
+        container[key] = value
+
+
+def loads_projected(data: Payload, paths: Iterable[str], stream: Optional[bool] = None) -> Any:
+    """Decode only the given field paths, e.g. ["data[].hotelId", "data[].geoCode"].
+
+    "[]" marks "every element of this array"; a path selects the whole value
+    below it. Objects on the way to a selected path keep only selected keys.
+
+    Streaming with ijson never holds the full document, but is slower than a
+    fast full decode, so by default it is only used for bodies of at least
+    STREAMING_PROJECTION_MIN_BYTES. Otherwise the body is decoded and projected,
+    which still keeps cached payloads small.
+    """
+    paths = list(paths)
+    if stream is None:
+        stream = len(data) >= STREAMING_PROJECTION_MIN_BYTES
+    if not (stream and IJSON_AVAILABLE):
+        return project(loads(data), paths)
+
+    projection = _Projection(paths)
+    root: List[Any] = []
+    stack: List[list] = [[root, None]]
+    skip_depth = 0
+    for prefix, event, value in ijson.parse(io.BytesIO(data.encode() if isinstance(data, str) else data), use_float=True):
+        if skip_depth:
+            if event in ("start_map", "start_array"):
+                skip_depth += 1
+            elif event in ("end_map", "end_array"):
+                skip_depth -= 1
+            continue
+        if event == "map_key":
+            stack[-1][1] = value
+            continue
+        if event in ("end_map", "end_array"):
+            stack.pop()
+            continue
+        if projection.status(prefix) == "skip":
+            if event in ("start_map", "start_array"):
+                skip_depth = 1
+            continue
+        if event == "start_map":
+            container = {}
+        elif event == "start_array":
+            container = []
+        else:
+            _attach(stack, value)
+            continue
+        _attach(stack, container)
+        stack.append([container, None])
+    return root[0] if root else None
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Load generator and capacity report for the AI Travel Agent
+Simulates concurrent conversations (search flights, pick an option, find and
+book a hotel, ask for a summary) against the real TravelAgent, with a scripted
+stand-in for the LLM and the provider-backed tools replaying recorded output
+(data/load_test_replays.json) at their recorded latency. The number of
+sessions is ramped level by level and the report shows throughput, turn
+latency percentiles, memory per session and where throughput stops scaling.
+
+    python load_test.py --levels 1,2,4,8,16,32 --llm-latency 0.5
+
+No API keys are needed and nothing leaves the process.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from batch_runner import latency_summary
+from session_store import ChatSession
+from travel_data import DATA_DIR
+
+REPLAYS_PATH = DATA_DIR / "load_test_replays.json"
+
+# A level saturates the process when it adds less than this share of throughput
+SATURATION_GAIN = 0.10
+
+# Characters of the last tool output echoed in a scripted final answer
+REPLY_CHARS = 600
+
+# (origin, destination airport, destination city) cycled across sessions
+ROUTES = [
+    ("JFK", "CDG", "Paris"),
+    ("LAX", "NRT", "Tokyo"),
+    ("ORD", "LHR", "London"),
+    ("SFO", "FCO", "Rome"),
+    ("BOS", "BCN", "Barcelona"),
+    ("SEA", "AMS", "Amsterdam"),
+]
+
+# One user message and the tool calls (name, arguments) the scripted model makes for it
+Turn = Tuple[str, List[Tuple[str, Dict[str, Any]]]]
+
+
+def conversation_script(index: int, start: Optional[date] = None) -> List[Turn]:
+    """The four turns of one simulated conversation; messages are unique per index"""
+    origin, airport, city = ROUTES[index % len(ROUTES)]
+    departure = (start or date.today() + timedelta(days=30)) + timedelta(days=index % 60)
+    dates = {"departure_date": departure.isoformat(), "return_date": (departure + timedelta(days=5)).isoformat()}
+    stay = {"city": city, "check_in": dates["departure_date"], "check_out": dates["return_date"]}
+    option = index % 3 + 1
+    trip = f"trip {index}"
+    return [
+        (f"Find flights from {origin} to {city} leaving {dates['departure_date']} and returning "
+         f"{dates['return_date']} ({trip})",
+         [("search_flights_amadeus", {"origin": origin, "destination": airport, **dates})]),
+        (f"I'll take option {option} ({trip})",
+         [("book_flight", {"option_number": str(option), "origin": origin, "destination": airport, **dates})]),
+        (f"Find a hotel in {city} for those dates and book the first option ({trip})",
+         [("search_hotels_amadeus", stay), ("book_hotel", {"option_number": "1", **stay})]),
+        (f"Give me a summary of my trip ({trip})", []),
+    ]
+
+
+@lru_cache(maxsize=None)
+def _scripted_model_class():
+    """Define the model on first use so importing this module does not load LangChain"""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class ScriptedChatModel(BaseChatModel):
+        """Chat model that makes the planned tool calls for each user message, then answers"""
+        plans: Dict[str, List[Tuple[str, Dict[str, Any]]]]
+        latency: float = 0.0
+        model_name: str = "scripted"
+
+        @property
+        def _llm_type(self) -> str:
+            return "scripted"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+            if self.latency:
+                time.sleep(self.latency * random.uniform(0.75, 1.25))
+            turn_start = max(i for i, message in enumerate(messages) if isinstance(message, HumanMessage))
+            plan = self.plans.get(messages[turn_start].content, [])
+            steps_done = sum(isinstance(message, ToolMessage) for message in messages[turn_start:])
+            if steps_done < len(plan):
+                name, arguments = plan[steps_done]
+                reply = AIMessage(content="", additional_kwargs={"tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(arguments)},
+                }]})
+            elif steps_done:
+                reply = AIMessage(content="Here is what I found for you:\n\n" + messages[-1].content[:REPLY_CHARS])
+            else:
+                reply = AIMessage(content=f"Here is a summary of your trip so far, based on our "
+                                          f"{turn_start // 2} earlier exchanges: flights and hotel are booked.")
+            # Roughly four characters per token, so prompt size grows with the conversation like the real thing
+            prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+            completion_tokens = max(1, len(reply.content) // 4)
+            return ChatResult(generations=[ChatGeneration(message=reply)], llm_output={
+                "token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+                "model_name": self.model_name,
+            })
+
+    return ScriptedChatModel
+
+
+def load_replays(path: Path = REPLAYS_PATH) -> Dict[str, Dict[str, Any]]:
+    """Tool name -> {"latency": seconds, "outputs": [recorded output, ...]}"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _Arguments(dict):
+    """Fills {placeholders} in recorded output from the call's arguments, leaving unknown ones as they are"""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def replay_tools(tools: List, replays: Dict[str, Dict[str, Any]], latency_scale: float = 1.0) -> List:
+    """Tools with the same names and schemas whose provider calls are replayed from recorded output.
+
+    Tools without a recording (bookings) do no I/O and run unchanged.
+    """
+    from langchain.tools import StructuredTool
+
+    def replayed(tool, recording):
+        outputs = itertools.cycle(recording["outputs"])
+        lock = threading.Lock()
+        delay = recording.get("latency", 0.0) * latency_scale
+
+        def call(**arguments) -> str:
+            with lock:
+                output = next(outputs)
+            if delay:
+                time.sleep(delay * random.uniform(0.75, 1.25))
+            return output.format_map(_Arguments(arguments))
+
+        return StructuredTool.from_function(func=call, name=tool.name, description=tool.description,
+                                            args_schema=tool.args_schema)
+
+    return [replayed(tool, replays[tool.name]) if tool.name in replays else tool for tool in tools]
+
+
+def build_agent(plans: Dict[str, List[Tuple[str, Dict[str, Any]]]], llm_latency: float = 0.5,
+                tool_latency_scale: float = 1.0, replays_path: Path = REPLAYS_PATH):
+    """A real TravelAgent wired to the scripted model and replayed tools"""
+    from model_router import ModelRouter
+    from travel_agent import TravelAgent
+
+    model = _scripted_model_class()(plans=plans, latency=llm_latency)
+    router = ModelRouter(model, model)
+    # Building the real tools only defines them; it makes no provider calls
+    tools = replay_tools(TravelAgent(router=router).tools, load_replays(replays_path), tool_latency_scale)
+    agent = TravelAgent(router=router, tools=tools)
+    # Thousands of turns of agent trace would drown the report
+    for tier in router.models:
+        agent.get_agent_executor(tier).verbose = False
+    return agent
+
+
+@dataclass
+class LevelResult:
+    """Outcome of running one concurrency level"""
+    sessions: int
+    turns: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    tokens: int = 0
+    latencies: List[float] = field(default_factory=list)
+    # Set by measure_memory: bytes per finished session and per running session
+    retained_bytes: Optional[float] = None
+    peak_bytes: Optional[float] = None
+
+    def throughput(self) -> float:
+        """Finished turns per second of wall time"""
+        return self.turns / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        result = {
+            "sessions": self.sessions,
+            "turns": self.turns,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 2),
+            "turns_per_second": round(self.throughput(), 3),
+            "latency": latency_summary(self.latencies),
+            "tokens": self.tokens,
+        }
+        if self.retained_bytes is not None:
+            result["retained_kb_per_session"] = round(self.retained_bytes / 1024, 1)
+            result["peak_kb_per_session"] = round(self.peak_bytes / 1024, 1)
+        return result
+
+
+def run_session(agent, session: ChatSession, script: List[Turn], think_time: float = 0.0) -> Tuple[List[float], int]:
+    """Play one conversation; returns the latency of each turn and the number of failed turns"""
+    latencies, errors = [], 0
+    for number, (message, _) in enumerate(script):
+        if think_time and number:
+            time.sleep(think_time * random.uniform(0.5, 1.5))
+        start = time.perf_counter()
+        try:
+            response = agent.chat(message, session.chat_history(), session.usage, session.itinerary,
+                                  raise_errors=True)
+        except Exception:
+            errors += 1
+            continue
+        finally:
+            latencies.append(time.perf_counter() - start)
+        session.add_exchange(message, response)
+    return latencies, errors
+
+
+def run_level(agent, scripts: List[List[Turn]], think_time: float = 0.0) -> Tuple[LevelResult, List[ChatSession]]:
+    """Run one conversation per script, all at once; the sessions are returned for memory accounting"""
+    sessions = [ChatSession(f"load-{uuid.uuid4().hex[:8]}") for _ in scripts]
+    result = LevelResult(len(scripts))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(scripts), thread_name_prefix="session") as pool:
+        outcomes = list(pool.map(lambda pair: run_session(agent, *pair, think_time), zip(sessions, scripts)))
+    result.seconds = time.perf_counter() - start
+    for latencies, errors in outcomes:
+        result.latencies += latencies
+        result.turns += len(latencies) - errors
+        result.errors += errors
+    result.tokens = sum(session.usage.total_tokens for session in sessions)
+    return result, sessions
+
+
+def measure_memory(agent, scripts: List[List[Turn]], think_time: float = 0.0) -> LevelResult:
+    """Run a level under tracemalloc (which slows Python down, so its timings are not reported)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        result, sessions = run_level(agent, scripts, think_time)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Keep the sessions alive until measured
+    del sessions
+    result.retained_bytes = (current - baseline) / result.sessions
+    result.peak_bytes = (peak - baseline) / result.sessions
+    return result
+
+
+def find_saturation(levels: List[LevelResult], min_gain: float = SATURATION_GAIN) -> Optional[LevelResult]:
+    """The last level before throughput stopped growing by at least min_gain, or None if it kept scaling"""
+    for previous, current in zip(levels, levels[1:]):
+        if current.throughput() < previous.throughput() * (1 + min_gain):
+            return previous
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp concurrent simulated sessions and report capacity")
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="comma-separated concurrent session counts")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per simulated LLM call")
+    parser.add_argument("--tool-latency-scale", type=float, default=1.0,
+                        help="multiplier on recorded tool latencies (0 measures pure agent overhead)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds a user pauses between turns")
+    parser.add_argument("--replays", type=Path, default=REPLAYS_PATH, help="recorded tool outputs")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc memory pass")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+
+    # Scripts for the largest level; every level uses a prefix of them
+    scripts = [conversation_script(index) for index in range(max(levels))]
+    plans = {message: calls for script in scripts for message, calls in script}
+    agent = build_agent(plans, args.llm_latency, args.tool_latency_scale, args.replays)
+
+    # Warm-up: builds the executors and imports everything outside the measured levels
+    run_level(agent, scripts[:1])
+    results = [run_level(agent, scripts[:level], args.think_time)[0] for level in levels]
+    saturation = find_saturation(results)
+    memory = None if args.no_memory else measure_memory(agent, scripts[:max(levels)], args.think_time)
+
+    if args.json:
+        print(json.dumps({
+            "levels": [result.as_dict() for result in results],
+            "saturation_sessions": saturation.sessions if saturation else None,
+            "memory": memory.as_dict() if memory else None,
+        }, indent=2))
+        return
+
+    print("📈 AI Travel Agent Capacity Report")
+    print(f"LLM latency {args.llm_latency}s, tool latency x{args.tool_latency_scale}, think time {args.think_time}s")
+    print("=" * 72)
+    print(f"{'Sessions':>8}{'Turns':>7}{'Errors':>8}{'Turns/s':>10}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}")
+    print("-" * 72)
+    for result in results:
+        latency = latency_summary(result.latencies)
+        print(f"{result.sessions:>8}{result.turns:>7}{result.errors:>8}{result.throughput():>10.2f}"
+              f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}")
+    print()
+    if saturation:
+        print(f"🚧 Throughput stops scaling after {saturation.sessions} concurrent sessions "
+              f"(~{saturation.throughput():.2f} turns/s)")
+    else:
+        print(f"✅ Throughput was still scaling at {levels[-1]} sessions; try higher levels")
+    if memory:
+        print(f"💾 Memory per session: {memory.retained_bytes / 1024:.1f} KB retained after "
+              f"{len(scripts[0])} turns, {memory.peak_bytes / 1024:.1f} KB at peak while running "
+              f"({memory.sessions} sessions under tracemalloc)")
+
+
+if __name__ == "__main__":
+    main()
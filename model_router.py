@@ -0,0 +1,235 @@
+"""
+Model tiering for the AI Travel Agent
+Routes simple turns (confirmations, option picks, single lookups) to a fast,
+cheap model and planning turns to a more capable one, and keeps per-tier
+latency and token metrics.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+FAST_TIER = "fast"
+CAPABLE_TIER = "capable"
+
+DEFAULT_FAST_MODEL = "gpt-3.5-turbo"
+DEFAULT_CAPABLE_MODEL = "gpt-4o"
+
+# Keyword patterns used to detect what the user is asking for
+INTENT_PATTERNS = {
+    "flights": re.compile(r"\b(flights?|fly|flying|airlines?|airports?|round[- ]trip)\b", re.IGNORECASE),
+    "hotels": re.compile(r"\b(hotels?|stay|accommodations?|lodging|rooms?)\b", re.IGNORECASE),
+    "weather": re.compile(r"\b(weather|forecast|temperature|rain|sunny)\b", re.IGNORECASE),
+    "recommendations": re.compile(r"\b(recommend\w*|attractions?|restaurants?|things to do|activities|sightseeing)\b", re.IGNORECASE),
+    "booking": re.compile(r"\b(book|booking|reserve|reservation)\b", re.IGNORECASE),
+    "planning": re.compile(r"\b(plan|planning|itinerary|trip|vacation|getaway|holiday|budget)\b", re.IGNORECASE),
+    "summary": re.compile(r"\b(summary|summarize|overview|recap)\b", re.IGNORECASE),
+}
+
+# Intents that map onto a tool call
+TOOL_INTENTS = {"flights", "hotels", "weather", "recommendations", "booking"}
+
+# Intents that always need the capable model
+PLANNING_INTENTS = {"planning", "summary"}
+
+# Short replies such as "2", "option 3", "yes please" or "thanks"
+SELECTION_PATTERN = re.compile(r"^\s*(option\s*|#)?\d{1,2}\s*[.!]?\s*$", re.IGNORECASE)
+CONFIRMATION_PATTERN = re.compile(
+    r"^\s*(yes|yeah|yep|sure|ok|okay|no|nope|thanks|thank you|great|perfect|sounds good)\b[\s\w!.,]{0,20}$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class TurnFeatures:
+    """Local features of a user turn used for routing"""
+    length: int
+    word_count: int
+    intents: List[str]
+    tool_intents: List[str]
+    is_selection: bool
+    is_confirmation: bool
+
+
+def extract_turn_features(message: str) -> TurnFeatures:
+    """Extract routing features from a user message without calling any model"""
+    text = message or ""
+    intents = [name for name, pattern in INTENT_PATTERNS.items() if pattern.search(text)]
+    return TurnFeatures(
+        length=len(text),
+        word_count=len(text.split()),
+        intents=intents,
+        tool_intents=[name for name in intents if name in TOOL_INTENTS],
+        is_selection=bool(SELECTION_PATTERN.match(text)),
+        is_confirmation=bool(CONFIRMATION_PATTERN.match(text)),
+    )
+
+
+@dataclass
+class TierMetrics:
+    """Accumulated latency and token usage for one model tier"""
+    calls: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_latency": round(self.avg_latency, 3),
+            "max_latency": round(self.max_latency, 3),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+
+@lru_cache(maxsize=None)
+def _usage_handler_class():
+    """Define the usage callback on first use so importing this module does not load LangChain"""
+    from langchain.callbacks.base import BaseCallbackHandler
+
+    class UsageCallbackHandler(BaseCallbackHandler):
+        """Collects token usage reported by every LLM call made during one agent run"""
+
+        def __init__(self):
+            super().__init__()
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.llm_calls = 0
+
+        @property
+        def total_tokens(self) -> int:
+            return self.prompt_tokens + self.completion_tokens
+
+        def on_llm_end(self, response, **kwargs: Any) -> None:
+            self.llm_calls += 1
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            if token_usage:
+                self.prompt_tokens += token_usage.get("prompt_tokens", 0) or 0
+                self.completion_tokens += token_usage.get("completion_tokens", 0) or 0
+                return
+            # Newer chat models report usage on the message instead of llm_output
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    self.prompt_tokens += usage.get("input_tokens", 0) or 0
+                    self.completion_tokens += usage.get("output_tokens", 0) or 0
+
+    return UsageCallbackHandler
+
+
+def new_usage_handler():
+    """Create a callback that collects token usage for one agent run"""
+    return _usage_handler_class()()
+
+
+def __getattr__(name: str):
+    if name == "UsageCallbackHandler":
+        return _usage_handler_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _follows_planning(chat_history: Optional[List]) -> bool:
+    """Whether the latest user message in the history was a planning request"""
+    for past in reversed(chat_history or []):
+        if getattr(past, "type", None) == "human":
+            return any(intent in PLANNING_INTENTS for intent in extract_turn_features(past.content).intents)
+    return False
+
+
+class ModelRouter:
+    """Picks a model tier for each turn and records per-tier metrics.
+
+    Any LangChain chat model can be plugged into either tier, so tests and
+    offline runs can swap in local stand-ins for the OpenAI models.
+    """
+
+    def __init__(self, fast_llm, capable_llm, max_fast_words: int = 25, max_fast_tool_intents: int = 1):
+        self.models = {FAST_TIER: fast_llm, CAPABLE_TIER: capable_llm}
+        self.max_fast_words = max_fast_words
+        self.max_fast_tool_intents = max_fast_tool_intents
+        self._metrics = {tier: TierMetrics() for tier in self.models}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str] = None) -> "ModelRouter":
+        """Build a router around ChatOpenAI models named by environment variables"""
+        from langchain_openai import ChatOpenAI
+
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable is required")
+
+        fast_model = os.getenv("TRAVEL_AGENT_FAST_MODEL", DEFAULT_FAST_MODEL)
+        capable_model = os.getenv("TRAVEL_AGENT_CAPABLE_MODEL", DEFAULT_CAPABLE_MODEL)
+        fast_llm = ChatOpenAI(model=fast_model, temperature=0.7, api_key=api_key)
+        capable_llm = fast_llm if capable_model == fast_model else ChatOpenAI(
+            model=capable_model, temperature=0.7, api_key=api_key
+        )
+        return cls(
+            fast_llm,
+            capable_llm,
+            max_fast_words=int(os.getenv("TRAVEL_AGENT_MAX_FAST_WORDS", "25")),
+        )
+
+    @property
+    def fast_llm(self):
+        return self.models[FAST_TIER]
+
+    @property
+    def capable_llm(self):
+        return self.models[CAPABLE_TIER]
+
+    def classify(self, message: str, chat_history: Optional[List] = None) -> str:
+        """Return the tier that should handle this turn"""
+        features = extract_turn_features(message)
+
+        # "ok plan it" is a planning turn even though it starts like a confirmation
+        if any(intent in PLANNING_INTENTS for intent in features.intents):
+            return CAPABLE_TIER
+        # Picking an option or confirming is cheap, unless it answers a planning turn
+        if features.is_selection or features.is_confirmation:
+            return CAPABLE_TIER if _follows_planning(chat_history) else FAST_TIER
+        if len(features.tool_intents) > self.max_fast_tool_intents:
+            return CAPABLE_TIER
+        if features.word_count > self.max_fast_words:
+            return CAPABLE_TIER
+        return FAST_TIER
+
+    def llm_for(self, tier: str):
+        return self.models[tier]
+
+    def model_name(self, tier: str) -> str:
+        llm = self.models[tier]
+        return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+    def record(self, tier: str, latency: float, prompt_tokens: int = 0, completion_tokens: int = 0, error: bool = False):
+        """Record the outcome of one routed turn"""
+        with self._lock:
+            metrics = self._metrics[tier]
+            metrics.calls += 1
+            metrics.errors += int(error)
+            metrics.total_latency += latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+            metrics.prompt_tokens += prompt_tokens
+            metrics.completion_tokens += completion_tokens
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of per-tier metrics"""
+        with self._lock:
+            return {tier: metrics.as_dict() for tier, metrics in self._metrics.items()}
@@ -0,0 +1,55 @@
+import streamlit as st
+from datetime import datetime
+from usage_tracking import usage_ledger
+
+st.set_page_config(page_title="AI Travel Agent - Metrics", page_icon="📊", layout="wide")
+
+st.title("📊 Usage Metrics")
+st.caption("Token and cost totals across all sessions served by this process")
+
+snapshot = usage_ledger.snapshot()
+overall = snapshot["overall"]
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Sessions", overall["sessions"])
+col2.metric("Chat Turns", overall["turns"])
+col3.metric("Total Tokens", f"{overall['prompt_tokens'] + overall['completion_tokens']:,}")
+col4.metric("Estimated Cost", f"${overall['cost']:.4f}")
+
+st.markdown("---")
+st.header("🤖 By Model")
+if snapshot["by_model"]:
+    st.dataframe([
+        {
+            "Model": model,
+            "Turns": totals["turns"],
+            "Prompt Tokens": totals["prompt_tokens"],
+            "Completion Tokens": totals["completion_tokens"],
+            "Cost ($)": round(totals["cost"], 4),
+        }
+        for model, totals in snapshot["by_model"].items()
+    ], use_container_width=True)
+else:
+    st.info("No chat turns recorded yet.")
+
+st.header("👥 By Session")
+st.caption("The most recently active sessions")
+if snapshot["sessions"]:
+    st.dataframe([
+        {
+            "Session": session_id[:8],
+            "Turns": totals["turns"],
+            "Total Tokens": totals["prompt_tokens"] + totals["completion_tokens"],
+            "Cost ($)": round(totals["cost"], 4),
+            "Last Active": datetime.fromtimestamp(totals["last_seen"]).strftime("%H:%M:%S") if totals["last_seen"] else "",
+        }
+        for session_id, totals in sorted(snapshot["sessions"].items(), key=lambda item: -item[1]["cost"])
+    ], use_container_width=True)
+
+# Per-tier latency for the shared agent runtime
+agent = st.session_state.get("agent")
+if agent is not None:
+    st.header("⚡ Model Tiers")
+    st.dataframe([
+        {"Tier": tier, **metrics} for tier, metrics in agent.get_model_metrics().items()
+    ], use_container_width=True)
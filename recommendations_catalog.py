@@ -0,0 +1,176 @@
+"""
+Curated recommendations catalog
+Attractions, restaurants and activities per city, tagged with interests and
+loaded once into flat arrays so ranking against the requested interests is a
+single vectorized pass over the city's slice, followed by top-k selection.
+"""
+
+import importlib.util
+import json
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from text_index import normalize
+from travel_data import DATA_DIR
+
+# Optional numpy for vectorized ranking, imported on first use so loading this module stays cheap
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    import numpy
+    return numpy
+
+
+CATEGORIES = ("attraction", "restaurant", "activity")
+
+# How many items each section shows
+SECTION_LIMITS = {"attraction": 5, "restaurant": 3, "activity": 3}
+
+# Words users type for interests -> catalog tags
+INTEREST_SYNONYMS = {
+    "general": [],
+    "culture": ["culture", "history", "art", "museum"],
+    "cultural": ["culture", "history", "art", "museum"],
+    "museums": ["museum", "art"],
+    "food": ["food", "market", "wine"],
+    "foodie": ["food", "fine-dining", "market"],
+    "dining": ["food", "fine-dining", "casual-dining"],
+    "restaurants": ["food", "fine-dining", "casual-dining"],
+    "cheap": ["budget"],
+    "adventure": ["adventure", "hiking", "outdoors"],
+    "outdoors": ["outdoors", "nature", "hiking"],
+    "outdoor": ["outdoors", "nature", "hiking"],
+    "nature": ["nature", "outdoors"],
+    "shopping": ["shopping", "market", "luxury"],
+    "nightlife": ["nightlife", "entertainment"],
+    "romance": ["romantic"],
+    "kids": ["family"],
+    "beaches": ["beach", "water"],
+    "ski": ["winter-sports"],
+    "skiing": ["winter-sports"],
+    "relaxing": ["relaxation"],
+    "sightseeing": ["landmark", "views", "architecture"],
+}
+
+# Weight of the catalog's popularity score relative to one matching tag
+POPULARITY_WEIGHT = 0.1
+
+_INTEREST_SPLIT = re.compile(r"[,;/&]|\band\b|\s+")
+
+
+class RecommendationCatalog:
+    """Column-oriented store of tagged recommendations for every catalog city"""
+
+    def __init__(self, tags: Sequence[str], cities: Dict[str, dict]):
+        self.tags = list(tags)
+        self.tag_ids = {tag: i for i, tag in enumerate(self.tags)}
+        self.city_names: Dict[str, str] = {}
+        self.city_slices: Dict[str, Tuple[int, int]] = {}
+        self.tips: Dict[str, Tuple[str, ...]] = {}
+
+        names: List[str] = []
+        categories: List[int] = []
+        tag_rows: List[List[int]] = []
+        popularity: List[float] = []
+        # Items of one city are stored contiguously so a city is a single slice
+        for city, data in cities.items():
+            key = normalize(city)
+            start = len(names)
+            for name, category, item_tags, score in data["items"]:
+                names.append(name)
+                categories.append(CATEGORIES.index(category))
+                tag_rows.append([self.tag_ids[tag] for tag in item_tags])
+                popularity.append(score)
+            self.city_names[key] = city
+            self.city_slices[key] = (start, len(names))
+            self.tips[key] = tuple(data.get("tips", ()))
+
+        self.names = names
+        if NUMPY_AVAILABLE:
+            np = _numpy()
+            self.categories = np.array(categories, dtype=np.int8)
+            self.popularity = np.array(popularity, dtype=np.float32)
+            self.tag_matrix = np.zeros((len(names), len(self.tags)), dtype=np.float32)
+            for row, tag_ids in enumerate(tag_rows):
+                self.tag_matrix[row, tag_ids] = 1.0
+        else:
+            self.categories = categories
+            self.popularity = popularity
+            self.tag_sets = [set(tag_ids) for tag_ids in tag_rows]
+
+    @classmethod
+    def load(cls) -> "RecommendationCatalog":
+        with open(DATA_DIR / "recommendations_catalog.json", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["tags"], data["cities"])
+
+    def interest_tags(self, interests: str) -> List[int]:
+        """Tag ids for a free-form interests string such as 'food and culture'"""
+        tag_ids = set()
+        for word in _INTEREST_SPLIT.split(normalize(interests or "")):
+            if not word:
+                continue
+            for tag in INTEREST_SYNONYMS.get(word, [word]):
+                if tag in self.tag_ids:
+                    tag_ids.add(self.tag_ids[tag])
+        return sorted(tag_ids)
+
+    def _scores(self, start: int, end: int, tag_ids: List[int]):
+        if NUMPY_AVAILABLE:
+            scores = self.popularity[start:end] * POPULARITY_WEIGHT
+            if tag_ids:
+                scores = scores + self.tag_matrix[start:end, tag_ids].sum(axis=1)
+            return scores
+        wanted = set(tag_ids)
+        return [
+            len(self.tag_sets[i] & wanted) + self.popularity[i] * POPULARITY_WEIGHT
+            for i in range(start, end)
+        ]
+
+    def _top_k(self, scores, start: int, category: int, k: int) -> List[str]:
+        if NUMPY_AVAILABLE:
+            np = _numpy()
+            candidates = np.flatnonzero(self.categories[start:start + len(scores)] == category)
+            if len(candidates) > k:
+                # Partial selection first, then sort only the k winners
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [self.names[start + i] for i in ordered]
+        ranked = sorted(
+            (i for i in range(len(scores)) if self.categories[start + i] == category),
+            key=lambda i: -scores[i],
+        )
+        return [self.names[start + i] for i in ranked[:k]]
+
+    def city_key(self, city: str) -> Optional[str]:
+        from city_index import lookup_city
+
+        key = lookup_city(city)
+        return key if key in self.city_slices else None
+
+    def recommend(self, city: str, interests: str = "general") -> Optional[Dict[str, List[str]]]:
+        """Top attractions, restaurants and activities for a city, ranked by interests"""
+        key = self.city_key(city)
+        if key is None:
+            return None
+        start, end = self.city_slices[key]
+        scores = self._scores(start, end, self.interest_tags(interests))
+        return {
+            "attractions": self._top_k(scores, start, 0, SECTION_LIMITS["attraction"]),
+            "restaurants": self._top_k(scores, start, 1, SECTION_LIMITS["restaurant"]),
+            "activities": self._top_k(scores, start, 2, SECTION_LIMITS["activity"]),
+            "tips": list(self.tips[key]),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_catalog() -> RecommendationCatalog:
+    return RecommendationCatalog.load()
+
+
+def get_curated_recommendations(city: str, interests: str = "general") -> Optional[Dict[str, List[str]]]:
+    """Curated recommendations for a city, or None if the city is not in the catalog"""
+    return get_catalog().recommend(city, interests)
@@ -0,0 +1,336 @@
+"""
+Conversation sessions shared by the Streamlit app and the API server
+A session holds what one conversation needs between turns: the transcript,
+its usage budget and the itinerary the tools record into. The transcript is
+kept once, as plain role/content messages; the UI renders that list and the
+LangChain history for a turn is derived from it on demand.
+
+Sessions live in a SessionStore. SQLiteSessionStore appends each finished
+exchange to a log on disk and loads sessions lazily, so conversations survive
+restarts and processes sharing the database see the same sessions (a save
+based on an outdated copy raises SessionConflictError instead of losing
+either write); InMemorySessionStore keeps them in this process only.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from disk_cache import CACHE_DIR
+from itinerary import Itinerary
+from usage_tracking import RECENT_TURNS, SessionUsage, TurnUsage, usage_ledger
+
+# Sessions kept in memory by either store; the least recently used are dropped first
+MAX_SESSIONS = int(os.getenv("TRAVEL_AGENT_MAX_SESSIONS", "1000"))
+
+# "sqlite" (persistent) or "memory"
+SESSION_STORE = os.getenv("TRAVEL_AGENT_SESSION_STORE", "sqlite")
+SESSION_DB_PATH = Path(os.getenv("TRAVEL_AGENT_SESSION_DB", CACHE_DIR / "sessions.sqlite3"))
+
+# Logged messages at least this long are stored zlib-compressed (tool-heavy replies shrink 3-4x)
+COMPRESS_MIN_CHARS = 512
+
+
+@dataclass
+class ChatSession:
+    """Transcript, usage and itinerary of one conversation"""
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    # {"role": "user" | "assistant", "content": str}, oldest first, one user message and its
+    # reply per exchange. Replies flagged "notice" (errors, cancellations) are shown but not
+    # sent back to the model.
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    usage: SessionUsage = field(default_factory=SessionUsage)
+    itinerary: Itinerary = field(default_factory=Itinerary)
+    updated_at: float = field(default_factory=time.time)
+    # Saves of this session its store has seen; lets a shared store spot writes from other processes
+    version: int = 0
+
+    def __post_init__(self):
+        # Usage totals are reported per session id
+        self.usage.session_id = self.session_id
+
+    def chat_history(self) -> List:
+        """The transcript as LangChain messages for TravelAgent.chat"""
+        if not self.messages:
+            return []
+        from langchain.schema import AIMessage, HumanMessage
+        history = []
+        for user, reply in zip(self.messages[::2], self.messages[1::2]):
+            if not reply.get("notice"):
+                history += [HumanMessage(content=user["content"]), AIMessage(content=reply["content"])]
+        return history
+
+    def add_exchange(self, user_message: str, response: str, notice: bool = False):
+        self.messages.append({"role": "user", "content": user_message})
+        reply = {"role": "assistant", "content": response}
+        if notice:
+            reply["notice"] = True
+        self.messages.append(reply)
+        self.updated_at = time.time()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "messages": self.messages,
+            "usage": self.usage.as_dict(),
+            "itinerary": self.itinerary.to_dict(),
+        }
+
+
+class SessionConflictError(RuntimeError):
+    """The session was changed elsewhere since this copy of it was loaded"""
+
+
+class SessionStore(ABC):
+    """Where sessions live between requests; subclasses decide how and where"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """The stored session, or None"""
+
+    @abstractmethod
+    def save(self, session: ChatSession):
+        """Store a new or updated session"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Drop a session; False if there was none"""
+
+    def get_or_create(self, session_id: Optional[str] = None) -> ChatSession:
+        """The stored session, or a new one (keeping the caller's id if given)"""
+        session = self.get(session_id) if session_id else None
+        if session is None:
+            session = ChatSession(session_id) if session_id else ChatSession()
+            self.save(session)
+        return session
+
+
+class InMemorySessionStore(SessionStore):
+    """Sessions in this process only, bounded to the most recently used max_sessions"""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def save(self, session: ChatSession):
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> bool:
+        usage_ledger.forget(session_id)
+        return self.discard(session_id)
+
+    def discard(self, session_id: str) -> bool:
+        """Drop a session from memory only, keeping its usage in the ledger"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    version INTEGER NOT NULL,
+    message_count INTEGER NOT NULL,
+    turn_count INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content BLOB NOT NULL,
+    compressed INTEGER NOT NULL DEFAULT 0,
+    notice INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS usage_turns (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    turn TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+def _encode_content(content: str):
+    if len(content) < COMPRESS_MIN_CHARS:
+        return content, 0
+    return zlib.compress(content.encode("utf-8")), 1
+
+
+def _decode_content(content, compressed: int) -> str:
+    return zlib.decompress(content).decode("utf-8") if compressed else content
+
+
+def _session_state(session: ChatSession) -> str:
+    """Usage totals and itinerary: the small part of a session that is rewritten every turn"""
+    usage = session.usage
+    return json.dumps({
+        "usage": {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens,
+                  "cost": usage.cost},
+        "itinerary": session.itinerary.to_dict(),
+    })
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a SQLite database: append-only message and usage logs plus per-session state.
+
+    save() writes only the messages and usage turns added since the last save
+    and rewrites the state row (totals and itinerary), so a turn costs a few
+    small rows whatever the length of the conversation. Sessions are read from
+    disk on first use and the most recently used max_sessions stay loaded.
+
+    Every save bumps the session's version. get() reloads a loaded session
+    whose stored version has moved on (another process saved it), and save()
+    refuses a copy that is not the latest with SessionConflictError.
+    """
+
+    def __init__(self, path: Path = SESSION_DB_PATH, max_sessions: int = MAX_SESSIONS):
+        self.path = Path(path)
+        self._loaded = InMemorySessionStore(max_sessions)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation keeps the store safe to share across threads
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self, session_id: str) -> Optional[ChatSession]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT updated_at, version, turn_count, state FROM sessions WHERE session_id = ?",
+                               (session_id,)).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute("SELECT role, content, compressed, notice FROM messages WHERE session_id = ? "
+                                "ORDER BY seq", (session_id,)).fetchall()
+            # Only the recent per-turn records are kept in memory; the totals are in the state row
+            turns = conn.execute("SELECT turn FROM usage_turns WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                                 (session_id, RECENT_TURNS)).fetchall()
+        updated_at, version, turn_count, state = row
+        state = json.loads(state)
+        usage_state = state["usage"]
+        usage = SessionUsage(session_id=session_id,
+                             turns=[TurnUsage(**json.loads(turn)) for turn, in reversed(turns)],
+                             turn_count=turn_count, prompt_tokens=usage_state["prompt_tokens"],
+                             completion_tokens=usage_state["completion_tokens"], cost=usage_state["cost"])
+        messages = []
+        for role, content, compressed, notice in rows:
+            message = {"role": role, "content": _decode_content(content, compressed)}
+            if notice:
+                message["notice"] = True
+            messages.append(message)
+        return ChatSession(session_id, messages, usage, Itinerary.from_dict(state["itinerary"]), updated_at,
+                           version)
+
+    def _stored_version(self, session_id: str) -> Optional[int]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        # One primary-key read tells whether the loaded copy is still the latest
+        version = self._stored_version(session_id)
+        with self._lock:
+            session = self._loaded.get(session_id)
+            if version is None:
+                self._loaded.discard(session_id)
+                return None
+            if session is None or session.version != version:
+                session = self._load(session_id)
+                if session is None:
+                    self._loaded.discard(session_id)
+                else:
+                    self._loaded.save(session)
+        return session
+
+    def save(self, session: ChatSession):
+        with self._lock:
+            with self._connect() as conn:
+                # Take the write lock before reading, so two processes cannot both pass the check
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT version, message_count, turn_count FROM sessions WHERE session_id = ?",
+                                   (session.session_id,)).fetchone()
+                version, logged, logged_turns = row or (0, 0, 0)
+                if version != session.version:
+                    self._loaded.discard(session.session_id)
+                    raise SessionConflictError(f"Session {session.session_id} was changed elsewhere; "
+                                               "load it again before adding to it")
+                if len(session.messages) < logged:
+                    raise ValueError(f"Session {session.session_id} has fewer messages than its log; "
+                                     "start a new session instead of rewriting one")
+                conn.executemany(
+                    "INSERT INTO messages (session_id, seq, role, content, compressed, notice) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(session.session_id, seq, message["role"], *_encode_content(message["content"]),
+                      int(bool(message.get("notice"))))
+                     for seq, message in enumerate(session.messages[logged:], logged)],
+                )
+                # usage.turns holds the latest turns only; log those recorded since the last save
+                usage = session.usage
+                new_turns = usage.turns[len(usage.turns) - min(usage.turn_count - logged_turns, len(usage.turns)):]
+                conn.executemany(
+                    "INSERT INTO usage_turns (session_id, seq, turn) VALUES (?, ?, ?)",
+                    [(session.session_id, seq, json.dumps(asdict(turn)))
+                     for seq, turn in enumerate(new_turns, usage.turn_count - len(new_turns))],
+                )
+                conn.execute(
+                    "INSERT INTO sessions (session_id, created_at, updated_at, version, message_count, turn_count, "
+                    "state) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(session_id) DO UPDATE SET "
+                    "updated_at = excluded.updated_at, version = excluded.version, "
+                    "message_count = excluded.message_count, turn_count = excluded.turn_count, state = excluded.state",
+                    (session.session_id, time.time(), session.updated_at, version + 1, len(session.messages),
+                     usage.turn_count, _session_state(session)),
+                )
+            session.version = version + 1
+            self._loaded.save(session)
+
+    def delete(self, session_id: str) -> bool:
+        usage_ledger.forget(session_id)
+        with self._lock:
+            self._loaded.discard(session_id)
+            with self._connect() as conn:
+                conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM usage_turns WHERE session_id = ?", (session_id,))
+                deleted = conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+        return deleted > 0
+
+
+def create_session_store() -> SessionStore:
+    """The store chosen by TRAVEL_AGENT_SESSION_STORE"""
+    if SESSION_STORE == "memory":
+        return InMemorySessionStore()
+    return SQLiteSessionStore()
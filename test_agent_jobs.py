@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the background chat job executor
+Runs plain functions as jobs, so no LLM or API keys are needed
+"""
+
+import threading
+
+from agent_jobs import CANCELLED, DONE, FAILED, JobCancelled, JobExecutor, JobLimitError
+
+def wait(job, timeout=5):
+    if not job.future.cancelled():
+        job.future.exception(timeout=timeout)
+    assert job.finished
+
+def test_job_lifecycle():
+    """Jobs run on the pool and report their progress to the session's events"""
+    print("🧪 Testing job lifecycle...")
+    executor = JobExecutor(max_workers=2)
+    try:
+        def turn(job):
+            job.emit("tool_start", "search_flights_amadeus")
+            return "Here are your flights"
+
+        job = executor.submit("s1", turn, description="flights to Paris")
+        wait(job)
+        assert job.status == DONE and job.result == "Here are your flights"
+        kinds = [event.kind for event in executor.events("s1", job_id=job.id)]
+        assert kinds == ["queued", "running", "tool_start", "done"]
+        last_seq = executor.events("s1")[-1].seq
+        assert executor.events("s1", after=last_seq) == []
+
+        failing = executor.submit("s1", lambda job: 1 / 0)
+        wait(failing)
+        assert failing.status == FAILED and isinstance(failing.error, ZeroDivisionError)
+
+        executor.forget(job.id)
+        executor.forget(failing.id)
+        assert executor.get(job.id) is None and executor.events("s1") == []
+    finally:
+        executor.shutdown()
+    print("✅ Job lifecycle working correctly")
+
+def test_job_limits_and_cancellation():
+    """Sessions are limited to one turn at a time and running turns stop when cancelled"""
+    print("🧪 Testing job limits and cancellation...")
+    executor = JobExecutor(max_workers=1, max_queued=1, max_per_session=1)
+    started = threading.Event()
+    try:
+        def slow_turn(job):
+            started.set()
+            # A tool boundary: the callback handler checks for cancellation the same way
+            while True:
+                job.cancel_requested.wait(0.01)
+                job.check_cancelled()
+
+        running = executor.submit("s1", slow_turn)
+        started.wait(5)
+        try:
+            executor.submit("s1", lambda job: "second")
+            assert False, "a second concurrent turn should be rejected"
+        except JobLimitError:
+            pass
+
+        queued = executor.submit("s2", lambda job: "never runs")
+        try:
+            executor.submit("s3", lambda job: "no room")
+            assert False, "the executor queue should be full"
+        except JobLimitError:
+            pass
+
+        assert executor.cancel(queued.id)
+        assert queued.status == CANCELLED
+        assert executor.cancel(running.id)
+        wait(running)
+        assert running.status == CANCELLED
+        assert not executor.cancel(running.id)
+
+        # A turn that swallows JobCancelled (as TravelAgent.chat does) is still cancelled
+        def swallowing_turn(job):
+            job.cancel_requested.wait(5)
+            try:
+                job.check_cancelled()
+            except JobCancelled:
+                return "I encountered an error"
+
+        swallowed = executor.submit("s1", swallowing_turn)
+        executor.cancel(swallowed.id)
+        wait(swallowed)
+        assert swallowed.status == CANCELLED and swallowed.result is None
+    finally:
+        executor.shutdown()
+    print("✅ Job limits and cancellation working correctly")
+
+if __name__ == "__main__":
+    test_job_lifecycle()
+    test_job_limits_and_cancellation()
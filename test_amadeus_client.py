@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared Amadeus client helpers
+Replays canned API responses, so no Amadeus credentials are needed
+"""
+
+import json
+import time
+from datetime import date, timedelta
+
+from amadeus_client import AmadeusClient, AmadeusError, RateLimiter, TTLCache
+from currency import CurrencyConverter, RateTable, format_money, normalize_currency
+from flight_ranking import TopK, duration_minutes, rank_offers
+from flight_search import airports_around, flexible_date_search, format_price_matrix, nearby_airports_search
+from hotel_pricing import price_hotels
+import json_codec
+from json_codec import project
+
+class ReplayClient(AmadeusClient):
+    """AmadeusClient that answers GET requests from a function instead of the network"""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.requests = []
+        self.cache = TTLCache()
+        self.rate_limiter = RateLimiter(1000)
+        self.max_concurrency = 4
+
+    def get(self, path, params, cache_ttl=0, fields=None):
+        self.rate_limiter.acquire()
+        self.requests.append((path, dict(params)))
+        payload = self.responder(path, params)
+        return project(payload, fields) if fields else payload
+
+def hotel_offers(path, params):
+    hotel_ids = params["hotelIds"].split(",")
+    if hotel_ids == ["SOLDOUT"]:
+        raise AmadeusError(400, "NO ROOMS AVAILABLE AT REQUESTED PROPERTY")
+    data = []
+    for i, hotel_id in enumerate(hotel_ids):
+        if hotel_id.startswith("FULL"):
+            continue
+        data.append({
+            "hotel": {"hotelId": hotel_id},
+            "available": True,
+            "offers": [
+                {"price": {"currency": "EUR", "total": str(300 + i)}},
+                {"price": {"currency": "EUR", "total": str(200 + i)},
+                 "room": {"typeEstimated": {"category": "DOUBLE_ROOM"}}},
+            ],
+        })
+    return {"data": data}
+
+def test_ttl_cache():
+    """Entries expire after their TTL and the oldest entries are evicted first"""
+    print("🧪 Testing TTL cache...")
+
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", None, ttl=60)
+    assert cache.get("a") == 1
+    assert "b" in cache and cache.get("b", "missing") is None
+    cache.set("c", 3, ttl=60)
+    assert "a" not in cache and "b" in cache
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+    print("✅ TTL cache working correctly")
+
+def test_bulk_hotel_pricing():
+    """Hotels are priced in batches, unavailable hotels are recorded and prices are cached"""
+    print("🧪 Testing bulk hotel pricing...")
+
+    client = ReplayClient(hotel_offers)
+    hotel_ids = [f"H{i:03d}" for i in range(45)] + ["FULL1"]
+    prices = price_hotels(client, hotel_ids, "2025-03-15", "2025-03-19", adults=2)
+
+    # 46 hotels at 20 per request -> 3 offers requests
+    assert len(client.requests) == 3
+    assert all(len(params["hotelIds"].split(",")) <= 20 for _, params in client.requests)
+    assert prices["H000"].total == 200 and prices["H000"].per_night == 50
+    assert prices["H000"].currency == "EUR" and prices["H000"].room == "Double Room"
+    assert prices["FULL1"] is None
+
+    # Same hotels and dates: answered from the cache without new requests
+    assert price_hotels(client, hotel_ids[:10], "2025-03-15", "2025-03-19", adults=2)["H001"].total == 201
+    assert len(client.requests) == 3
+    # Different guests are a different cache entry
+    price_hotels(client, ["H000"], "2025-03-15", "2025-03-19", adults=1)
+    assert len(client.requests) == 4
+
+    assert price_hotels(client, ["SOLDOUT"], "2025-03-15", "2025-03-19") == {"SOLDOUT": None}
+    print("✅ Bulk hotel pricing working correctly")
+
+def flight_offers(path, params):
+    departure = date.fromisoformat(params["departureDate"])
+    stay = (date.fromisoformat(params["returnDate"]) - departure).days
+    if stay == 1:
+        raise AmadeusError(500, "upstream timeout")
+    if stay == 2:
+        return {"data": []}
+    # Cheapest on a Tuesday departure with a one-week stay
+    price = 400 + 25 * abs(departure.weekday() - 1) + 10 * abs(stay - 7)
+    segment = {
+        "departure": {"iataCode": params["originLocationCode"], "at": f"{params['departureDate']}T09:00:00"},
+        "arrival": {"iataCode": params["destinationLocationCode"], "at": f"{params['departureDate']}T21:00:00"},
+        "carrierCode": "BA",
+        "number": "178",
+    }
+    return {"data": [
+        {"price": {"total": f"{price + 50}.00"}, "itineraries": [{"segments": [segment]}]},
+        {"price": {"total": f"{price}.00"}, "itineraries": [{"segments": [segment]}]},
+    ]}
+
+def test_flexible_date_search():
+    """Every date pair is searched once and the matrix reports the cheapest combination"""
+    print("🧪 Testing flexible date search...")
+
+    client = ReplayClient(flight_offers)
+    departure = date.today() + timedelta(days=60)
+    result = flexible_date_search(client, "JFK", "LHR", departure.isoformat(),
+                                  (departure + timedelta(days=5)).isoformat(),
+                                  departure_flex=2, return_flex=2)
+
+    assert len(result.departure_dates) == len(result.return_dates) == 5
+    assert len(client.requests) == len(result.prices) + result.failed
+    assert result.failed > 0 and None in result.prices.values()
+
+    (best_dep, best_ret), best_price = result.cheapest(1)[0]
+    assert best_price == min(price for price in result.prices.values() if price is not None)
+    assert result.best_offers[(best_dep, best_ret)]["price"]["total"] == f"{best_price:.0f}.00"
+
+    table = format_price_matrix(result, "USD")
+    assert f"**{best_price:,.0f}**" in table and "?" in table
+    print("✅ Flexible date search working correctly")
+
+def test_nearby_airport_search():
+    """Every nearby airport pair is searched once and the offers are merged by price"""
+    print("🧪 Testing nearby airport search...")
+
+    origins = [code for code, _ in airports_around("JFK", 40)]
+    assert origins[0] == "JFK" and set(origins) == {"JFK", "LGA", "EWR"}
+    destinations = [code for code, _ in airports_around("London", 50)]
+    assert "LHR" in destinations and len(destinations) == 3
+
+    fares = {"EWR": 380, "JFK": 450, "LGA": 520}
+
+    def responder(path, params):
+        if params["originLocationCode"] == "LGA" and params["destinationLocationCode"] == "LCY":
+            raise AmadeusError(500, "upstream timeout")
+        price = fares[params["originLocationCode"]] + len(params["destinationLocationCode"]) * 10
+        return {"data": [{"price": {"total": f"{price}.00"}, "itineraries": [{"segments": []}]}]}
+
+    client = ReplayClient(responder)
+    result = nearby_airports_search(client, origins, destinations, "2025-03-15", "2025-03-22")
+    assert len(client.requests) == len(result.searched) == 9
+    assert result.failed == [("LGA", "LCY")]
+    assert len(result.offers) == 8
+    assert result.offers[0][1] == "EWR"
+    prices = [float(offer["price"]["total"]) for offer, _, _ in result.offers]
+    assert prices == sorted(prices)
+    print("✅ Nearby airport search working correctly")
+
+def make_offer(price, hours, stops):
+    segments = [{"carrierCode": "BA", "number": str(100 + i)} for i in range(stops + 1)]
+    return {"price": {"total": f"{price:.2f}"},
+            "itineraries": [{"duration": f"PT{hours}H", "segments": segments}]}
+
+def test_flight_ranking():
+    """Streaming ranking keeps the k best offers and the price/duration frontier"""
+    print("🧪 Testing flight ranking...")
+
+    assert duration_minutes("PT7H30M") == 450 and duration_minutes("P1DT2H") == 1560
+    assert duration_minutes("") == 0
+
+    top = TopK(2)
+    for key, item in [((3,), "c"), ((1,), "a"), ((2,), "b"), ((1,), "a2")]:
+        top.push(key, item)
+    assert top.items() == ["a", "a2"]
+
+    offers = [make_offer(900, 7, 0), make_offer(500, 14, 2), make_offer(650, 9, 1),
+              make_offer(700, 10, 1), make_offer(1200, 6, 0), make_offer(500, 16, 2)]
+    # A generator, as the streaming parser produces
+    ranked = rank_offers((offer for offer in offers), "price", k=3)
+    assert ranked.scanned == 6
+    assert [metrics.price for metrics, _ in ranked.top] == [500, 500, 650]
+    assert [metrics.duration // 60 for metrics, _ in ranked.top] == [14, 16, 9]
+    assert [(metrics.price, metrics.duration // 60) for metrics, _ in ranked.frontier] == \
+        [(500, 14), (650, 9), (900, 7), (1200, 6)]
+
+    assert [m.stops for m, _ in rank_offers(offers, "stops", k=2).top] == [0, 0]
+    assert rank_offers(offers, "duration", k=1).top[0][0].price == 1200
+    print("✅ Flight ranking working correctly")
+
+def test_json_projection():
+    """Projection keeps only the requested paths, whichever decoder is selected"""
+    print("🧪 Testing JSON projection...")
+
+    document = {
+        "meta": {"count": 2, "links": {"self": "https://example.test"}},
+        "data": [
+            {"hotelId": "A", "name": "Alpha", "geoCode": {"latitude": 48.8, "longitude": 2.3},
+             "address": {"countryCode": "FR", "lines": ["1 Rue"]}},
+            {"hotelId": "B", "geoCode": {"latitude": 51.5, "longitude": -0.1}, "address": {}},
+        ],
+    }
+    paths = ["data[].hotelId", "data[].geoCode", "data[].address.countryCode", "meta.count"]
+    expected = {
+        "meta": {"count": 2},
+        "data": [
+            {"hotelId": "A", "geoCode": {"latitude": 48.8, "longitude": 2.3}, "address": {"countryCode": "FR"}},
+            {"hotelId": "B", "geoCode": {"latitude": 51.5, "longitude": -0.1}, "address": {}},
+        ],
+    }
+    assert project(document, paths) == expected
+    # A path selecting a whole object wins over narrower paths below it
+    assert project(document, ["data[].geoCode.latitude", "data[].geoCode"])["data"][1] == \
+        {"geoCode": {"latitude": 51.5, "longitude": -0.1}}
+
+    body = json.dumps(document).encode()
+    original = json_codec.decoder_name()
+    try:
+        for decoder in json_codec.DECODERS:
+            json_codec.set_decoder(decoder)
+            assert json_codec.loads(body) == document
+            assert json_codec.loads_projected(body, paths) == expected
+            assert json_codec.loads_projected(body, paths, stream=True) == expected
+    finally:
+        json_codec.set_decoder(original)
+    print("✅ JSON projection working correctly")
+
+def test_currency_conversion():
+    """One rate table converts cached offers in bulk, including cross rates and unknown currencies"""
+    print("🧪 Testing currency conversion...")
+
+    table = RateTable("USD", "2025-03-14", {"USD": 1.0, "EUR": 0.8, "GBP": 0.75})
+    assert table.rate("EUR", "GBP") == 0.75 / 0.8
+    assert table.rate("USD", "XYZ") is None
+    assert normalize_currency("eur") == "EUR" and normalize_currency("€") == "EUR"
+    assert normalize_currency("euros", default="USD") == "USD"
+
+    offers = [
+        {"id": "1", "price": {"total": "500.00", "currency": "USD"}},
+        {"id": "2", "price": {"total": "100.00"}},
+        {"id": "3", "price": {"total": "80.00", "currency": "XYZ"}},
+    ]
+    converter = CurrencyConverter("eur", table)
+    converted = converter.convert_offers(offers)
+    assert [offer["price"]["total"] for offer in converted] == ["400.00", "80.00", "80.00"]
+    assert [offer["price"]["currency"] for offer in converted] == ["EUR", "EUR", "XYZ"]
+    # The cached offers themselves are left untouched
+    assert offers[0]["price"] == {"total": "500.00", "currency": "USD"}
+
+    assert converter.convert(240.0, "GBP") == (256.0, "EUR")
+    assert converter.convert(10.0, "XYZ") == (10.0, "XYZ")
+    assert converter.convert_or_none(240.0, "GBP") == 256.0 and converter.convert_or_none(10.0, "XYZ") is None
+    assert converter.convert_map({("a", "b"): 100.0, ("c", "d"): None}, "USD") == {("a", "b"): 80.0, ("c", "d"): None}
+    assert converter.display_currency("XYZ") == "XYZ"
+    assert "2025-03-14" in converter.note("USD") and converter.note("EUR") == ""
+    assert format_money(1234.5, "EUR") == "€1,234.50" and format_money(99, "CHF") == "99.00 CHF"
+    print("✅ Currency conversion working correctly")
+
+if __name__ == "__main__":
+    test_ttl_cache()
+    test_bulk_hotel_pricing()
+    test_flexible_date_search()
+    test_nearby_airport_search()
+    test_flight_ranking()
+    test_json_projection()
+    test_currency_conversion()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Test script for the HTTP API
+Drives the ASGI app directly with a stand-in agent, so no server, LLM or API keys are needed
+"""
+
+import asyncio
+import json
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+import api_server
+from api_server import ApiRuntime, create_app
+from session_store import InMemorySessionStore, SessionConflictError, SessionStore, SQLiteSessionStore
+from usage_tracking import TurnUsage
+
+class FakeTool:
+    """Tool with the LangChain name/description/invoke surface that can be held open"""
+
+    def __init__(self, name):
+        self.name = name
+        self.description = f"{name} for tests"
+        self.release = threading.Event()
+        self.release.set()
+
+    def invoke(self, arguments):
+        if "city" not in arguments:
+            raise ValueError("city is required")
+        self.release.wait(5)
+        return f"Sunny in {arguments['city']}"
+
+class FakeAgent:
+    def __init__(self):
+        self.tools = [FakeTool("get_weather_forecast")]
+
+class ThreadRecordingStore(InMemorySessionStore):
+    """In-memory store that notes which threads read and delete sessions"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.threads = set()
+
+    def get(self, session_id):
+        self.threads.add(threading.get_ident())
+        return super().get(session_id)
+
+    def delete(self, session_id):
+        self.threads.add(threading.get_ident())
+        return super().delete(session_id)
+
+async def request(app, method, path, body=None, client="client-a"):
+    """Send one request through the ASGI app; returns (status, headers, decoded JSON body)"""
+    payload = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b""
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path,
+             "headers": [(b"x-client-id", client.encode())], "client": ("127.0.0.1", 5000)}
+    await app(scope, receive, send)
+    headers = {key.decode(): value.decode() for key, value in sent[0]["headers"]}
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    return sent[0]["status"], headers, json.loads(body) if body else None
+
+def test_routes():
+    """Routing, validation errors and tool calls"""
+    print("🧪 Testing API routes...")
+    # Importing the module must not build the workers or open the session database
+    assert api_server.app._runtime is None
+    app = create_app(ApiRuntime(agent=FakeAgent(), store=InMemorySessionStore()))
+
+    async def run():
+        status, _, body = await request(app, "GET", "/health")
+        assert status == 200 and body["status"] == "ok" and body["in_flight"] == 0
+        assert (await request(app, "GET", "/missing"))[0] == 404
+        status, headers, _ = await request(app, "GET", "/chat")
+        assert status == 405 and headers["allow"] == "POST"
+        assert (await request(app, "POST", "/chat", b"{not json"))[0] == 400
+        status, _, body = await request(app, "POST", "/chat", {"message": "  "})
+        assert status == 400 and "message" in body["error"]
+
+        status, _, body = await request(app, "GET", "/tools")
+        assert status == 200 and body["tools"][0]["name"] == "get_weather_forecast"
+        status, _, body = await request(app, "POST", "/tools/get_weather_forecast", {"city": "Paris"})
+        assert status == 200 and body["result"] == "Sunny in Paris"
+        status, _, body = await request(app, "POST", "/tools/get_weather_forecast", {})
+        assert status == 400 and "city is required" in body["error"]
+        assert (await request(app, "POST", "/tools/unknown", {}))[0] == 404
+
+        assert (await request(app, "GET", "/sessions/nope"))[0] == 404
+        assert (await request(app, "DELETE", "/sessions/nope"))[0] == 404
+
+    asyncio.run(run())
+    app.runtime.shutdown()
+    print("✅ API routes working correctly")
+
+def test_backpressure():
+    """Requests beyond the in-flight slots wait; beyond the queue or a client's share they get 429"""
+    print("🧪 Testing API backpressure...")
+    runtime = ApiRuntime(agent=FakeAgent(), store=InMemorySessionStore(), max_in_flight=1, max_waiting=2,
+                         max_client_requests=1)
+    app = create_app(runtime)
+    tool = runtime.agent.tools[0]
+    tool.release.clear()
+
+    async def call(client):
+        return await request(app, "POST", "/tools/get_weather_forecast", {"city": client}, client=client)
+
+    async def run():
+        running = asyncio.ensure_future(call("a"))
+        await asyncio.sleep(0.05)
+        assert runtime.in_flight == 1
+
+        status, headers, body = await call("a")
+        assert status == 429 and "client" in body["error"] and int(headers["retry-after"]) >= 1
+
+        waiting = [asyncio.ensure_future(call(client)) for client in ("b", "c")]
+        await asyncio.sleep(0.05)
+        assert runtime.waiting == 2
+        status, headers, body = await call("d")
+        assert status == 429 and "busy" in body["error"] and int(headers["retry-after"]) >= 1
+
+        tool.release.set()
+        results = await asyncio.gather(running, *waiting)
+        assert [result[2]["result"] for result in results] == ["Sunny in a", "Sunny in b", "Sunny in c"]
+        assert runtime.in_flight == 0 and runtime.waiting == 0 and not runtime._waiters
+
+        # Polling a running job reuses one asyncio view of its future
+        tool.release.clear()
+        job = runtime.submit("poll", lambda job: tool.invoke({"city": "e"}))
+        for _ in range(3):
+            assert not await runtime.wait(job, timeout=0.01)
+        assert list(runtime._waiters) == [job.id]
+        tool.release.set()
+        assert await runtime.wait(job, timeout=5)
+        runtime.forget(job)
+        assert not runtime._waiters
+
+    asyncio.run(run())
+    runtime.shutdown()
+    print("✅ API backpressure working correctly")
+
+def test_session_store():
+    """Sessions keep their id, are served by the API and the least recently used are evicted"""
+    print("🧪 Testing session store...")
+    store = ThreadRecordingStore(max_sessions=2)
+    first = store.get_or_create("trip-1")
+    first.add_exchange("Flights to Paris?", "Here are three options")
+    assert store.get_or_create("trip-1") is first and first.usage.session_id == "trip-1"
+
+    app = create_app(ApiRuntime(agent=FakeAgent(), store=store))
+
+    async def run():
+        status, _, body = await request(app, "GET", "/sessions/trip-1")
+        assert status == 200 and body["messages"][1]["content"] == "Here are three options"
+        assert body["usage"]["session_id"] == "trip-1"
+
+    asyncio.run(run())
+    assert store.get_or_create("trip-2").chat_history() == []
+    store.get_or_create("trip-3")
+    assert store.get("trip-1") is None and len(store) == 2
+    store.threads.clear()
+    assert (asyncio.run(request(app, "DELETE", "/sessions/trip-3")))[0] == 200
+    # Store calls from requests run on worker threads, not the event loop's
+    assert store.threads and threading.get_ident() not in store.threads
+    assert store.get("trip-3") is None
+    app.runtime.shutdown()
+
+    class ReadOnlyStore(SessionStore):
+        def get(self, session_id):
+            return None
+    try:
+        ReadOnlyStore()
+        assert False, "a store without save/delete must not be created"
+    except TypeError:
+        pass
+    print("✅ Session store working correctly")
+
+def test_sqlite_session_store():
+    """Conversations survive a restart, long replies are compressed and the log only grows"""
+    print("🧪 Testing SQLite session store...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sessions.sqlite3"
+        store = SQLiteSessionStore(path, max_sessions=1)
+        session = store.get_or_create("trip-1")
+        long_reply = "Option " * 200
+        session.add_exchange("Flights to Paris?", long_reply)
+        session.add_exchange("Book the first one", "Sorry, I encountered an error", notice=True)
+        for tokens in (500, 700):
+            session.usage.record_turn(TurnUsage("fast", "gpt-4o-mini", tokens, 0, 0.00625, 1.5))
+        session.itinerary.book_hotel(2, "HTL-42", "Paris", "2026-06-01", "2026-06-05")
+        session.itinerary.weather["Paris"] = "Sunny, 24°C"
+        store.save(session)
+        store.save(session)
+        assert store.get("trip-1") is session
+
+        # A new store over the same file is a restarted (or another) server
+        restarted = SQLiteSessionStore(path)
+        loaded = restarted.get("trip-1")
+        assert loaded is not session and loaded.messages == session.messages
+        assert loaded.messages[3]["notice"] and "notice" not in loaded.messages[1]
+        assert (loaded.usage.prompt_tokens, loaded.usage.cost) == (1200, 0.0125)
+        assert [turn.prompt_tokens for turn in loaded.usage.turns] == [500, 700] and loaded.usage.turn_count == 2
+        assert loaded.usage.session_id == "trip-1"
+        assert loaded.itinerary.to_dict() == session.itinerary.to_dict()
+        assert loaded.itinerary.hotel_booking.reference == "HTL-42"
+
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute("SELECT seq, compressed, length(content) FROM messages ORDER BY seq").fetchall()
+            state = conn.execute("SELECT state FROM sessions").fetchone()[0]
+        assert [row[:2] for row in rows] == [(0, 0), (1, 1), (2, 0), (3, 0)] and rows[1][2] < len(long_reply)
+        # Per-turn usage is logged as rows; the state row only carries totals
+        assert "turns" not in json.loads(state)["usage"]
+
+        # Only the newest session stays loaded; older ones come back from disk
+        store.get_or_create("trip-2")
+        assert store.get("trip-1") is not session and store.get("trip-1").messages == session.messages
+
+        shrunk = SQLiteSessionStore(path)
+        shrunk.get("trip-1").messages.pop()
+        try:
+            shrunk.save(shrunk.get("trip-1"))
+            assert False, "a shrunk transcript must not be saved"
+        except ValueError:
+            pass
+
+        # Two processes sharing the file: each sees the other's saves and a stale copy is refused
+        other = SQLiteSessionStore(path)
+        mine, theirs = restarted.get("trip-1"), other.get("trip-1")
+        theirs.add_exchange("Any hotels?", "Hotel du Louvre")
+        other.save(theirs)
+        mine.add_exchange("And the weather?", "Sunny")
+        try:
+            restarted.save(mine)
+            assert False, "a stale copy must not be saved"
+        except SessionConflictError:
+            pass
+        fresh = restarted.get("trip-1")
+        assert fresh is not mine and fresh.messages[-1]["content"] == "Hotel du Louvre"
+        fresh.add_exchange("And the weather?", "Sunny")
+        restarted.save(fresh)
+        assert len(other.get("trip-1").messages) == 8
+        assert other.delete("trip-1") and restarted.get("trip-1") is None
+        assert not restarted.delete("trip-1")
+        assert SQLiteSessionStore(path).get("trip-1") is None
+    print("✅ SQLite session store working correctly")
+
+if __name__ == "__main__":
+    test_routes()
+    test_session_store()
+    test_sqlite_session_store()
+    test_backpressure()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch runner
+Uses a stand-in agent, so no LLM or API keys are needed
+"""
+
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from batch_runner import completed_ids, percentile, run_batch
+
+class FakeAgent:
+    """Answers instantly, fails queries mentioning 'boom' and tracks how many run at once"""
+
+    def __init__(self, fail=True):
+        self.fail = fail
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def chat(self, message, chat_history=None, session_usage=None, itinerary=None, callbacks=None,
+             raise_errors=False):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(0.01)
+            if self.fail and "boom" in message:
+                raise RuntimeError("provider unavailable")
+            return f"Answer to {message}"
+        finally:
+            with self.lock:
+                self.running -= 1
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+def test_batch_run_and_resume():
+    """Results stream to JSONL within the concurrency limit and a second run only redoes failures"""
+    print("🧪 Testing batch runs...")
+    with tempfile.TemporaryDirectory() as tmp:
+        queries, answers = Path(tmp) / "queries.jsonl", Path(tmp) / "answers.jsonl"
+        lines = [json.dumps({"id": f"q{i}", "query": f"flights to city {i}"}) for i in range(20)]
+        lines += [json.dumps({"message": "boom"}), "{broken", json.dumps({"id": "empty", "query": ""})]
+        write_lines(queries, lines)
+
+        agent = FakeAgent()
+        seen = []
+        stats = run_batch(agent, queries, answers, concurrency=3, progress=lambda s: seen.append(s.processed))
+        assert agent.peak <= 3
+        assert (stats.succeeded, stats.failed, len(stats.invalid)) == (20, 1, 2)
+        assert seen == list(range(1, 22))
+        results = {result["id"]: result for result in read_results(answers)}
+        assert results["q7"]["response"] == "Answer to flights to city 7" and results["q7"]["latency"] > 0
+        assert results["line-21"]["status"] == "error" and "provider unavailable" in results["line-21"]["error"]
+        assert stats.as_dict()["latency"]["max"] >= stats.as_dict()["latency"]["p50"] > 0
+        assert completed_ids(answers) == {f"q{i}" for i in range(20)}
+
+        # Simulate a run killed mid-write, then resume with the provider back up
+        with open(answers, "a", encoding="utf-8") as f:
+            f.write('{"id": "q3", "sta')
+        stats = run_batch(FakeAgent(fail=False), queries, answers, concurrency=3)
+        assert (stats.succeeded, stats.failed, stats.skipped) == (1, 0, 20)
+        assert completed_ids(answers) == {f"q{i}" for i in range(20)} | {"line-21"}
+        # The retried answer starts on its own line after the cut-off record
+        assert json.loads(answers.read_text(encoding="utf-8").splitlines()[-1])["status"] == "ok"
+
+        # --restart starts over; --limit caps the new work
+        stats = run_batch(FakeAgent(), queries, answers, resume=False, limit=5)
+        assert stats.processed == 5 and len(answers.read_text(encoding="utf-8").splitlines()) == 5
+    print("✅ Batch runs working correctly")
+
+def test_percentile():
+    """Nearest-rank percentiles used in the latency report"""
+    print("🧪 Testing percentiles...")
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+    assert percentile(list(range(1, 101)), 95) == 95
+    assert percentile([5.0], 99) == 5.0
+    print("✅ Percentiles working correctly")
+
+if __name__ == "__main__":
+    test_percentile()
+    test_batch_run_and_resume()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental chat rendering helpers
+Runs without Streamlit
+"""
+
+from chat_rendering import _render_page_html, plan_chat_view, render_message_html, render_page_html
+
+def test_chat_view():
+    """The rendered window stays bounded and pages stay aligned as messages are added"""
+    print("🧪 Testing chat view planning...")
+
+    assert plan_chat_view(0, page_size=20) == (0, [], 0)
+    assert plan_chat_view(39, page_size=20) == (0, [], 0)
+    assert plan_chat_view(40, page_size=20) == (20, [], 20)
+    assert plan_chat_view(1000, page_size=20).tail_start == 980
+    # Expanding history reveals whole pages, oldest first, never past the start
+    assert plan_chat_view(95, pages_shown=2, page_size=20) == (20, [(20, 40), (40, 60)], 60)
+    assert plan_chat_view(95, pages_shown=9, page_size=20) == (0, [(0, 20), (20, 40), (40, 60)], 60)
+
+    for total in range(1, 500):
+        view = plan_chat_view(total, page_size=20)
+        assert total - view.tail_start < 40
+        assert view.tail_start % 20 == 0
+    print("✅ Chat view planning working correctly")
+
+def test_cached_rendering():
+    """Message and page HTML is built once and reused across reruns"""
+    print("🧪 Testing cached rendering...")
+
+    html = render_message_html("user", "Hello")
+    assert 'class="chat-message user-message"' in html and "You:" in html and "Hello" in html
+    assert render_message_html("user", "Hello") is html
+    assert "AI Travel Agent:" in render_message_html("assistant", "Hi")
+
+    messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(10)]
+    _render_page_html.cache_clear()
+    page = render_page_html(messages[:4])
+    assert page == "".join(render_message_html(m["role"], m["content"]) for m in messages[:4])
+    assert render_page_html([dict(m) for m in messages[:4]]) is page
+    assert _render_page_html.cache_info().hits == 1
+    print("✅ Cached rendering working correctly")
+
+if __name__ == "__main__":
+    test_chat_view()
+    test_cached_rendering()
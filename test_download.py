@@ -4,8 +4,14 @@ Test script for the download functionality
 """
 
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from export_cache import ExportCache
+from itinerary import (FlightOption, FlightSearch, HotelOption, HotelSearch, Itinerary, current_itinerary,
+                       format_itinerary, recording)
+
 def test_download_functionality():
     """Test the download functionality with sample data"""
     
@@ -67,5 +73,82 @@ def test_download_functionality():
     print("✅ All formats working correctly")
     print("🚀 You can now use the download feature in the Streamlit app")
 
+def test_export_cache():
+    """Exports are built once per conversation version, slow ones on a worker thread"""
+    print("\n🧪 Testing export cache...")
+    builds = []
+
+    def builder(text):
+        def build():
+            builds.append(text)
+            return text
+        return build
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        exports = ExportCache(executor)
+        assert exports.get("txt", 1) is None and builds == []
+        assert exports.build("txt", 1, builder("v1")) == "v1"
+        assert exports.build("txt", 1, builder("again")) == "v1"
+        assert exports.build("txt", 2, builder("v2")) == "v2"
+        assert exports.get("txt", 1) is None
+        assert builds == ["v1", "v2"]
+
+        release = threading.Event()
+
+        def slow_build():
+            release.wait(5)
+            return b"docx"
+
+        assert exports.build_in_background("docx", 2, slow_build) is None
+        assert exports.pending("docx", 2)
+        # Asking again while it builds does not start a second build
+        assert exports.build_in_background("docx", 2, slow_build) is None
+        release.set()
+        executor.submit(lambda: None).result()
+        assert not exports.pending("docx", 2)
+        assert exports.get("docx", 2) == b"docx"
+
+        def failing_build():
+            raise ValueError("broken")
+
+        exports.build_in_background("docx", 3, failing_build)
+        executor.submit(lambda: None).result()
+        assert isinstance(exports.error("docx", 3), ValueError) and exports.get("docx", 3) is None
+    print("✅ Export cache working correctly")
+
+def test_itinerary_state():
+    """Bookings resolve against the recorded options and the export is built from state alone"""
+    print("\n🧪 Testing itinerary state...")
+
+    itinerary = Itinerary()
+    assert itinerary.is_empty() and current_itinerary() is None
+    with recording(itinerary):
+        # What the search and booking tools record during a chat turn
+        current_itinerary().flight_search = FlightSearch("JFK", "CDG", "2025-03-15", "2025-03-20", [
+            FlightOption(1, "Air France", 612.4, "EUR", "JFK", "CDG", "JFK → CDG (Air France AF 7, Mar 15)",
+                         "CDG → JFK (Air France AF 8, Mar 20)"),
+            FlightOption(2, "Delta", 650.0, "EUR", "JFK", "CDG", "JFK → CDG (Delta DL 264, Mar 15)"),
+        ])
+        current_itinerary().hotel_search = HotelSearch("Paris", "2025-03-15", "2025-03-20", [
+            HotelOption(1, "Hotel Lutetia", "Paris, FR", 180.0, 900.0, "EUR"),
+        ])
+        current_itinerary().weather["Paris"] = "Weather forecast for Paris on 2025-03-15 12:00:00: 55°F, light rain."
+    assert current_itinerary() is None
+
+    assert itinerary.book_flight(2, "BK1", "2025-03-15", "2025-03-20").flight.airline == "Delta"
+    assert itinerary.book_hotel(7, "HT1", "Paris", "2025-03-15", "2025-03-20").hotel is None
+    assert itinerary.total_cost() == (650.0, "EUR")
+    itinerary.book_hotel(1, "HT2", "Paris", "2025-03-15", "2025-03-20")
+    assert itinerary.total_cost() == (1550.0, "EUR")
+
+    assert Itinerary.from_dict(json.loads(json.dumps(itinerary.to_dict()))) == itinerary
+    text = format_itinerary(itinerary)
+    assert "BK1" in text and "Hotel Lutetia" in text and "€1,550.00" in text and "light rain" in text
+    # Bookings replace the list of open options
+    assert "Air France" not in text
+    print("✅ Itinerary state working correctly")
+
 if __name__ == "__main__":
-    test_download_functionality() 
\ No newline at end of file
+    test_download_functionality()
+    test_export_cache()
+    test_itinerary_state() 
\ No newline at end of file
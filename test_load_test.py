@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the load generator
+The end-to-end check runs a real TravelAgent against the scripted model and
+replayed tools when LangChain is installed; the rest needs no dependencies
+"""
+
+from load_test import (LevelResult, _Arguments, build_agent, conversation_script, find_saturation, load_replays,
+                       run_level)
+
+try:
+    import langchain_core
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+def test_scripts_and_replays():
+    """Scripts are unique per session and every provider-backed tool call has a recording"""
+    print("🧪 Testing load test scripts...")
+    scripts = [conversation_script(index) for index in range(50)]
+    messages = [message for script in scripts for message, _ in script]
+    assert len(messages) == len(set(messages)) == 200
+
+    replays = load_replays()
+    planned = {name for script in scripts for _, calls in script for name, _ in calls}
+    assert {"search_flights_amadeus", "search_hotels_amadeus"} <= planned
+    assert planned - set(replays) == {"book_flight", "book_hotel"}
+    for recording in replays.values():
+        assert recording["outputs"] and recording["latency"] >= 0
+
+    output = replays["search_hotels_amadeus"]["outputs"][0].format_map(_Arguments(city="Rome"))
+    assert "hotels in Rome" in output and "{check_in}" in output
+    print("✅ Load test scripts working correctly")
+
+def test_saturation():
+    """The saturation point is the last level before throughput stops growing"""
+    print("🧪 Testing saturation detection...")
+
+    def level(sessions, turns_per_second):
+        return LevelResult(sessions, turns=int(turns_per_second * 10), seconds=10.0)
+
+    scaling = [level(1, 2), level(2, 4), level(4, 7.8)]
+    assert find_saturation(scaling) is None
+    saturated = scaling + [level(8, 8.2), level(16, 6)]
+    assert find_saturation(saturated).sessions == 4
+    assert level(4, 7.8).as_dict()["turns_per_second"] == 7.8
+    print("✅ Saturation detection working correctly")
+
+def test_simulated_sessions():
+    """A real agent plays whole conversations against the scripted model"""
+    if not LANGCHAIN_AVAILABLE:
+        print("⏭️ LangChain not installed; skipping simulated sessions")
+        return
+    print("🧪 Testing simulated sessions...")
+    scripts = [conversation_script(index) for index in range(3)]
+    plans = {message: calls for script in scripts for message, calls in script}
+    agent = build_agent(plans, llm_latency=0, tool_latency_scale=0)
+    result, sessions = run_level(agent, scripts)
+    assert (result.turns, result.errors) == (12, 0) and result.tokens > 0
+    assert all(len(session.messages) == 8 for session in sessions)
+    assert "Flight Booking Confirmed" in sessions[0].messages[3]["content"]
+    assert sessions[0].itinerary.hotel_booking.city == "Paris"
+    print("✅ Simulated sessions working correctly")
+
+if __name__ == "__main__":
+    test_scripts_and_replays()
+    test_saturation()
+    test_simulated_sessions()
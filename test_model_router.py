@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for model tiering
+Routing and metrics use stand-in models; the environment-built router needs
+langchain-openai and is skipped without it (no API call is made)
+"""
+
+import os
+from collections import namedtuple
+
+from model_router import CAPABLE_TIER, FAST_TIER, ModelRouter, extract_turn_features
+
+try:
+    import langchain_openai
+    LANGCHAIN_OPENAI_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_OPENAI_AVAILABLE = False
+
+# Just the type/content surface of LangChain messages that routing reads
+Message = namedtuple("Message", "type content")
+
+class StandInModel:
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+def make_router():
+    return ModelRouter(StandInModel("fast-model"), StandInModel("capable-model"), max_fast_words=10)
+
+def test_classify():
+    """Short and single-lookup turns go to the fast tier, planning and multi-part turns to the capable one"""
+    print("🧪 Testing turn classification...")
+    router = make_router()
+    cases = {
+        "2": FAST_TIER,
+        "option 3": FAST_TIER,
+        "yes please": FAST_TIER,
+        "What's the weather in Rome?": FAST_TIER,
+        "Plan a 5 day trip to Japan": CAPABLE_TIER,
+        "ok plan it": CAPABLE_TIER,
+        "Find flights and hotels in Paris": CAPABLE_TIER,
+        "I would like to know what the weather will be like in Lisbon next week please": CAPABLE_TIER,
+    }
+    for message, tier in cases.items():
+        assert router.classify(message) == tier, message
+
+    features = extract_turn_features("Book option 2 hotel")
+    assert features.tool_intents == ["hotels", "booking"] and not features.is_selection
+    print("✅ Turn classification working correctly")
+
+def test_classify_with_history():
+    """A confirmation or pick answering a planning turn stays on the capable tier"""
+    print("🧪 Testing classification with history...")
+    router = make_router()
+    planning = [Message("human", "Plan a week in Portugal on a budget"), Message("ai", "Here is a draft...")]
+    lookup = [Message("human", "Weather in Lisbon?"), Message("ai", "Sunny, 24°C")]
+    assert router.classify("sounds good", planning) == CAPABLE_TIER
+    assert router.classify("2", planning) == CAPABLE_TIER
+    assert router.classify("sounds good", lookup) == FAST_TIER
+    assert router.classify("thanks", []) == FAST_TIER
+    print("✅ Classification with history working correctly")
+
+def test_tier_metrics():
+    """Latency, errors and tokens are accumulated per tier"""
+    print("🧪 Testing tier metrics...")
+    router = make_router()
+    router.record(FAST_TIER, 0.5, prompt_tokens=100, completion_tokens=20)
+    router.record(FAST_TIER, 1.5, prompt_tokens=50, completion_tokens=10, error=True)
+    metrics = router.get_metrics()
+    assert metrics[FAST_TIER] == {"calls": 2, "errors": 1, "avg_latency": 1.0, "max_latency": 1.5,
+                                  "prompt_tokens": 150, "completion_tokens": 30, "total_tokens": 180}
+    assert metrics[CAPABLE_TIER]["calls"] == 0
+    assert router.llm_for(CAPABLE_TIER).model_name == "capable-model" and router.llm_for(FAST_TIER) is router.fast_llm
+    print("✅ Tier metrics working correctly")
+
+def test_from_env():
+    """Models are named by environment variables and one model serves both tiers when they match"""
+    if not LANGCHAIN_OPENAI_AVAILABLE:
+        print("⏭️ langchain-openai not installed; skipping router from environment")
+        return
+    print("🧪 Testing router from environment...")
+    saved = {name: os.environ.get(name) for name in ("TRAVEL_AGENT_FAST_MODEL", "TRAVEL_AGENT_CAPABLE_MODEL",
+                                                     "TRAVEL_AGENT_MAX_FAST_WORDS", "OPENAI_API_KEY")}
+    try:
+        os.environ.pop("OPENAI_API_KEY", None)
+        try:
+            ModelRouter.from_env()
+            assert False, "a router without an API key must not be built"
+        except ValueError:
+            pass
+
+        os.environ.update(TRAVEL_AGENT_FAST_MODEL="gpt-4o-mini", TRAVEL_AGENT_CAPABLE_MODEL="gpt-4o",
+                          TRAVEL_AGENT_MAX_FAST_WORDS="12")
+        router = ModelRouter.from_env(api_key="sk-test")
+        assert router.fast_llm.model_name == "gpt-4o-mini" and router.capable_llm.model_name == "gpt-4o"
+        assert router.max_fast_words == 12
+
+        os.environ["TRAVEL_AGENT_CAPABLE_MODEL"] = "gpt-4o-mini"
+        router = ModelRouter.from_env(api_key="sk-test")
+        assert router.capable_llm is router.fast_llm
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    print("✅ Router from environment working correctly")
+
+if __name__ == "__main__":
+    test_classify()
+    test_classify_with_history()
+    test_tier_metrics()
+    test_from_env()
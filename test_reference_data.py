@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Test script for the local reference data lookups
+Checks airport resolution and city matching without any API keys
+"""
+
+import tempfile
+from pathlib import Path
+
+from airports import airports_near, get_airport_index, haversine_km, resolve_airports, resolve_location_code
+from city_index import lookup_city
+from disk_cache import DiskCache
+import hotel_ranking
+from hotel_ranking import rank_hotels
+from recommendations_catalog import get_curated_recommendations
+from topic_classifier import TopicClassifier, iter_topic_texts
+import web_recommendations
+from web_recommendations import recommendation_key
+from travel_data import get_airline_name, get_curated_hotels
+
+def test_airport_resolution():
+    """Place names, airport names and typos resolve to IATA codes"""
+    print("🧪 Testing airport resolution...")
+
+    cases = {
+        "JFK": "JFK",
+        "New York": "NYC",
+        "nyc": "NYC",
+        "Heathrow": "LHR",
+        "Tokio": "TYO",
+        "san fransisco": "SFO",
+        "Paris, France": "PAR",
+        # Cities whose main airport is named after them still cover every airport
+        "Milan": "MIL",
+        "Washington": "WAS",
+        "Sao Paulo": "SAO",
+        "Toronto": "YTO",
+        "Beijing": "BJS",
+    }
+    for query, expected in cases.items():
+        code = resolve_location_code(query)
+        print(f"   {query!r} -> {code}")
+        assert code == expected
+
+    assert {airport.iata for airport in resolve_airports("London")} >= {"LHR", "LGW"}
+
+    # Near-miss names of other places are not taken for the city they resemble
+    for query in ["Bristol", "York", "Parma", "La Paz", "Kyoto", "Cork"]:
+        assert resolve_location_code(query) is None and resolve_airports(query) == []
+    # Unknown three-letter input is only taken as a code when typed as one
+    assert resolve_location_code("XYZ") == "XYZ"
+    assert resolve_location_code("the") is None and resolve_location_code("lhr") == "LHR"
+    assert get_airline_name("CX") == "Cathay Pacific"
+    print("✅ Airport resolution working correctly")
+
+def test_nearby_airports():
+    """The grid index finds exactly the airports a full scan finds, nearest first"""
+    print("🧪 Testing nearby airports...")
+
+    assert round(haversine_km(51.47, -0.4543, 40.6413, -73.7781)) == 5540
+    nearby = [airport.iata for airport, _ in airports_near(40.7128, -74.0060, 60)]
+    assert set(nearby) >= {"JFK", "LGA", "EWR"}
+    assert nearby[0] in {"LGA", "EWR"}
+
+    airports = get_airport_index().airports
+    # Includes points near the poles and across the antimeridian
+    for lat, lon, radius in [(51.5, -0.12, 80), (35.68, 139.69, 120), (64.0, -22.0, 500),
+                             (-17.7, 179.9, 800), (85.0, 10.0, 2500), (0.0, 0.0, 50)]:
+        expected = sorted(a.iata for a in airports if haversine_km(lat, lon, a.latitude, a.longitude) <= radius)
+        assert sorted(a.iata for a, _ in airports_near(lat, lon, radius)) == expected
+    print("✅ Nearby airports working correctly")
+
+def test_hotel_ranking():
+    """Hotels near the points of interest rank first, with the same order with or without numpy"""
+    print("🧪 Testing hotel ranking...")
+
+    center = (48.8566, 2.3522)
+    eiffel_tower, louvre = (48.8584, 2.2945), (48.8606, 2.3376)
+    coordinates = [(48.8570, 2.2950), (48.8600, 2.3380), (48.8800, 2.4000), None, (48.8566, 2.3522)]
+    prices = [220, 180, 90, 100, 400]
+    ratings = [4, None, 2, 5, 5]
+
+    ranking = rank_hotels(coordinates, prices, ratings, center, [eiffel_tower, louvre], k=3)
+    assert ranking.order[0] == 1
+    assert 3 not in ranking.order
+    assert ranking.nearest_poi[0] == 0 and ranking.nearest_poi[1] == 1 and ranking.nearest_poi[3] is None
+    assert ranking.poi_km[0] < 0.2 and ranking.center_km[3] is None
+    # Without points of interest the hotel at the center wins on distance
+    assert rank_hotels(coordinates, [100] * 5, [3] * 5, center).order[0] == 4
+
+    if hotel_ranking.NUMPY_AVAILABLE:
+        import random
+        rng = random.Random(3)
+        coordinates = [(48.85 + rng.uniform(-0.05, 0.05), 2.35 + rng.uniform(-0.05, 0.05)) for _ in range(300)]
+        prices = [rng.choice([None, 150, 180, 200, 300]) for _ in coordinates]
+        ratings = [rng.choice([None, 2, 3, 4, 5]) for _ in coordinates]
+        args = (coordinates, prices, ratings, center, [eiffel_tower, louvre], 20, hotel_ranking.RANKING_WEIGHTS)
+        assert hotel_ranking._rank_numpy(*args).order == hotel_ranking._rank_python(*args).order
+    print("✅ Hotel ranking working correctly")
+
+def test_city_matching():
+    """Curated hotel and recommendation data is found through aliases and misspellings"""
+    print("🧪 Testing city matching...")
+
+    assert lookup_city("NYC") == lookup_city("New York City") == "new york"
+    assert lookup_city("downtown Tokyo") == "tokyo"
+    assert lookup_city("La Rambla Barcelona") == "barcelona"
+    assert lookup_city("Springfield, Illinois") is None
+
+    hotels, is_curated = get_curated_hotels("Barcelonna")
+    assert is_curated and hotels[0]["name"] == "Hotel Arts Barcelona"
+    hotels, is_curated = get_curated_hotels("Springfield")
+    assert not is_curated
+    assert get_curated_recommendations("paris") is not None
+
+    # Places that merely resemble a curated city, or contain a short alias, get no curated data
+    for city in ["Parma", "York", "La Paz", "DC Comics"]:
+        assert lookup_city(city) is None
+        assert not get_curated_hotels(city)[1] and get_curated_recommendations(city) is None
+    assert lookup_city("Barcelonna", fuzzy=False) is None
+    print("✅ City matching working correctly")
+
+def test_interest_ranking():
+    """Curated recommendations are ordered by the requested interests"""
+    print("🧪 Testing interest ranking...")
+
+    general = get_curated_recommendations("Paris")
+    assert general["attractions"][0] == "Eiffel Tower"
+    culture = get_curated_recommendations("Paris", "culture")
+    assert culture["attractions"][0] == "Louvre Museum"
+    outdoors = get_curated_recommendations("Paris", "outdoors")
+    assert outdoors["attractions"][0] == "Luxembourg Gardens"
+    assert get_curated_recommendations("Springfield") is None
+    print("✅ Interest ranking working correctly")
+
+def test_topic_classification():
+    """Web search topics are categorized in priority order, including nested groups"""
+    print("🧪 Testing topic classification...")
+
+    classifier = TopicClassifier()
+    assert classifier.classify("The Louvre MUSEUM has a cafe") == "attractions"
+    assert classifier.classify("Cafe de Flore, a famous cafe") == "restaurants"
+    assert classifier.classify("Walking tour of Montmartre") == "activities"
+    assert classifier.classify("Paris is the capital of France") == "tips"
+
+    classifier.add_keywords("nightlife", ["jazz club", "bar"])
+    assert classifier.classify("Live jazz club in Le Marais") == "nightlife"
+
+    topics = [
+        {"Text": "Eiffel Tower"},
+        {"Name": "Food", "Topics": [{"Text": "Bistro cuisine"}, {"Text": "Street food"}]},
+        {"Name": "Empty"},
+    ]
+    assert list(iter_topic_texts(topics)) == ["Eiffel Tower", "Bistro cuisine", "Street food"]
+    grouped = TopicClassifier().categorize(iter_topic_texts(topics))
+    assert grouped["restaurants"] == ["Bistro cuisine", "Street food"]
+    print("✅ Topic classification working correctly")
+
+def test_recommendation_cache():
+    """Web recommendations are cached per canonical city and interests, with empty answers cached too"""
+    print("🧪 Testing recommendation cache...")
+
+    assert recommendation_key("NYC", "Food and Culture") == recommendation_key("new york city", "culture, food")
+    assert recommendation_key("Paris", "") == recommendation_key("paris", "general") == "paris|general"
+    # A city outside the index keys, and is searched, as itself rather than a look-alike
+    assert recommendation_key("Parma", "food") == "parma|food"
+    assert recommendation_key("São  Tomé") == "são tomé|general"
+    searched = []
+    fetch = web_recommendations.fetch_web_recommendations
+    web_recommendations.fetch_web_recommendations = lambda city, interests: searched.append((city, interests))
+    try:
+        web_recommendations._load_recommendations(recommendation_key("Parma", "food"))
+    finally:
+        web_recommendations.fetch_web_recommendations = fetch
+    assert searched == [("parma", "food")]
+
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        return None if key == "nowhere" else {"attractions": [key]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DiskCache(Path(tmp) / "cache.sqlite3", loader, ttl=60)
+        assert cache.get("paris") == {"attractions": ["paris"]}
+        assert cache.get("paris") == {"attractions": ["paris"]}
+        assert cache.get("nowhere") is None
+        assert cache.get("nowhere") is None
+        assert calls == ["paris", "nowhere"]
+
+        # Reopening the file serves the stored answers without reloading
+        reopened = DiskCache(Path(tmp) / "cache.sqlite3", loader, ttl=60)
+        assert reopened.get("paris") == {"attractions": ["paris"]}
+        assert calls == ["paris", "nowhere"]
+    print("✅ Recommendation cache working correctly")
+
+if __name__ == "__main__":
+    test_airport_resolution()
+    test_nearby_airports()
+    test_hotel_ranking()
+    test_city_matching()
+    test_interest_ranking()
+    test_topic_classification()
+    test_recommendation_cache()
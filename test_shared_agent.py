@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared agent runtime
+Uses a stand-in router and agent class, but importing travel_agent needs
+LangChain and dotenv, so the checks are skipped without them
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import langchain
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+class StandInRouter:
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+class StandInModel:
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+class CountingAgent:
+    """Records every construction so racing first calls can be counted"""
+
+    created = []
+
+    def __init__(self, router):
+        self.router = router
+        CountingAgent.created.append(self)
+
+def run_concurrently(function, count=8):
+    """Call function from count threads released at the same moment"""
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        return function()
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return [future.result() for future in [executor.submit(call) for _ in range(count)]]
+
+def test_shared_agent_per_key():
+    """Concurrent first calls share one agent per API key"""
+    if not LANGCHAIN_AVAILABLE:
+        print("⏭️ LangChain not installed; skipping shared agent")
+        return
+    print("🧪 Testing shared agent per key...")
+    import travel_agent
+
+    saved = travel_agent.TravelAgent, travel_agent.ModelRouter.__dict__["from_env"]
+    travel_agent.TravelAgent = CountingAgent
+    travel_agent.ModelRouter.from_env = staticmethod(StandInRouter)
+    CountingAgent.created.clear()
+    try:
+        agents = run_concurrently(lambda: travel_agent.get_shared_agent("sk-test-a"))
+        assert len(CountingAgent.created) == 1 and all(agent is agents[0] for agent in agents)
+        assert agents[0].router.api_key == "sk-test-a"
+        assert travel_agent.get_shared_agent("sk-test-a") is agents[0]
+
+        other = travel_agent.get_shared_agent("sk-test-b")
+        assert other is not agents[0] and len(CountingAgent.created) == 2
+    finally:
+        travel_agent.TravelAgent, travel_agent.ModelRouter.from_env = saved
+        for key in ("sk-test-a", "sk-test-b"):
+            travel_agent._shared_agents.pop(key, None)
+    print("✅ Shared agent per key working correctly")
+
+def test_executors_built_once():
+    """Concurrent first turns on a shared agent build its tools and each tier's executor once"""
+    if not LANGCHAIN_AVAILABLE:
+        print("⏭️ LangChain not installed; skipping lazy executor build")
+        return
+    print("🧪 Testing lazy executor build...")
+    from langchain_core.agents import AgentFinish
+    from langchain_core.runnables import RunnableLambda
+    from model_router import CAPABLE_TIER, FAST_TIER, ModelRouter
+    from travel_agent import TravelAgent
+
+    agent = TravelAgent(router=ModelRouter(StandInModel("fast-model"), StandInModel("capable-model")))
+    built = []
+
+    def create_tools():
+        built.append("tools")
+        time.sleep(0.05)  # keep the other first calls waiting on the build
+        return []
+
+    def create_agent(llm):
+        built.append(llm.model_name)
+        return RunnableLambda(lambda inputs: AgentFinish({"output": "done"}, "done"))
+
+    agent._create_tools, agent._create_agent = create_tools, create_agent
+    executors = run_concurrently(lambda: agent.get_agent_executor(FAST_TIER))
+    assert all(executor is executors[0] for executor in executors)
+    assert sorted(built) == ["fast-model", "tools"]
+
+    assert agent.agent_executor is agent.get_agent_executor(CAPABLE_TIER) is not executors[0]
+    assert sorted(built) == ["capable-model", "fast-model", "tools"]
+    print("✅ Lazy executor build working correctly")
+
+if __name__ == "__main__":
+    test_shared_agent_per_key()
+    test_executors_built_once()
@@ -0,0 +1,124 @@
+"""
+In-memory text indexes for reference data lookups
+A prefix trie for as-you-type matches and a trigram index for typo-tolerant
+fuzzy matches. Both map normalized keys to arbitrary values.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, List, Set, Tuple
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized string, padded so short words still match"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Edits (insert, delete, substitute, swap neighbours) turning a into b"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[len(b)]
+
+
+def max_typo_edits(text: str) -> int:
+    """Edits a misspelling of text may contain: one for short words, two for longer ones"""
+    return 1 if len(text) < 8 else 2
+
+
+def is_typo_of(query: str, key: str) -> bool:
+    """Whether a normalized query reads as a misspelling of the start of key.
+
+    The query is compared with as many leading words of key as it has, so
+    "heathrw" matches "heathrow airport" but "york" does not match "new york".
+    """
+    words = query.split()
+    if not words:
+        return False
+    head = " ".join(key.split()[:len(words)])
+    return edit_distance(query, head) <= max_typo_edits(query)
+
+
+class PrefixTrie:
+    """Trie over normalized keys; each node keeps the values of every key below it"""
+
+    def __init__(self, max_values_per_node: int = 20):
+        self._root: Dict[str, Any] = {}
+        self.max_values_per_node = max_values_per_node
+
+    def insert(self, key: str, value: Any):
+        node = self._root
+        for ch in key:
+            node = node.setdefault(ch, {})
+            # Values are stored along the path so a prefix lookup is a single walk
+            values = node.setdefault("", [])
+            if value not in values and len(values) < self.max_values_per_node:
+                values.append(value)
+
+    def search(self, prefix: str, limit: int = 10) -> List[Any]:
+        node = self._root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node.get("", [])[:limit]
+
+
+class TrigramIndex:
+    """Inverted trigram index scoring candidates by Dice similarity"""
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._values: List[Any] = []
+        self._grams: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def add(self, key: str, value: Any):
+        entry_id = len(self._keys)
+        grams = trigrams(key)
+        self._keys.append(key)
+        self._values.append(value)
+        self._grams.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(entry_id)
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.4) -> List[Tuple[Any, float]]:
+        """Best (value, score) pairs for a normalized query, highest score first"""
+        return [(value, score) for _, value, score in self.search_keys(query, limit, min_score)]
+
+    def search_keys(self, query: str, limit: int = 5, min_score: float = 0.4) -> List[Tuple[str, Any, float]]:
+        """Like search, with the indexed key each value matched through"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for entry_id in self._postings.get(gram, ()):
+                overlap[entry_id] += 1
+
+        best: Dict[Any, Tuple[str, float]] = {}
+        for entry_id, shared in overlap.items():
+            score = 2.0 * shared / (len(query_grams) + self._grams[entry_id])
+            if score < min_score:
+                continue
+            value = self._values[entry_id]
+            if value not in best or score > best[value][1]:
+                best[value] = (self._keys[entry_id], score)
+        ranked = sorted(best.items(), key=lambda item: -item[1][1])[:limit]
+        return [(key, value, score) for value, (key, score) in ranked]
@@ -0,0 +1,82 @@
+"""
+Keyword classifier for web search topics
+All category keywords are compiled into a single case-insensitive regex with
+one named group per category, so each text is scanned once regardless of how
+many categories or keywords there are.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List
+
+# Checked in this order: a text mentioning both a museum and a cafe is an attraction
+DEFAULT_TOPIC_CATEGORIES = {
+    "attractions": ["museum", "park", "tower", "palace", "temple", "monument", "landmark"],
+    "restaurants": ["restaurant", "cafe", "dining", "food", "cuisine"],
+    "activities": ["hiking", "skiing", "swimming", "tour", "walking", "adventure"],
+}
+
+DEFAULT_CATEGORY = "tips"
+
+
+class TopicClassifier:
+    """Assigns each text to the highest-priority category whose keyword it contains"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]] = None, default: str = DEFAULT_CATEGORY):
+        self.default = default
+        self.categories: Dict[str, List[str]] = {}
+        for name, keywords in (categories or DEFAULT_TOPIC_CATEGORIES).items():
+            self.categories[name] = list(keywords)
+        self._compile()
+
+    def _compile(self):
+        # Group names must be identifiers, so categories are numbered by priority
+        self._group_names = {f"c{i}": name for i, name in enumerate(self.categories)}
+        alternatives = []
+        for group, name in self._group_names.items():
+            keywords = sorted(self.categories[name], key=len, reverse=True)
+            if keywords:
+                alternatives.append(f"(?P<{group}>{'|'.join(re.escape(k) for k in keywords)})")
+        self._pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        self._priority = {name: i for i, name in enumerate(self.categories)}
+
+    def add_keywords(self, category: str, keywords: Iterable[str]):
+        """Extend a category (new categories get the lowest priority) and recompile"""
+        self.categories.setdefault(category, []).extend(keywords)
+        self._compile()
+
+    def classify(self, text: str) -> str:
+        if self._pattern is None:
+            return self.default
+        best = None
+        for match in self._pattern.finditer(text):
+            name = self._group_names[match.lastgroup]
+            if best is None or self._priority[name] < self._priority[best]:
+                best = name
+                if self._priority[name] == 0:
+                    break
+        return best or self.default
+
+    def categorize(self, texts: Iterable[str]) -> Dict[str, List[str]]:
+        """Group texts by category, keeping their original order"""
+        grouped: Dict[str, List[str]] = {name: [] for name in self.categories}
+        grouped.setdefault(self.default, [])
+        for text in texts:
+            grouped[self.classify(text)].append(text)
+        return grouped
+
+
+def iter_topic_texts(related_topics: Iterable) -> Iterator[str]:
+    """Texts of DuckDuckGo RelatedTopics, flattening named groups of sub-topics"""
+    for topic in related_topics:
+        if not isinstance(topic, dict):
+            continue
+        if "Text" in topic:
+            yield topic["Text"]
+        elif "Topics" in topic:
+            yield from iter_topic_texts(topic["Topics"])
+
+
+@lru_cache(maxsize=None)
+def get_topic_classifier() -> TopicClassifier:
+    return TopicClassifier()
@@ -1,42 +1,197 @@
 import os
-from typing import List, Dict, Any, Optional
-from langchain.agents import AgentExecutor, create_openai_tools_agent
-from langchain.agents.agent import BaseSingleActionAgent
-from langchain_openai import ChatOpenAI
-from langchain.tools import tool
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.schema import BaseMessage
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 from dotenv import load_dotenv
-import requests
-import json
-from datetime import datetime, timedelta
-from dateutil import parser as date_parser
+import threading
+import time
+from datetime import datetime
+from model_router import CAPABLE_TIER, FAST_TIER, ModelRouter, new_usage_handler
+from usage_tracking import SessionUsage, TurnUsage, compact_history, estimate_cost
+from travel_data import GENERIC_HOTELS, get_airline_name, get_curated_hotels
+from recommendations_catalog import get_curated_recommendations
+from web_recommendations import format_web_recommendations, get_web_recommendations
+from airports import resolve_airports, resolve_location_code
+from geocoding import geocode_city
+from amadeus_client import AmadeusError, get_amadeus_client
+from currency import SEARCH_CURRENCY, CurrencyConverter, format_money
+from hotel_pricing import HOTEL_LIST_FIELDS, MAX_PRICED_HOTELS, estimate_nightly_price, price_hotels
+from hotel_ranking import hotel_coordinates, hotel_rating, rank_hotels, resolve_points_of_interest
+from flight_search import (airports_around, describe_segments, flexible_date_search, format_price_matrix,
+                           nearby_airports_search, search_flight_offers, stream_flight_offers)
+from flight_ranking import OfferMetrics, rank_offers
+from itinerary import (MAX_HIGHLIGHTS, FlightOption, FlightSearch, HotelOption, HotelSearch, Itinerary,
+                       current_itinerary, recording)
+
+# LangChain and the HTTP clients are imported where they are first used so that
+# importing this module (Streamlit cold start, CLI one-liners) stays cheap
+if TYPE_CHECKING:
+    from langchain.schema import BaseMessage
 
 # Load environment variables
 load_dotenv()
 
+# City codes and hotel lists by city change rarely
+REFERENCE_DATA_TTL = 24 * 3600
+
+def format_hotel_list(city: str, check_in: str, check_out: str, hotels, source_label: str,
+                      currency: str = "USD") -> str:
+    """Format curated or simulated hotels (priced in USD) with per-night and total prices"""
+    check_in_date = datetime.strptime(check_in, "%Y-%m-%d")
+    check_out_date = datetime.strptime(check_out, "%Y-%m-%d")
+    nights = (check_out_date - check_in_date).days
+    converter = CurrencyConverter(currency)
+    
+    result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [{source_label}]:\n"
+    options = []
+    for i, hotel in enumerate(hotels, 1):
+        price, price_currency = converter.convert(hotel["price"], "USD")
+        options.append(HotelOption(i, hotel["name"], hotel["location"], price, price * nights, price_currency))
+        result += f"{i}. {hotel['name']} ({hotel['rating']}★)\n"
+        result += f"   Location: {hotel['location']}\n"
+        result += f"   Price per night: {format_money(price, price_currency)}\n"
+        result += f"   Total for {nights} nights: {format_money(price * nights, price_currency)}\n"
+        result += f"   Amenities: {', '.join(hotel['amenities'])}\n\n"
+    record_hotel_options(city, check_in, check_out, options)
+    return result
+
+def record_hotel_options(city: str, check_in: str, check_out: str, options: List[HotelOption]):
+    """Remember the hotels just shown in the itinerary of the running chat turn"""
+    itinerary = current_itinerary()
+    if itinerary is not None:
+        itinerary.hotel_search = HotelSearch(city, check_in, check_out, options)
+
+def record_flight_options(origin: str, destination: str, departure_date: str, return_date: str,
+                          options: List[FlightOption]):
+    """Remember the flight options just shown in the itinerary of the running chat turn"""
+    itinerary = current_itinerary()
+    if itinerary is not None:
+        itinerary.flight_search = FlightSearch(origin, destination, departure_date, return_date, options)
+
+def format_curated_hotels(city: str, check_in: str, check_out: str, currency: str = "USD") -> str:
+    """Hotel fallback: curated hotels for known cities, simulated ones otherwise"""
+    hotels, is_curated = get_curated_hotels(city)
+    return format_hotel_list(city, check_in, check_out, hotels,
+                             "Local Recommendations" if is_curated else "Simulated Data", currency)
+
+def format_flight_segment(segment: Dict[str, Any]) -> str:
+    """One bullet line per flight segment: route, airline, flight number and date"""
+    departure = segment.get('departure', {})
+    arrival = segment.get('arrival', {})
+    airline_code = segment.get('carrierCode', 'N/A')
+    airline_name = get_airline_name(airline_code)
+    flight_number = segment.get('flightNumber') or segment.get('number', 'N/A')
+    departure_date = departure.get('at', 'N/A')
+    
+    if departure_date != 'N/A':
+        try:
+            date_obj = datetime.fromisoformat(departure_date.replace('Z', '+00:00'))
+            formatted_date = date_obj.strftime('%b %d')
+        except:
+            formatted_date = 'N/A'
+    else:
+        formatted_date = 'N/A'
+    
+    return f"• {departure.get('iataCode', 'N/A')} → {arrival.get('iataCode', 'N/A')} ({airline_name} {flight_number}, {formatted_date})\n"
+
+def format_flight_offer(option_number: int, offer: Dict[str, Any], currency: str,
+                        metrics: Optional[OfferMetrics] = None) -> str:
+    """Full option block for a flight offer: airline, price and every outbound/return segment"""
+    price = offer["price"]["total"]
+    currency = offer["price"].get("currency") or currency
+    itineraries = offer["itineraries"]
+    outbound_segments = itineraries[0]["segments"]
+    inbound_segments = itineraries[1]["segments"] if len(itineraries) > 1 else []
+    
+    # Get airline info for the main carrier
+    main_airline_code = outbound_segments[0].get('carrierCode', 'N/A') if outbound_segments else 'N/A'
+    main_airline_name = get_airline_name(main_airline_code)
+    
+    result = f"**Option {option_number}: {main_airline_name}**\n"
+    result += f"**Total Price: {price} {currency}**\n"
+    if metrics:
+        hours, minutes = divmod(metrics.duration, 60)
+        result += f"**Total Flight Time: {hours}h {minutes:02d}m | Stops: {metrics.stops}**\n"
+    result += f"**Outbound Flight:**\n"
+    for segment in outbound_segments:
+        result += format_flight_segment(segment)
+    
+    # Inbound flight details
+    if inbound_segments:
+        result += f"**Return Flight:**\n"
+        for segment in inbound_segments:
+            result += format_flight_segment(segment)
+    
+    result += f"---\n"
+    return result
+
+def unresolved_places_message(places: Dict[str, Any]) -> Optional[str]:
+    """Ask for an airport when a place name resolved to no airport code, else None"""
+    unknown = [place for place, resolved in places.items() if not resolved]
+    if not unknown:
+        return None
+    names = " or ".join(f"'{place}'" for place in unknown)
+    return (f"I couldn't find an airport for {names}. Please ask the user for the nearest airport "
+            "or its IATA code instead of guessing.")
+
+def flight_option(option_number: int, offer: Dict[str, Any], origin: str, destination: str) -> FlightOption:
+    """Itinerary entry for a displayed flight offer"""
+    itineraries = offer["itineraries"]
+    outbound_segments = itineraries[0]["segments"]
+    carrier = outbound_segments[0].get("carrierCode", "N/A") if outbound_segments else "N/A"
+    return FlightOption(
+        option=option_number,
+        airline=get_airline_name(carrier),
+        price=float(offer["price"]["total"]),
+        currency=offer["price"].get("currency", ""),
+        origin=origin,
+        destination=destination,
+        outbound=describe_segments(outbound_segments),
+        inbound=describe_segments(itineraries[1]["segments"]) if len(itineraries) > 1 else "",
+    )
+
 class TravelAgent:
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
+    def __init__(self, router: Optional[ModelRouter] = None, tools: Optional[List] = None):
+        # Without an explicit router, build the OpenAI fast/capable tiers from the environment
+        self.router = router or ModelRouter.from_env()
+        self.llm = self.router.capable_llm
         
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.7,
-            api_key=api_key
-        )
-        self.tools = self._create_tools()
-        self.agent = self._create_agent()
-        self.agent_executor = AgentExecutor(
-            agent=self.agent,  # type: ignore
-            tools=self.tools,
-            verbose=True,
-            handle_parsing_errors=True
-        )
+        # Tools and per-tier executors are built on first use; load tests pass replayed tools instead
+        self._tools = tools
+        self.agent_executors = {}
+        self._build_lock = threading.Lock()
+    
+    @property
+    def tools(self) -> List:
+        if self._tools is None:
+            with self._build_lock:
+                if self._tools is None:
+                    self._tools = self._create_tools()
+        return self._tools
+    
+    @property
+    def agent_executor(self):
+        return self.get_agent_executor(CAPABLE_TIER)
+    
+    def get_agent_executor(self, tier: str):
+        """Return the agent executor for a model tier, building it on first use"""
+        executor = self.agent_executors.get(tier)
+        if executor is None:
+            from langchain.agents import AgentExecutor
+            tools = self.tools
+            with self._build_lock:
+                executor = self.agent_executors.get(tier)
+                if executor is None:
+                    executor = AgentExecutor(
+                        agent=self._create_agent(self.router.llm_for(tier)),  # type: ignore
+                        tools=tools,
+                        verbose=True,
+                        handle_parsing_errors=True
+                    )
+                    self.agent_executors[tier] = executor
+        return executor
     
     def _create_tools(self) -> List:
         """Create tools for the travel agent"""
+        from langchain.tools import tool
         
         # @tool
         # def search_flights(origin: str, destination: str, date: str, passengers: int = 1) -> str:
@@ -109,47 +264,35 @@ class TravelAgent:
         #     return result
 
         @tool
-        def search_hotels_amadeus(city: str, check_in: str, check_out: str, guests: int = 1) -> str:
+        def search_hotels_amadeus(city: str, check_in: str, check_out: str, guests: int = 1,
+                                  near: Optional[str] = None, currency: str = "USD") -> str:
             """Search for available hotels in a specific city using Amadeus API.
             Args:
                 city: City name (e.g., 'Paris', 'Tokyo', 'New York')
                 check_in: Check-in date in YYYY-MM-DD format
                 check_out: Check-out date in YYYY-MM-DD format
                 guests: Number of guests (default: 1)
+                near: Optional points of interest to stay close to, separated by ';' - either
+                    'latitude,longitude' pairs (e.g., '48.8584,2.2945; 48.8606,2.3376') or place names
+                currency: Display currency, e.g. 'EUR' (default: USD)
             Returns:
                 String with hotel options and prices
             """
-            import requests
-            import os
             from datetime import datetime
             
-            # Get Amadeus credentials
-            client_id = os.getenv("AMADEUS_CLIENT_ID")
-            client_secret = os.getenv("AMADEUS_CLIENT_SECRET")
-            
-            if not client_id or not client_secret:
+            # Shared client: cached access token, rate limiting and response cache
+            client = get_amadeus_client()
+            if client is None:
                 return "Amadeus API credentials not found. Please check your .env file."
             
             try:
-                # Get access token
-                token_url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-                token_data = {
-                    "grant_type": "client_credentials",
-                    "client_id": client_id,
-                    "client_secret": client_secret
-                }
-                
-                token_response = requests.post(token_url, data=token_data)
-                if token_response.status_code != 200:
-                    return f"Failed to get access token: {token_response.status_code}"
-                
-                access_token = token_response.json()["access_token"]
-                
-                # Search for hotels
-                headers = {"Authorization": f"Bearer {access_token}"}
+                try:
+                    client.access_token()
+                except AmadeusError as e:
+                    return f"Failed to get access token: {e.status_code}"
                 
                 # First, get the city code using the city search API
-                city_search_url = "https://test.api.amadeus.com/v1/reference-data/locations"
+                city_search_path = "/v1/reference-data/locations"
                 
                 # Try different city name variations
                 city_variations = [city, f"{city} City", f"{city} Metropolitan Area"]
@@ -162,236 +305,37 @@ class TravelAgent:
                         "page[limit]": 5  # Get more results to find the right city
                     }
                     
-                    city_response = requests.get(city_search_url, headers=headers, params=city_params)
-                    if city_response.status_code == 200:
-                        city_data = city_response.json()
-                        if city_data.get("data"):
-                            # Find the best match
-                            for location in city_data["data"]:
-                                if location.get("address", {}).get("cityName", "").lower() == city.lower():
-                                    city_code = location["address"]["cityCode"]
-                                    break
-                            if city_code:
+                    try:
+                        city_data = client.get(city_search_path, city_params, cache_ttl=REFERENCE_DATA_TTL)
+                    except AmadeusError:
+                        continue
+                    if city_data.get("data"):
+                        # Find the best match
+                        for location in city_data["data"]:
+                            if location.get("address", {}).get("cityName", "").lower() == city.lower():
+                                city_code = location["address"]["cityCode"]
                                 break
+                        if city_code:
+                            break
                 
                 if not city_code:
                     # Comprehensive fallback with city-specific hotels
-                    from datetime import datetime
-                    check_in_date = datetime.strptime(check_in, "%Y-%m-%d")
-                    check_out_date = datetime.strptime(check_out, "%Y-%m-%d")
-                    nights = (check_out_date - check_in_date).days
-                    
-                    city_lower = city.lower().strip()
-                    
-                    # Tokyo-specific hotels
-                    if 'tokyo' in city_lower:
-                        hotels = [
-                            {"name": "Park Hyatt Tokyo", "rating": 4.8, "location": "Shinjuku", "price": 450, "amenities": ["WiFi", "Pool", "Spa", "Restaurant", "City View"]},
-                            {"name": "Aman Tokyo", "rating": 4.9, "location": "Otemachi", "price": 800, "amenities": ["WiFi", "Spa", "Restaurant", "Gym", "Concierge"]},
-                            {"name": "Hotel Gracery Shinjuku", "rating": 4.2, "location": "Shinjuku", "price": 180, "amenities": ["WiFi", "Restaurant", "Bar", "Convenience Store"]},
-                            {"name": "Shibuya Excel Hotel", "rating": 4.0, "location": "Shibuya", "price": 150, "amenities": ["WiFi", "Restaurant", "Business Center"]},
-                            {"name": "Hotel Century Southern Tower", "rating": 4.3, "location": "Shinjuku", "price": 200, "amenities": ["WiFi", "Restaurant", "Bar", "City View"]},
-                            {"name": "Shinjuku Prince Hotel", "rating": 3.8, "location": "Shinjuku", "price": 120, "amenities": ["WiFi", "Restaurant", "Bar", "Movie Theater"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # Paris-specific hotels
-                    elif 'paris' in city_lower:
-                        hotels = [
-                            {"name": "The Ritz Paris", "rating": 4.9, "location": "Place Vendôme", "price": 1200, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Concierge", "Historic"]},
-                            {"name": "Hotel de Crillon", "rating": 4.8, "location": "Place de la Concorde", "price": 1000, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Pool", "Luxury"]},
-                            {"name": "Le Bristol Paris", "rating": 4.7, "location": "Rue du Faubourg Saint-Honoré", "price": 800, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Pool", "Garden"]},
-                            {"name": "Hotel Plaza Athénée", "rating": 4.6, "location": "Avenue Montaigne", "price": 900, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Eiffel View"]},
-                            {"name": "Le Meurice", "rating": 4.5, "location": "Rue de Rivoli", "price": 750, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Tuileries View"]},
-                            {"name": "Hotel Lutetia", "rating": 4.4, "location": "Left Bank", "price": 400, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Historic"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # London-specific hotels
-                    elif 'london' in city_lower:
-                        hotels = [
-                            {"name": "The Savoy", "rating": 4.9, "location": "Strand", "price": 800, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "River View", "Historic"]},
-                            {"name": "Claridge's", "rating": 4.8, "location": "Mayfair", "price": 900, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Afternoon Tea", "Luxury"]},
-                            {"name": "The Connaught", "rating": 4.7, "location": "Mayfair", "price": 850, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Aman Spa"]},
-                            {"name": "The Dorchester", "rating": 4.6, "location": "Park Lane", "price": 750, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Hyde Park View"]},
-                            {"name": "Brown's Hotel", "rating": 4.5, "location": "Mayfair", "price": 600, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Historic"]},
-                            {"name": "The Goring", "rating": 4.4, "location": "Belgravia", "price": 500, "amenities": ["WiFi", "Restaurant", "Bar", "Garden", "Royal Warrant"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # New York-specific hotels
-                    elif 'new york' in city_lower or 'nyc' in city_lower:
-                        hotels = [
-                            {"name": "The Plaza", "rating": 4.8, "location": "Central Park South", "price": 600, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Central Park View", "Historic"]},
-                            {"name": "Waldorf Astoria", "rating": 4.7, "location": "Park Avenue", "price": 550, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Art Deco", "Luxury"]},
-                            {"name": "The St. Regis", "rating": 4.6, "location": "Fifth Avenue", "price": 700, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Butler Service"]},
-                            {"name": "The Peninsula", "rating": 4.5, "location": "Fifth Avenue", "price": 650, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Rooftop Pool"]},
-                            {"name": "The Carlyle", "rating": 4.4, "location": "Upper East Side", "price": 500, "amenities": ["WiFi", "Restaurant", "Bar", "Bemelmans Bar", "Historic"]},
-                            {"name": "The Mark", "rating": 4.3, "location": "Upper East Side", "price": 450, "amenities": ["WiFi", "Restaurant", "Bar", "Jean-Georges", "Modern"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # Rome-specific hotels
-                    elif 'rome' in city_lower:
-                        hotels = [
-                            {"name": "Hotel de Russie", "rating": 4.8, "location": "Piazza del Popolo", "price": 600, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Garden", "Historic"]},
-                            {"name": "Hassler Roma", "rating": 4.7, "location": "Piazza Trinità dei Monti", "price": 700, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Spanish Steps View"]},
-                            {"name": "Hotel Eden", "rating": 4.6, "location": "Via Ludovisi", "price": 550, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "City View", "Dorchester Collection"]},
-                            {"name": "Palazzo Manfredi", "rating": 4.5, "location": "Via Labicana", "price": 400, "amenities": ["WiFi", "Restaurant", "Bar", "Colosseum View"]},
-                            {"name": "Hotel Raphael", "rating": 4.4, "location": "Piazza Navona", "price": 350, "amenities": ["WiFi", "Restaurant", "Bar", "Rooftop Terrace", "Historic"]},
-                            {"name": "Hotel Locarno", "rating": 4.3, "location": "Via della Penna", "price": 300, "amenities": ["WiFi", "Restaurant", "Bar", "Art Nouveau", "Charming"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # Barcelona-specific hotels
-                    elif 'barcelona' in city_lower:
-                        hotels = [
-                            {"name": "Hotel Arts Barcelona", "rating": 4.8, "location": "Port Olímpic", "price": 400, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Beach Access", "Ritz-Carlton"]},
-                            {"name": "W Barcelona", "rating": 4.7, "location": "Barceloneta", "price": 350, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Beachfront", "Modern"]},
-                            {"name": "Hotel Majestic", "rating": 4.6, "location": "Passeig de Gràcia", "price": 300, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Gaudí Architecture"]},
-                            {"name": "Casa Fuster", "rating": 4.5, "location": "Passeig de Gràcia", "price": 280, "amenities": ["WiFi", "Restaurant", "Bar", "Modernist Building", "Historic"]},
-                            {"name": "Hotel 1898", "rating": 4.4, "location": "La Rambla", "price": 250, "amenities": ["WiFi", "Restaurant", "Bar", "Rooftop Pool", "Colonial"]},
-                            {"name": "Hotel Neri", "rating": 4.3, "location": "Gothic Quarter", "price": 200, "amenities": ["WiFi", "Restaurant", "Bar", "Historic Building", "Boutique"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # Generic fallback for other cities
-                    else:
-                        hotels = [
-                            {"name": "Grand Hotel", "rating": 4.5, "location": "City Center", "price": 200, "amenities": ["WiFi", "Pool", "Spa", "Restaurant"]},
-                            {"name": "Comfort Inn", "rating": 3.8, "location": "Airport Area", "price": 120, "amenities": ["WiFi", "Breakfast", "Parking"]},
-                            {"name": "Luxury Resort", "rating": 4.9, "location": "Beachfront", "price": 350, "amenities": ["WiFi", "Pool", "Spa", "Restaurant", "Gym", "Beach Access"]},
-                            {"name": "City Suites", "rating": 4.2, "location": "Business District", "price": 180, "amenities": ["WiFi", "Gym", "Breakfast"]},
-                            {"name": "Budget Stay", "rating": 3.5, "location": "Suburbs", "price": 90, "amenities": ["WiFi", "Parking"]},
-                            {"name": "Boutique Escape", "rating": 4.7, "location": "Old Town", "price": 270, "amenities": ["WiFi", "Spa", "Restaurant", "Bar"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Simulated Data]:\n"
-                    
-                    # Display hotel information
-                    for i, hotel in enumerate(hotels, 1):
-                        total_price = hotel["price"] * nights
-                        result += f"{i}. {hotel['name']} ({hotel['rating']}★)\n"
-                        result += f"   Location: {hotel['location']}\n"
-                        result += f"   Price per night: ${hotel['price']}\n"
-                        result += f"   Total for {nights} nights: ${total_price}\n"
-                        result += f"   Amenities: {', '.join(hotel['amenities'])}\n\n"
-                    
-                    return result
+                    return format_curated_hotels(city, check_in, check_out, currency)
                 
                 # Now search for hotels using Amadeus API - Hotel Reference Data
-                hotel_search_url = "https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-city"
                 hotel_params = {
                     "cityCode": city_code,
                     "radius": 5,
                     "radiusUnit": "KM"
                 }
                 
-                hotel_response = requests.get(hotel_search_url, headers=headers, params=hotel_params)
-                if hotel_response.status_code != 200:
+                try:
+                    hotel_data = client.get("/v1/reference-data/locations/hotels/by-city", hotel_params,
+                                            cache_ttl=REFERENCE_DATA_TTL, fields=HOTEL_LIST_FIELDS)
+                except AmadeusError:
                     # Enhanced fallback with city-specific hotels when Amadeus hotel search fails
-                    from datetime import datetime
-                    check_in_date = datetime.strptime(check_in, "%Y-%m-%d")
-                    check_out_date = datetime.strptime(check_out, "%Y-%m-%d")
-                    nights = (check_out_date - check_in_date).days
-                    
-                    city_lower = city.lower().strip()
-                    
-                    # Tokyo-specific hotels
-                    if 'tokyo' in city_lower:
-                        hotels = [
-                            {"name": "Park Hyatt Tokyo", "rating": 4.8, "location": "Shinjuku", "price": 450, "amenities": ["WiFi", "Pool", "Spa", "Restaurant", "City View"]},
-                            {"name": "Aman Tokyo", "rating": 4.9, "location": "Otemachi", "price": 800, "amenities": ["WiFi", "Spa", "Restaurant", "Gym", "Concierge"]},
-                            {"name": "Hotel Gracery Shinjuku", "rating": 4.2, "location": "Shinjuku", "price": 180, "amenities": ["WiFi", "Restaurant", "Bar", "Convenience Store"]},
-                            {"name": "Shibuya Excel Hotel", "rating": 4.0, "location": "Shibuya", "price": 150, "amenities": ["WiFi", "Restaurant", "Business Center"]},
-                            {"name": "Hotel Century Southern Tower", "rating": 4.3, "location": "Shinjuku", "price": 200, "amenities": ["WiFi", "Restaurant", "Bar", "City View"]},
-                            {"name": "Shinjuku Prince Hotel", "rating": 3.8, "location": "Shinjuku", "price": 120, "amenities": ["WiFi", "Restaurant", "Bar", "Movie Theater"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # Paris-specific hotels
-                    elif 'paris' in city_lower:
-                        hotels = [
-                            {"name": "The Ritz Paris", "rating": 4.9, "location": "Place Vendôme", "price": 1200, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Concierge", "Historic"]},
-                            {"name": "Hotel de Crillon", "rating": 4.8, "location": "Place de la Concorde", "price": 1000, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Pool", "Luxury"]},
-                            {"name": "Le Bristol Paris", "rating": 4.7, "location": "Rue du Faubourg Saint-Honoré", "price": 800, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Pool", "Garden"]},
-                            {"name": "Hotel Plaza Athénée", "rating": 4.6, "location": "Avenue Montaigne", "price": 900, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Eiffel View"]},
-                            {"name": "Le Meurice", "rating": 4.5, "location": "Rue de Rivoli", "price": 750, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Tuileries View"]},
-                            {"name": "Hotel Lutetia", "rating": 4.4, "location": "Left Bank", "price": 400, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Historic"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # London-specific hotels
-                    elif 'london' in city_lower:
-                        hotels = [
-                            {"name": "The Savoy", "rating": 4.9, "location": "Strand", "price": 800, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "River View", "Historic"]},
-                            {"name": "Claridge's", "rating": 4.8, "location": "Mayfair", "price": 900, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Afternoon Tea", "Luxury"]},
-                            {"name": "The Connaught", "rating": 4.7, "location": "Mayfair", "price": 850, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Aman Spa"]},
-                            {"name": "The Dorchester", "rating": 4.6, "location": "Park Lane", "price": 750, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Hyde Park View"]},
-                            {"name": "Brown's Hotel", "rating": 4.5, "location": "Mayfair", "price": 600, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Historic"]},
-                            {"name": "The Goring", "rating": 4.4, "location": "Belgravia", "price": 500, "amenities": ["WiFi", "Restaurant", "Bar", "Garden", "Royal Warrant"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # New York-specific hotels
-                    elif 'new york' in city_lower or 'nyc' in city_lower:
-                        hotels = [
-                            {"name": "The Plaza", "rating": 4.8, "location": "Central Park South", "price": 600, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Central Park View", "Historic"]},
-                            {"name": "Waldorf Astoria", "rating": 4.7, "location": "Park Avenue", "price": 550, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Art Deco", "Luxury"]},
-                            {"name": "The St. Regis", "rating": 4.6, "location": "Fifth Avenue", "price": 700, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Butler Service"]},
-                            {"name": "The Peninsula", "rating": 4.5, "location": "Fifth Avenue", "price": 650, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Rooftop Pool"]},
-                            {"name": "The Carlyle", "rating": 4.4, "location": "Upper East Side", "price": 500, "amenities": ["WiFi", "Restaurant", "Bar", "Bemelmans Bar", "Historic"]},
-                            {"name": "The Mark", "rating": 4.3, "location": "Upper East Side", "price": 450, "amenities": ["WiFi", "Restaurant", "Bar", "Jean-Georges", "Modern"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # Rome-specific hotels
-                    elif 'rome' in city_lower:
-                        hotels = [
-                            {"name": "Hotel de Russie", "rating": 4.8, "location": "Piazza del Popolo", "price": 600, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Garden", "Historic"]},
-                            {"name": "Hassler Roma", "rating": 4.7, "location": "Piazza Trinità dei Monti", "price": 700, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Spanish Steps View"]},
-                            {"name": "Hotel Eden", "rating": 4.6, "location": "Via Ludovisi", "price": 550, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "City View", "Dorchester Collection"]},
-                            {"name": "Palazzo Manfredi", "rating": 4.5, "location": "Via Labicana", "price": 400, "amenities": ["WiFi", "Restaurant", "Bar", "Colosseum View"]},
-                            {"name": "Hotel Raphael", "rating": 4.4, "location": "Piazza Navona", "price": 350, "amenities": ["WiFi", "Restaurant", "Bar", "Rooftop Terrace", "Historic"]},
-                            {"name": "Hotel Locarno", "rating": 4.3, "location": "Via della Penna", "price": 300, "amenities": ["WiFi", "Restaurant", "Bar", "Art Nouveau", "Charming"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # Barcelona-specific hotels
-                    elif 'barcelona' in city_lower:
-                        hotels = [
-                            {"name": "Hotel Arts Barcelona", "rating": 4.8, "location": "Port Olímpic", "price": 400, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Beach Access", "Ritz-Carlton"]},
-                            {"name": "W Barcelona", "rating": 4.7, "location": "Barceloneta", "price": 350, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Beachfront", "Modern"]},
-                            {"name": "Hotel Majestic", "rating": 4.6, "location": "Passeig de Gràcia", "price": 300, "amenities": ["WiFi", "Spa", "Restaurant", "Bar", "Gaudí Architecture"]},
-                            {"name": "Casa Fuster", "rating": 4.5, "location": "Passeig de Gràcia", "price": 280, "amenities": ["WiFi", "Restaurant", "Bar", "Modernist Building", "Historic"]},
-                            {"name": "Hotel 1898", "rating": 4.4, "location": "La Rambla", "price": 250, "amenities": ["WiFi", "Restaurant", "Bar", "Rooftop Pool", "Colonial"]},
-                            {"name": "Hotel Neri", "rating": 4.3, "location": "Gothic Quarter", "price": 200, "amenities": ["WiFi", "Restaurant", "Bar", "Historic Building", "Boutique"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Local Recommendations]:\n"
-                    
-                    # Generic fallback for other cities
-                    else:
-                        hotels = [
-                            {"name": "Grand Hotel", "rating": 4.5, "location": "City Center", "price": 200, "amenities": ["WiFi", "Pool", "Spa", "Restaurant"]},
-                            {"name": "Comfort Inn", "rating": 3.8, "location": "Airport Area", "price": 120, "amenities": ["WiFi", "Breakfast", "Parking"]},
-                            {"name": "Luxury Resort", "rating": 4.9, "location": "Beachfront", "price": 350, "amenities": ["WiFi", "Pool", "Spa", "Restaurant", "Gym", "Beach Access"]},
-                            {"name": "City Suites", "rating": 4.2, "location": "Business District", "price": 180, "amenities": ["WiFi", "Gym", "Breakfast"]},
-                            {"name": "Budget Stay", "rating": 3.5, "location": "Suburbs", "price": 90, "amenities": ["WiFi", "Parking"]},
-                            {"name": "Boutique Escape", "rating": 4.7, "location": "Old Town", "price": 270, "amenities": ["WiFi", "Spa", "Restaurant", "Bar"]}
-                        ]
-                        result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Simulated Data]:\n"
-                    
-                    # Display hotel information
-                    for i, hotel in enumerate(hotels, 1):
-                        total_price = hotel["price"] * nights
-                        result += f"{i}. {hotel['name']} ({hotel['rating']}★)\n"
-                        result += f"   Location: {hotel['location']}\n"
-                        result += f"   Price per night: ${hotel['price']}\n"
-                        result += f"   Total for {nights} nights: ${total_price}\n"
-                        result += f"   Amenities: {', '.join(hotel['amenities'])}\n\n"
-                    
-                    return result
+                    return format_curated_hotels(city, check_in, check_out, currency)
                 
-                hotel_data = hotel_response.json()
                 hotels = hotel_data.get("data", [])
                 
                 if not hotels:
@@ -402,9 +346,39 @@ class TravelAgent:
                 check_out_date = datetime.strptime(check_out, "%Y-%m-%d")
                 nights = (check_out_date - check_in_date).days
                 
+                # Rank every hotel by distance to the center and points of interest,
+                # chain price estimate and rating to pick the ones worth pricing
+                center = geocode_city(city)
+                points = resolve_points_of_interest(near, city) if near else []
+                pois = [point for _, point in points]
+                coordinates = [hotel_coordinates(hotel) for hotel in hotels]
+                ratings = [hotel_rating(hotel) for hotel in hotels]
+                estimates = [estimate_nightly_price(hotel.get("chainCode", "")) for hotel in hotels]
+                shortlist = rank_hotels(coordinates, estimates, ratings, center, pois, k=MAX_PRICED_HOTELS).order
+                
+                # Price the shortlist with batched multi-hotel offers requests, then
+                # rank it again with live nightly prices where there are any
+                candidates = [hotels[i] for i in shortlist]
+                prices = price_hotels(client, [hotel.get("hotelId", "") for hotel in candidates],
+                                      check_in, check_out, guests)
+                # Live offers come in each hotel's local currency; rank them in the display
+                # currency only, using the chain estimate when an offer has no rate
+                converter = CurrencyConverter(currency)
+                nightly = []
+                for i, hotel in zip(shortlist, candidates):
+                    price = prices.get(hotel.get("hotelId"))
+                    amount = converter.convert_or_none(price.per_night, price.currency) if price else None
+                    nightly.append(amount if amount is not None else converter.convert_or_none(estimates[i], "USD"))
+                ranking = rank_hotels([coordinates[i] for i in shortlist], nightly, [ratings[i] for i in shortlist],
+                                      center, pois, k=6)  # Limit to 6 hotels
+                
                 result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Amadeus API]:\n"
+                if near and not points:
+                    result += f"(Could not locate '{near}'; ranked by distance to the city center)\n"
                 
-                for i, hotel in enumerate(hotels[:6], 1):  # Limit to 6 hotels
+                options = []
+                for i, candidate in enumerate(ranking.order, 1):
+                    hotel = candidates[candidate]
                     # Get hotel details from reference data
                     name = hotel.get("name", "Unknown Hotel")
                     chain_code = hotel.get("chainCode", "")
@@ -425,57 +399,38 @@ class TravelAgent:
                     address = hotel.get("address", {})
                     country_code = address.get("countryCode", "")
                     
-                    # Since this is reference data, we don't have pricing or amenities
-                    # We'll use estimated pricing based on hotel type
-                    estimated_price = 200  # Default estimated price
-                    if chain_code in ["HI", "AC", "CP"]:  # Holiday Inn, Accor, Choice
-                        estimated_price = 150
-                    elif chain_code in ["MA", "RI", "SH"]:  # Marriott, Ritz, Sheraton
-                        estimated_price = 300
-                    elif chain_code in ["ZZ", "NN"]:  # Independent hotels
-                        estimated_price = 180
-                    
-                    total_price = estimated_price * nights
-                    
                     result += f"{i}. {name}\n"
                     result += f"   Chain: {chain_code} | IATA: {iata_code}\n"
                     result += f"   Location: {city}, {country_code}\n"
                     result += f"   Distance: {distance_value} {distance_unit} from city center\n"
-                    result += f"   Estimated Price: ${estimated_price} per night\n"
-                    result += f"   Total for {nights} nights: ${total_price}\n"
+                    if ranking.poi_km[candidate] is not None:
+                        label = points[ranking.nearest_poi[candidate]][0]
+                        result += f"   Near: {ranking.poi_km[candidate]:.1f} km from {label}\n"
+                    
+                    price = prices.get(hotel_id)
+                    if price:
+                        room = f" ({price.room})" if price.room else ""
+                        per_night, price_currency = converter.convert(price.per_night, price.currency)
+                        total, _ = converter.convert(price.total, price.currency)
+                        result += f"   Price: {format_money(per_night, price_currency)} per night{room}\n"
+                        result += f"   Total for {nights} nights: {format_money(total, price_currency)}\n"
+                        options.append(HotelOption(i, name, f"{city}, {country_code}", per_night, total, price_currency))
+                    else:
+                        # No live offer for these dates; estimate from the hotel chain
+                        estimated_price, price_currency = converter.convert(estimate_nightly_price(chain_code), "USD")
+                        result += f"   Estimated Price: {format_money(estimated_price, price_currency)} per night\n"
+                        result += f"   Total for {nights} nights: {format_money(estimated_price * nights, price_currency)}\n"
+                        options.append(HotelOption(i, name, f"{city}, {country_code}", estimated_price,
+                                                   estimated_price * nights, price_currency, estimated=True))
                     result += f"   Coordinates: {latitude}, {longitude}\n\n"
                 
+                record_hotel_options(city, check_in, check_out, options)
                 return result
 
             except Exception as e:
                 # Fallback to simulated hotel data if Amadeus API fails
                 try:
-                    from datetime import datetime
-                    check_in_date = datetime.strptime(check_in, "%Y-%m-%d")
-                    check_out_date = datetime.strptime(check_out, "%Y-%m-%d")
-                    nights = (check_out_date - check_in_date).days
-                    
-                    # Simulated hotel data as fallback
-                    hotels = [
-                        {"name": "Grand Hotel", "rating": 4.5, "location": "City Center", "price": 200, "amenities": ["WiFi", "Pool", "Spa", "Restaurant"]},
-                        {"name": "Comfort Inn", "rating": 3.8, "location": "Airport Area", "price": 120, "amenities": ["WiFi", "Breakfast", "Parking"]},
-                        {"name": "Luxury Resort", "rating": 4.9, "location": "Beachfront", "price": 350, "amenities": ["WiFi", "Pool", "Spa", "Restaurant", "Gym", "Beach Access"]},
-                        {"name": "City Suites", "rating": 4.2, "location": "Business District", "price": 180, "amenities": ["WiFi", "Gym", "Breakfast"]},
-                        {"name": "Budget Stay", "rating": 3.5, "location": "Suburbs", "price": 90, "amenities": ["WiFi", "Parking"]},
-                        {"name": "Boutique Escape", "rating": 4.7, "location": "Old Town", "price": 270, "amenities": ["WiFi", "Spa", "Restaurant", "Bar"]}
-                    ]
-                    
-                    result = f"Found {len(hotels)} hotels in {city} from {check_in} to {check_out} ({nights} nights) [Simulated Data]:\n"
-                    
-                    for i, hotel in enumerate(hotels, 1):
-                        total_price = hotel["price"] * nights
-                        result += f"{i}. {hotel['name']} ({hotel['rating']}★)\n"
-                        result += f"   Location: {hotel['location']}\n"
-                        result += f"   Price per night: ${hotel['price']}\n"
-                        result += f"   Total for {nights} nights: ${total_price}\n"
-                        result += f"   Amenities: {', '.join(hotel['amenities'])}\n\n"
-                    
-                    return result
+                    return format_hotel_list(city, check_in, check_out, GENERIC_HOTELS, "Simulated Data", currency)
                 except:
                     return f"Error searching hotels: {str(e)}"
 
@@ -496,15 +451,11 @@ class TravelAgent:
             api_key = os.getenv("OPENWEATHER_API_KEY")
             if not api_key:
                 return "OpenWeatherMap API key is missing. Please set OPENWEATHER_API_KEY in your .env file."
-            # Step 1: Get latitude and longitude for the city
-            geo_url = "http://api.openweathermap.org/geo/1.0/direct"
-            geo_params = {"q": city, "limit": 1, "appid": api_key}
-            geo_resp = requests.get(geo_url, params=geo_params)
-            geo_data = geo_resp.json()
-            if not geo_data or geo_data[0].get("lat") is None or geo_data[0].get("lon") is None:
+            # Step 1: Get latitude and longitude for the city (shared with the flight tools)
+            coordinates = geocode_city(city, use_bundled=False)
+            if coordinates is None:
                 return f"Could not find coordinates for {city}."
-            lat = geo_data[0]["lat"]
-            lon = geo_data[0]["lon"]
+            lat, lon = coordinates
             # Step 2: Get weather forecast
             forecast_url = "http://api.openweathermap.org/data/2.5/forecast"
             forecast_params = {"lat": lat, "lon": lon, "appid": api_key, "units": "imperial"}
@@ -533,7 +484,11 @@ class TravelAgent:
             dt_txt = closest["dt_txt"]
             temp = closest["main"]["temp"]
             weather = closest["weather"][0]["description"]
-            return f"Weather forecast for {city} on {dt_txt}: {temp}°F, {weather}."
+            forecast = f"Weather forecast for {city} on {dt_txt}: {temp}°F, {weather}."
+            itinerary = current_itinerary()
+            if itinerary is not None:
+                itinerary.weather[city] = forecast
+            return forecast
         
         @tool
         def get_travel_recommendations(city: str, interests: str = "general") -> str:
@@ -546,142 +501,24 @@ class TravelAgent:
             Returns:
                 String with travel recommendations
             """
-            import requests
-            import re
-            
-            # First, try to get web search results for travel recommendations
+            # First, try web search results (cached on disk per city and interests)
             try:
-                # Use DuckDuckGo Instant Answer API (free, no API key needed)
-                search_query = f"{city} travel guide attractions restaurants activities"
-                search_url = "https://api.duckduckgo.com/"
-                params = {
-                    "q": search_query,
-                    "format": "json",
-                    "no_html": "1",
-                    "skip_disambig": "1"
-                }
-                
-                response = requests.get(search_url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Extract information from the response
-                    abstract = data.get("Abstract", "")
-                    related_topics = data.get("RelatedTopics", [])
-                    
-                    # Build recommendations from web data
-                    result = f"Travel recommendations for {city}:\n\n"
-                    
-                    # Add abstract if available
-                    if abstract:
-                        result += f"Overview: {abstract}\n\n"
-                    
-                    # Extract attractions and activities from related topics
-                    attractions = []
-                    activities = []
-                    restaurants = []
-                    tips = []
-                    
-                    for topic in related_topics[:10]:  # Limit to first 10 topics
-                        if isinstance(topic, dict) and "Text" in topic:
-                            text = topic["Text"]
-                            # Categorize based on keywords
-                            if any(keyword in text.lower() for keyword in ["museum", "park", "tower", "palace", "temple", "monument", "landmark"]):
-                                attractions.append(text)
-                            elif any(keyword in text.lower() for keyword in ["restaurant", "cafe", "dining", "food", "cuisine"]):
-                                restaurants.append(text)
-                            elif any(keyword in text.lower() for keyword in ["hiking", "skiing", "swimming", "tour", "walking", "adventure"]):
-                                activities.append(text)
-                            else:
-                                tips.append(text)
-                    
-                    # Add categorized recommendations
-                    if attractions:
-                        result += "Top Attractions\n"
-                        for i, attraction in enumerate(attractions[:5], 1):
-                            result += f"{i}. {attraction}\n"
-                        result += "\n"
-                    
-                    if restaurants:
-                        result += "Recommended Restaurants\n"
-                        for i, restaurant in enumerate(restaurants[:3], 1):
-                            result += f"{i}. {restaurant}\n"
-                        result += "\n"
-                    
-                    if activities:
-                        result += "Popular Activities\n"
-                        for i, activity in enumerate(activities[:3], 1):
-                            result += f"{i}. {activity}\n"
-                        result += "\n"
-                    
-                    if tips:
-                        result += "Travel Tips\n"
-                        for i, tip in enumerate(tips[:3], 1):
-                            result += f"{i}. {tip}\n"
-                    
-                    # If we got some data, return it
-                    if abstract or attractions or activities or restaurants:
-                        return result
-                
+                web_data = get_web_recommendations(city, interests)
+                if web_data:
+                    if current_itinerary() is not None and web_data["attractions"]:
+                        current_itinerary().highlights[city] = web_data["attractions"][:MAX_HIGHLIGHTS]
+                    return format_web_recommendations(city, web_data)
             except Exception as e:
                 # If web search fails, continue to fallback
                 pass
             
-            # Fallback to curated recommendations for major cities
-            recommendations = {
-                "Paris": {
-                    "attractions": ["Eiffel Tower", "Louvre Museum", "Notre-Dame Cathedral", "Arc de Triomphe"],
-                    "restaurants": ["Le Jules Verne", "L'Astrance", "Pierre Gagnaire"],
-                    "activities": ["Seine River Cruise", "Montmartre Walking Tour", "Wine Tasting"],
-                    "tips": ["Visit museums on first Sunday of month for free entry", "Book Eiffel Tower tickets in advance"]
-                },
-                "Tokyo": {
-                    "attractions": ["Senso-ji Temple", "Tokyo Skytree", "Shibuya Crossing", "Tsukiji Fish Market"],
-                    "restaurants": ["Sukiyabashi Jiro", "Narisawa", "Den"],
-                    "activities": ["Cherry Blossom Viewing", "Robot Restaurant Show", "Traditional Tea Ceremony"],
-                    "tips": ["Get a Japan Rail Pass for train travel", "Learn basic Japanese phrases"]
-                },
-                "New York": {
-                    "attractions": ["Statue of Liberty", "Central Park", "Times Square", "Empire State Building"],
-                    "restaurants": ["Le Bernardin", "Eleven Madison Park", "Per Se"],
-                    "activities": ["Broadway Show", "Brooklyn Bridge Walk", "Museum of Modern Art"],
-                    "tips": ["Get a MetroCard for subway access", "Book Broadway tickets in advance"]
-                },
-                "London": {
-                    "attractions": ["Big Ben", "Tower of London", "Buckingham Palace", "British Museum"],
-                    "restaurants": ["The Fat Duck", "Gordon Ramsay", "Sketch"],
-                    "activities": ["Thames River Cruise", "West End Show", "Changing of the Guard"],
-                    "tips": ["Get an Oyster card for public transport", "Book attractions in advance"]
-                },
-                "Rome": {
-                    "attractions": ["Colosseum", "Vatican Museums", "Trevi Fountain", "Pantheon"],
-                    "restaurants": ["La Pergola", "Il Pagliaccio", "Aroma"],
-                    "activities": ["Vatican Tour", "Roman Forum Walk", "Gelato Tasting"],
-                    "tips": ["Book Vatican tickets online to skip lines", "Visit early morning to avoid crowds"]
-                },
-                "Barcelona": {
-                    "attractions": ["Sagrada Familia", "Park Güell", "Casa Batlló", "La Rambla"],
-                    "restaurants": ["El Celler de Can Roca", "Tickets", "Disfrutar"],
-                    "activities": ["Gaudi Architecture Tour", "Tapas Crawl", "Beach Day"],
-                    "tips": ["Book Sagrada Familia tickets in advance", "Learn basic Catalan phrases"]
-                },
-                "Aspen": {
-                    "attractions": ["Aspen Mountain", "Maroon Bells", "Aspen Art Museum", "Wheeler Opera House"],
-                    "restaurants": ["Element 47", "Cache Cache", "Matsuhisa"],
-                    "activities": ["Skiing/Snowboarding", "Hiking Maroon Bells", "Hot Springs"],
-                    "tips": ["Visit during shoulder seasons for better deals", "Book ski passes in advance"]
-                },
-                "Colorado": {
-                    "attractions": ["Rocky Mountain National Park", "Garden of the Gods", "Mesa Verde", "Pikes Peak"],
-                    "restaurants": ["Fruition", "Acorn", "Mercantile"],
-                    "activities": ["Hiking", "Rock Climbing", "White Water Rafting", "Skiing"],
-                    "tips": ["Check weather conditions before outdoor activities", "Get altitude acclimation"]
-                }
-            }
+            # Fallback to the curated catalog, ranked by the requested interests
+            city_data = get_curated_recommendations(city, interests)
             
             # Check if we have curated data for this city
-            if city in recommendations:
-                city_data = recommendations[city]
+            if city_data:
+                if current_itinerary() is not None:
+                    current_itinerary().highlights[city] = city_data["attractions"][:MAX_HIGHLIGHTS]
                 result = f"**Travel recommendations for {city}:**\n\n"
                 result += f"Top Attractions\n"
                 for i, attraction in enumerate(city_data["attractions"], 1):
@@ -701,159 +538,95 @@ class TravelAgent:
             return f"I found some general information about {city}, but for the most comprehensive and up-to-date travel recommendations, I recommend checking travel websites like TripAdvisor, Lonely Planet, or the official tourism website for {city}. You can also ask me about specific aspects like weather, flights, or hotels for {city}."
         
         @tool
-        def search_flights_amadeus(origin: str, destination: str, departure_date: str, return_date: str, adults: int = 1, currency: str = "USD") -> str:
+        def resolve_airport_codes(place: str) -> str:
+            """Look up IATA airport codes for a city, airport name or region before searching flights.
+            Args:
+                place: City or airport name (e.g., 'New York', 'Heathrow', 'Tokio')
+            Returns:
+                String listing matching airports with their IATA codes
+            """
+            airports = resolve_airports(place)
+            if not airports:
+                return f"No airports found for '{place}'. Please ask the user for the nearest airport or its IATA code."
+            
+            code = resolve_location_code(place)
+            result = f"Airports for {place} (use '{code}' to search all of them):\n"
+            for airport in airports:
+                result += f"• {airport.iata} - {airport.name} ({airport.city}, {airport.country})\n"
+            return result
+        
+        @tool
+        def search_flights_amadeus(origin: str, destination: str, departure_date: str, return_date: str, adults: int = 1, currency: str = "USD", sort_by: Optional[str] = None) -> str:
             """Search for round-trip flights using Amadeus API.
             Args:
-                origin: IATA code of departure airport (e.g., 'JFK')
-                destination: IATA code of destination airport (e.g., 'LHR')
+                origin: IATA code or city name of departure (e.g., 'JFK', 'New York')
+                destination: IATA code or city name of destination (e.g., 'LHR', 'London')
                 departure_date: Outbound flight date (YYYY-MM-DD)
                 return_date: Return flight date (YYYY-MM-DD)
                 adults: Number of adult travelers
-                currency: Preferred currency (default: USD)
+                currency: Display currency, e.g. 'EUR' (default: USD); a different currency reuses earlier searches
+                sort_by: Rank all available offers by 'price', 'duration' or 'stops' and show the best ones
+                    (use when the user asks for the cheapest, fastest or most direct flights)
             Returns:
                 String summary of flight offers
             """
-            import os
-            import requests
+            # Turn city or airport names into IATA codes locally before calling Amadeus
+            codes = {origin: resolve_location_code(origin), destination: resolve_location_code(destination)}
+            unresolved = unresolved_places_message(codes)
+            if unresolved:
+                return unresolved
+            origin, destination = codes[origin], codes[destination]
             
-            # Airline code to name mapping
-            airline_names = {
-                'AC': 'Air Canada',
-                'UA': 'United Airlines',
-                'AA': 'American Airlines',
-                'DL': 'Delta Air Lines',
-                'BA': 'British Airways',
-                'LH': 'Lufthansa',
-                'AF': 'Air France',
-                'KL': 'KLM Royal Dutch Airlines',
-                'TK': 'Turkish Airlines',
-                'EK': 'Emirates',
-                'QR': 'Qatar Airways',
-                'EY': 'Etihad Airways',
-                'NH': 'All Nippon Airways',
-                'JL': 'Japan Airlines',
-                'KE': 'Korean Air',
-                'OZ': 'Asiana Airlines',
-                'PR': 'Philippine Airlines',
-                'HA': 'Hawaiian Airlines',
-                'AS': 'Alaska Airlines',
-                'WN': 'Southwest Airlines',
-                'B6': 'JetBlue Airways',
-                'NK': 'Spirit Airlines',
-                'F9': 'Frontier Airlines',
-                'VX': 'Virgin America',
-                'VS': 'Virgin Atlantic',
-                'IB': 'Iberia',
-                'AZ': 'ITA Airways',
-                'SN': 'Brussels Airlines',
-                'LX': 'Swiss International Air Lines',
-                'OS': 'Austrian Airlines',
-                'SK': 'SAS Scandinavian Airlines',
-                'AY': 'Finnair',
-                'LO': 'LOT Polish Airlines',
-                'OK': 'Czech Airlines',
-                'RO': 'TAROM',
-                'SU': 'Aeroflot',
-                'TG': 'Thai Airways',
-                'SQ': 'Singapore Airlines',
-                'CX': 'Cathay Pacific',
-                'BR': 'EVA Air',
-                'CI': 'China Airlines',
-                'MU': 'China Eastern Airlines',
-                'CA': 'Air China',
-                'CZ': 'China Southern Airlines',
-                'HU': 'Hainan Airlines',
-                'MF': 'Xiamen Airlines',
-                '3U': 'Sichuan Airlines',
-                'GS': 'Tianjin Airlines',
-                'PN': 'China West Air',
-                'G5': 'China Express Airlines',
-                'KN': 'China United Airlines',
-                'JD': 'Capital Airlines',
-                'DZ': 'Donghai Airlines',
-                'KY': 'Kunming Airlines',
-                '8L': 'Lucky Air',
-                'NS': 'Hebei Airlines',
-                'EU': 'Chengdu Airlines',
-                'TV': 'Tibet Airlines',
-                'UQ': 'Urumqi Air',
-                'GT': 'Air Guilin',
-                'DR': 'Ruili Airlines',
-                'QW': 'Qingdao Airlines',
-                'BK': 'Okay Airways',
-                'HO': 'Juneyao Airlines',
-                '9C': 'Spring Airlines',
-                'FM': 'Shanghai Airlines',
-                'ZH': 'Shenzhen Airlines',
-                'SC': 'Shandong Airlines',
-                'GJ': 'Loong Air',
-                'RY': 'Jiangxi Air',
-                'QW': 'Qingdao Airlines',
-                'BK': 'Okay Airways',
-                'HO': 'Juneyao Airlines',
-                '9C': 'Spring Airlines',
-                'FM': 'Shanghai Airlines',
-                'ZH': 'Shenzhen Airlines',
-                'SC': 'Shandong Airlines',
-                'GJ': 'Loong Air',
-                'RY': 'Jiangxi Air',
-                '6X': 'Icelandair',
-                'FI': 'Icelandair',
-                'TF': 'Braathens Regional Airways',
-                'WF': 'Widerøe',
-                'CP': 'Compass Airlines',
-                'YX': 'Republic Airways',
-                'MQ': 'American Eagle',
-                'OH': 'PSA Airlines',
-                'ZW': 'Air Wisconsin',
-                '9E': 'Endeavor Air',
-                'OO': 'SkyWest Airlines',
-                'EV': 'ExpressJet',
-                'QX': 'Horizon Air',
-                'QK': 'Air Canada Jazz',
-                'JZA': 'Air Canada Rouge',
-                'TS': 'Air Transat',
-                'WS': 'WestJet',
-                'PD': 'Porter Airlines'
-            }
+            # Shared client: the access token is fetched once and reused until it expires
+            client = get_amadeus_client()
+            if client is None:
+                return "Amadeus API credentials not found. Please check your .env file."
+            # Searches run in SEARCH_CURRENCY so that a currency change reuses them
+            converter = CurrencyConverter(currency)
+            if sort_by:
+                # Large result mode: scan every offer as it streams in, keep only the best
+                try:
+                    ranked = rank_offers(stream_flight_offers(client, origin, destination, departure_date,
+                                                              return_date, adults, SEARCH_CURRENCY),
+                                         sort_by.lower(), k=5)
+                except AmadeusError as e:
+                    return f"Failed to get flight offers: {e.text}"
+                except ValueError as e:
+                    return str(e)
+                if not ranked.top:
+                    return "No flight offers found. Try different dates or airports."
+                currency = converter.display_currency(SEARCH_CURRENCY)
+                top_offers = converter.convert_offers(offer for _, offer in ranked.top)
+                
+                result = f"Best {len(ranked.top)} of {ranked.scanned} round-trip flight offers from {origin} to {destination} by {sort_by.lower()} (currency: {currency}):\n\n"
+                for i, ((metrics, _), offer) in enumerate(zip(ranked.top, top_offers), 1):
+                    result += format_flight_offer(i, offer, currency, metrics)
+                record_flight_options(origin, destination, departure_date, return_date,
+                                      [flight_option(i, offer, origin, destination) for i, offer in enumerate(top_offers, 1)])
+                
+                # Offers that no other offer beats on both price and flight time
+                option_numbers = {id(offer): i for i, (_, offer) in enumerate(ranked.top, 1)}
+                result += f"**Best price vs. flight time trade-offs:**\n"
+                for metrics, offer in ranked.frontier:
+                    hours, minutes = divmod(metrics.duration, 60)
+                    label = f"Option {option_numbers[id(offer)]}" if id(offer) in option_numbers else describe_segments(offer["itineraries"][0]["segments"])
+                    price, _ = converter.convert(metrics.price, SEARCH_CURRENCY)
+                    result += f"• {price:,.2f} {currency} — {hours}h {minutes:02d}m, {metrics.stops} stops ({label})\n"
+                if converter.note(SEARCH_CURRENCY):
+                    result += f"\n{converter.note(SEARCH_CURRENCY)}\n"
+                result += f"\n**Please select a flight option by responding with the option number (1, 2, 3, etc.) to proceed with booking.**"
+                return result
             
-            def get_airline_name(code):
-                """Get full airline name from code"""
-                return airline_names.get(code, code)
-            # Step 1: Get access token
-            token_url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-            headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            data = {
-                "grant_type": "client_credentials",
-                "client_id": os.getenv("AMADEUS_CLIENT_ID"),
-                "client_secret": os.getenv("AMADEUS_CLIENT_SECRET"),
-            }
-            token_resp = requests.post(token_url, headers=headers, data=data)
-            if token_resp.status_code != 200:
-                return f"Failed to get Amadeus access token: {token_resp.text}"
-            access_token = token_resp.json().get("access_token")
-            if not access_token:
-                return "No access token received from Amadeus."
-            # Step 2: Search for flight offers
-            search_url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
-            params = {
-                "originLocationCode": origin,
-                "destinationLocationCode": destination,
-                "departureDate": departure_date,
-                "returnDate": return_date,
-                "adults": adults,
-                "currencyCode": currency,
-                "max": 5
-            }
-            search_headers = {"Authorization": f"Bearer {access_token}"}
-            search_resp = requests.get(search_url, headers=search_headers, params=params)
-            if search_resp.status_code != 200:
-                return f"Failed to get flight offers: {search_resp.text}"
-            offers = search_resp.json().get("data", [])
+            try:
+                offers = search_flight_offers(client, origin, destination, departure_date, return_date,
+                                              adults, SEARCH_CURRENCY)
+            except AmadeusError as e:
+                return f"Failed to get flight offers: {e.text}"
             if not offers:
                 return "No flight offers found. Try different dates or airports."
             # Summarize offers - ensure we show at least 4 options
             max_offers = max(4, len(offers))  # Show at least 4 options
+            currency = converter.display_currency(SEARCH_CURRENCY)
             result = f"Found {len(offers)} round-trip flight offers from {origin} to {destination} (currency: {currency}):\n\n"
             
             # If we have fewer than 4 offers, add some fallback options
@@ -888,66 +661,129 @@ class TravelAgent:
                     }
                     fallback_offers.append(fallback_offer)
                 
-                offers.extend(fallback_offers)
+                offers = offers + fallback_offers
             
-            for i, offer in enumerate(offers[:max_offers], 1):
-                price = offer["price"]["total"]
+            shown = converter.convert_offers(offers[:max_offers])
+            for i, offer in enumerate(shown, 1):
+                result += format_flight_offer(i, offer, currency)
+            record_flight_options(origin, destination, departure_date, return_date,
+                                  [flight_option(i, offer, origin, destination) for i, offer in enumerate(shown, 1)])
+            
+            if converter.note(SEARCH_CURRENCY):
+                result += f"{converter.note(SEARCH_CURRENCY)}\n\n"
+            result += f"**Please select a flight option by responding with the option number (1, 2, 3, etc.) to proceed with booking.**"
+            return result
+        
+        @tool
+        def search_flights_flexible_dates(origin: str, destination: str, departure_date: str, return_date: str, flex_days: int = 3, return_flex_days: Optional[int] = None, adults: int = 1, currency: str = "USD") -> str:
+            """Find the cheapest round-trip dates around the requested dates in one search.
+            Use this when the user's dates are flexible (e.g., "cheapest around March 15-20").
+            Args:
+                origin: IATA code or city name of departure (e.g., 'JFK', 'New York')
+                destination: IATA code or city name of destination (e.g., 'LHR', 'London')
+                departure_date: Preferred outbound date (YYYY-MM-DD)
+                return_date: Preferred return date (YYYY-MM-DD)
+                flex_days: Days before/after the departure date to consider (0-3, default: 3)
+                return_flex_days: Days before/after the return date (default: same as flex_days)
+                adults: Number of adult travelers
+                currency: Display currency, e.g. 'EUR' (default: USD); a different currency reuses earlier searches
+            Returns:
+                Price matrix of departure/return date combinations and the cheapest options
+            """
+            codes = {origin: resolve_location_code(origin), destination: resolve_location_code(destination)}
+            unresolved = unresolved_places_message(codes)
+            if unresolved:
+                return unresolved
+            origin, destination = codes[origin], codes[destination]
+            
+            client = get_amadeus_client()
+            if client is None:
+                return "Amadeus API credentials not found. Please check your .env file."
+            if return_flex_days is None:
+                return_flex_days = flex_days
+            try:
+                matrix = flexible_date_search(client, origin, destination, departure_date, return_date,
+                                              flex_days, return_flex_days, adults, SEARCH_CURRENCY)
+            except ValueError:
+                return "Invalid date format. Please use YYYY-MM-DD."
+            converter = CurrencyConverter(currency)
+            currency = converter.display_currency(SEARCH_CURRENCY)
+            matrix = matrix._replace(prices=converter.convert_map(matrix.prices, SEARCH_CURRENCY))
+            
+            cheapest = matrix.cheapest(3)
+            if not cheapest:
+                if matrix.failed:
+                    return "Failed to get flight offers for the requested dates. Please try again later."
+                return "No flight offers found around those dates. Try different dates or airports."
+            
+            result = f"Cheapest round-trip fares from {origin} to {destination} around {departure_date} - {return_date} ({currency}):\n\n"
+            result += format_price_matrix(matrix, currency) + "\n\n"
+            result += "**Best options:**\n"
+            for i, ((dep, ret), price) in enumerate(cheapest, 1):
+                offer = matrix.best_offers[(dep, ret)]
                 itineraries = offer["itineraries"]
-                outbound_segments = itineraries[0]["segments"]
-                inbound_segments = itineraries[1]["segments"] if len(itineraries) > 1 else []
-                
-                # Get airline info for the main carrier
-                main_airline_code = outbound_segments[0].get('carrierCode', 'N/A') if outbound_segments else 'N/A'
-                main_airline_name = get_airline_name(main_airline_code)
-                
-                result += f"**Option {i}: {main_airline_name}**\n"
-                result += f"**Total Price: {price} {currency}**\n"
-                result += f"**Outbound Flight:**\n"
-                for j, segment in enumerate(outbound_segments):
-                    departure = segment.get('departure', {})
-                    arrival = segment.get('arrival', {})
-                    airline_code = segment.get('carrierCode', 'N/A')
-                    airline_name = get_airline_name(airline_code)
-                    flight_number = segment.get('flightNumber') or segment.get('number', 'N/A')
-                    departure_date = departure.get('at', 'N/A')
-                    
-                    if departure_date != 'N/A':
-                        try:
-                            from datetime import datetime
-                            date_obj = datetime.fromisoformat(departure_date.replace('Z', '+00:00'))
-                            formatted_date = date_obj.strftime('%b %d')
-                        except:
-                            formatted_date = 'N/A'
-                    else:
-                        formatted_date = 'N/A'
-                    
-                    result += f"• {departure.get('iataCode', 'N/A')} → {arrival.get('iataCode', 'N/A')} ({airline_name} {flight_number}, {formatted_date})\n"
-                
-                # Inbound flight details
-                if inbound_segments:
-                    result += f"**Return Flight:**\n"
-                    for j, segment in enumerate(inbound_segments):
-                        departure = segment.get('departure', {})
-                        arrival = segment.get('arrival', {})
-                        airline_code = segment.get('carrierCode', 'N/A')
-                        airline_name = get_airline_name(airline_code)
-                        flight_number = segment.get('flightNumber') or segment.get('number', 'N/A')
-                        departure_date = departure.get('at', 'N/A')
-                        
-                        if departure_date != 'N/A':
-                            try:
-                                from datetime import datetime
-                                date_obj = datetime.fromisoformat(departure_date.replace('Z', '+00:00'))
-                                formatted_date = date_obj.strftime('%b %d')
-                            except:
-                                formatted_date = 'N/A'
-                        else:
-                            formatted_date = 'N/A'
-                        
-                        result += f"• {departure.get('iataCode', 'N/A')} → {arrival.get('iataCode', 'N/A')} ({airline_name} {flight_number}, {formatted_date})\n"
-                
-                result += f"---\n"
+                result += f"**Option {i}: {dep} → {ret} — {price:,.2f} {currency}**\n"
+                result += f"• Outbound: {describe_segments(itineraries[0]['segments'])}\n"
+                if len(itineraries) > 1:
+                    result += f"• Return: {describe_segments(itineraries[1]['segments'])}\n"
+            if converter.note(SEARCH_CURRENCY):
+                result += f"\n{converter.note(SEARCH_CURRENCY)}\n"
+            result += "\n**To book, pick a date pair and I will search those exact dates for the full flight options.**"
+            return result
+        
+        @tool
+        def search_flights_nearby_airports(origin: str, destination: str, departure_date: str, return_date: str, radius_km: float = 100, adults: int = 1, currency: str = "USD") -> str:
+            """Search round-trip flights from every airport near the origin to every airport near the destination.
+            Use this for multi-airport cities (e.g., New York, London, Tokyo) or when the user is open to nearby airports.
+            Args:
+                origin: City or airport of departure (e.g., 'New York', 'JFK')
+                destination: City or airport of destination (e.g., 'London', 'LHR')
+                departure_date: Outbound flight date (YYYY-MM-DD)
+                return_date: Return flight date (YYYY-MM-DD)
+                radius_km: How far from each city to look for airports (default: 100 km)
+                adults: Number of adult travelers
+                currency: Display currency, e.g. 'EUR' (default: USD); a different currency reuses earlier searches
+            Returns:
+                The cheapest offers across all airport pairs, with the airports used for each
+            """
+            client = get_amadeus_client()
+            if client is None:
+                return "Amadeus API credentials not found. Please check your .env file."
+            
+            origin_airports = airports_around(origin, radius_km)
+            destination_airports = airports_around(destination, radius_km)
+            unresolved = unresolved_places_message({origin: origin_airports, destination: destination_airports})
+            if unresolved:
+                return unresolved
+            search = nearby_airports_search(client, [code for code, _ in origin_airports],
+                                            [code for code, _ in destination_airports],
+                                            departure_date, return_date, adults, SEARCH_CURRENCY)
+            if not search.offers:
+                if search.failed:
+                    return "Failed to get flight offers for the nearby airports. Please try again later."
+                return "No flight offers found from any nearby airport. Try different dates or a larger radius."
+            
+            def describe_airports(airports):
+                return ", ".join(f"{code} ({distance:.0f} km)" if distance else code for code, distance in airports)
             
+            converter = CurrencyConverter(currency)
+            currency = converter.display_currency(SEARCH_CURRENCY)
+            top_offers = search.offers[:5]
+            result = f"Searched {len(search.searched)} airport pairs for {departure_date} - {return_date} (currency: {currency}):\n"
+            result += f"• From: {describe_airports(origin_airports)}\n"
+            result += f"• To: {describe_airports(destination_airports)}\n"
+            if search.failed:
+                result += f"• No results for: {', '.join(f'{o}-{d}' for o, d in search.failed)}\n"
+            result += "\n"
+            converted = converter.convert_offers(offer for offer, _, _ in top_offers)
+            options = []
+            for i, (offer, (_, offer_origin, offer_destination)) in enumerate(zip(converted, top_offers), 1):
+                result += f"**{offer_origin} → {offer_destination}**\n"
+                result += format_flight_offer(i, offer, currency)
+                options.append(flight_option(i, offer, offer_origin, offer_destination))
+            record_flight_options(origin, destination, departure_date, return_date, options)
+            if converter.note(SEARCH_CURRENCY):
+                result += f"{converter.note(SEARCH_CURRENCY)}\n\n"
             result += f"**Please select a flight option by responding with the option number (1, 2, 3, etc.) to proceed with booking.**"
             return result
         
@@ -975,7 +811,13 @@ class TravelAgent:
                 result += f"**Booking Reference:** {booking_reference}\n"
                 result += f"**Route:** {origin} → {destination} → {origin}\n"
                 result += f"**Travel Dates:** {departure_date} to {return_date}\n"
-                result += f"**Selected Option:** {option_num}\n\n"
+                result += f"**Selected Option:** {option_num}\n"
+                itinerary = current_itinerary()
+                if itinerary is not None:
+                    flight = itinerary.book_flight(option_num, booking_reference, departure_date, return_date).flight
+                    if flight:
+                        result += f"**Flight:** {flight.airline} — {format_money(flight.price, flight.currency)}\n"
+                result += "\n"
                 result += f"**Booking Details:**\n"
                 result += f"• Your flight has been successfully booked\n"
                 result += f"• You will receive a confirmation email shortly\n"
@@ -1010,13 +852,19 @@ class TravelAgent:
                 
                 # Generate a booking reference
                 booking_ref = f"HT{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                selected = ""
+                itinerary = current_itinerary()
+                if itinerary is not None:
+                    hotel = itinerary.book_hotel(option_num, booking_ref, city, check_in, check_out).hotel
+                    if hotel:
+                        selected = f"\n**Hotel:** {hotel.name} — {format_money(hotel.total, hotel.currency)} total"
                 
                 return f"""**🏨 Hotel Booking Confirmed!**
 **Booking Reference:** {booking_ref}
 **Hotel Location:** {city}
 **Check-in:** {check_in}
 **Check-out:** {check_out}
-**Selected Option:** {option_num}
+**Selected Option:** {option_num}{selected}
 
 **Booking Details:**
 • Your hotel has been successfully booked
@@ -1034,10 +882,12 @@ Thank you for choosing our AI Travel Agent! 🏨"""
             except ValueError:
                 return "Invalid option number. Please respond with a number (1, 2, 3, etc.) to select a hotel."
 
-        return [search_hotels_amadeus, get_weather_forecast, get_travel_recommendations, search_flights_amadeus, book_flight, book_hotel]
+        return [search_hotels_amadeus, get_weather_forecast, get_travel_recommendations, resolve_airport_codes, search_flights_amadeus, search_flights_flexible_dates, search_flights_nearby_airports, book_flight, book_hotel]
     
-    def _create_agent(self):
+    def _create_agent(self, llm=None):
         """Create the agent with prompt template"""
+        from langchain.agents import create_openai_tools_agent
+        from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
         
         prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an AI Travel Agent assistant. Your job is to help users plan their trips by:
@@ -1072,6 +922,10 @@ FLIGHT REQUEST HANDLING:
 - Only proceed with flight search after receiving specific dates
 - IMPORTANT: If the user provides clear dates in their request (e.g., "from July 20, 2025, to July 23, 2025"), proceed immediately with the flight search - do NOT ask for dates again
 - Look for date patterns like "from [date] to [date]", "between [date] and [date]", or specific date mentions
+- When the user names cities or airports instead of IATA codes, use the resolve_airport_codes tool to get the codes - do NOT guess codes
+- When a city has several airports (New York, London, Tokyo, ...) or the user is flexible about airports, call search_flights_nearby_airports to compare all of them in one call
+- When the user asks for the cheapest, fastest or most direct flights, call search_flights_amadeus with sort_by set to 'price', 'duration' or 'stops'
+- When the user's dates are flexible ("cheapest around March 15-20", "give or take a few days"), call search_flights_flexible_dates ONCE instead of searching each date pair separately
 - CRITICAL: When displaying flight search results, NEVER summarize or simplify the information
 - ALWAYS show the complete flight details exactly as returned by the search_flights_amadeus tool
 - Do NOT create bullet point summaries - show the full formatted flight information
@@ -1098,6 +952,9 @@ FLIGHT BOOKING HANDLING:
 - Use the book_flight tool with the selected option number and original flight search parameters
 - Provide a comprehensive booking confirmation with all relevant details
 
+HOTEL SEARCH HANDLING:
+- When the user wants to stay close to landmarks, venues or neighbourhoods, pass them to search_hotels_amadeus as near, using "latitude,longitude" pairs separated by ";" when you know the coordinates
+
 HOTEL BOOKING HANDLING:
 - When user responds with a number (1, 2, 3, etc.) after seeing hotel options, use the book_hotel tool
 - Extract the option number from user's response
@@ -1113,6 +970,11 @@ TRIP SUMMARY HANDLING:
 - NEVER use markdown headers (### or ####) - use bold text with emojis instead
 - Always include the important reminders section
 
+CURRENCY HANDLING:
+- Pass the user's preferred currency (e.g., "EUR") as currency to every flight and hotel search, and keep using it for the rest of the conversation
+- When the user switches currency, repeat the earlier flight and hotel searches with the new currency; they are converted from cached results without searching again
+- Every price in a trip summary must be in the same currency, taken from tool results in that currency
+
 TRAVEL RECOMMENDATIONS FORMATTING:
 - ALWAYS use the exact formatting returned by the get_travel_recommendations tool
 - Do NOT reformat or change the numbering system (1., 2., 3., etc.)
@@ -1134,19 +996,19 @@ When providing a complete trip summary, use this EXACT structure with proper spa
 **🛫 FLIGHT DETAILS**
 • **Airline:** [Airline Name]
 • **Route:** [Complete route with flight numbers and dates]
-• **Total Flight Cost:** $[Amount] USD
+• **Total Flight Cost:** [Amount] [Currency]
 
 **🏨 HOTEL DETAILS**
 • **Hotel Name:** [Hotel Name]
 • **Location:** [Location]
-• **Price per Night:** $[Amount]
-• **Total Hotel Cost:** $[Total Amount] for [X] nights
+• **Price per Night:** [Amount] [Currency]
+• **Total Hotel Cost:** [Total Amount] [Currency] for [X] nights
 • **Amenities:** [List of amenities]
 
 **💰 TOTAL TRIP COST**
-• **Flight:** $[Amount] USD
-• **Hotel:** $[Amount] USD
-• **Total Trip Cost:** $[Total Amount] USD
+• **Flight:** [Amount] [Currency]
+• **Hotel:** [Amount] [Currency]
+• **Total Trip Cost:** [Total Amount] [Currency]
 
 **🎯 TRAVEL RECOMMENDATIONS**
 
@@ -1188,27 +1050,99 @@ IMPORTANT:
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
         
-        return create_openai_tools_agent(self.llm, self.tools, prompt)
+        return create_openai_tools_agent(llm or self.llm, self.tools, prompt)
     
-    def chat(self, message: str, chat_history: Optional[List[BaseMessage]] = None) -> str:
-        """Chat with the travel agent"""
+    def chat(self, message: str, chat_history: Optional[List["BaseMessage"]] = None,
+             session_usage: Optional[SessionUsage] = None, itinerary: Optional[Itinerary] = None,
+             callbacks: Optional[List[Any]] = None, raise_errors: bool = False) -> str:
+        """Chat with the travel agent.
+
+        With an itinerary, the tools record their results and bookings into it.
+        callbacks are extra LangChain callback handlers for this run (progress, cancellation).
+        Errors are answered with an apology unless raise_errors is set (batch runs record them instead).
+        """
         if chat_history is None:
             chat_history = []
         
+        # Route the turn to the fast or capable model tier
+        tier = self.router.classify(message, chat_history)
+        
+        # Stay inside the session budget: compact history, then fall back to the fast tier
+        if session_usage is not None:
+            if session_usage.is_exhausted():
+                return ("This session has reached its usage budget. "
+                        "Please start a new conversation to continue planning your trip.")
+            if session_usage.should_compact():
+                chat_history = compact_history(chat_history, session_usage.budget.keep_recent_messages)
+            if session_usage.should_downgrade():
+                tier = FAST_TIER
+        
+        usage = new_usage_handler()
+        start_time = time.perf_counter()
+        failed = False
+        
         try:
-            response = self.agent_executor.invoke({
-                "input": message,
-                "chat_history": chat_history
-            })
+            with recording(itinerary):
+                response = self.get_agent_executor(tier).invoke({
+                    "input": message,
+                    "chat_history": chat_history
+                }, config={"callbacks": [usage, *(callbacks or [])]})
             
             # Ensure we have a valid response
             if response and "output" in response and response["output"]:
                 return response["output"]
             else:
+                failed = True
                 return "I apologize, but I didn't receive a proper response. Please try asking your question again."
                 
         except Exception as e:
+            failed = True
+            if raise_errors:
+                raise
             return f"I encountered an error: {str(e)}. Please try rephrasing your request."
+        finally:
+            latency = time.perf_counter() - start_time
+            self.router.record(
+                tier,
+                latency,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                error=failed
+            )
+            if session_usage is not None:
+                model = self.router.model_name(tier)
+                session_usage.record_turn(TurnUsage(
+                    tier=tier,
+                    model=model,
+                    prompt_tokens=usage.prompt_tokens,
+                    completion_tokens=usage.completion_tokens,
+                    cost=estimate_cost(model, usage.prompt_tokens, usage.completion_tokens),
+                    latency=latency
+                ))
+    
+    def get_model_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tier latency and token metrics collected by the router"""
+        return self.router.get_metrics()
+
+# Process-wide agent runtime. TravelAgent keeps no conversation state (callers
+# pass their own chat history and SessionUsage), so a single instance and its
+# LLM clients, tools and executors can serve every session concurrently.
+_shared_agents: Dict[str, TravelAgent] = {}
+_shared_agents_lock = threading.Lock()
+
+def get_shared_agent(api_key: Optional[str] = None) -> TravelAgent:
+    """Return the shared TravelAgent for an API key, creating it on first use"""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable is required")
+    agent = _shared_agents.get(api_key)
+    if agent is None:
+        with _shared_agents_lock:
+            agent = _shared_agents.get(api_key)
+            if agent is None:
+                agent = TravelAgent(router=ModelRouter.from_env(api_key))
+                _shared_agents[api_key] = agent
+    return agent
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+"""
+Static reference data for the AI Travel Agent
+Airline names and curated hotels are loaded once from the JSON files in data/
+and exposed as read-only tables shared by every tool.
+"""
+
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+
+def _load_json(filename: str):
+    with open(DATA_DIR / filename, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# IATA airline code -> airline name
+AIRLINE_NAMES: Mapping[str, str] = _freeze(_load_json("airlines.json"))
+
+_hotel_data = _load_json("curated_hotels.json")
+
+# City key -> {"display_name", "match", "hotels"}
+CURATED_HOTEL_CITIES: Mapping[str, Mapping] = _freeze(_hotel_data["cities"])
+
+# Used for cities without curated data
+GENERIC_HOTELS: Tuple[Mapping, ...] = _freeze(_hotel_data["generic"])
+
+del _hotel_data
+
+
+def get_airline_name(code: str) -> str:
+    """Full airline name for an IATA code, or the code itself if unknown"""
+    return AIRLINE_NAMES.get(code, code)
+
+
+def get_curated_hotels(city: str) -> Tuple[Tuple[Mapping, ...], bool]:
+    """Curated hotels for a city name.
+
+    Returns (hotels, is_curated); cities without curated data get the generic list.
+    """
+    from city_index import lookup_city
+
+    key = lookup_city(city)
+    if key in CURATED_HOTEL_CITIES:
+        return CURATED_HOTEL_CITIES[key]["hotels"], True
+    return GENERIC_HOTELS, False
+
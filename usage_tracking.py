@@ -0,0 +1,199 @@
+"""
+Token and cost accounting for the AI Travel Agent
+Tracks usage per chat turn and per session, enforces per-session budgets and
+aggregates totals across all sessions in the process for the metrics page.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+# Sessions the ledger keeps per-session totals for; the least recently active are dropped
+LEDGER_MAX_SESSIONS = int(os.getenv("TRAVEL_AGENT_MAX_SESSIONS", "1000"))
+
+# Per-turn records a session keeps; its totals still cover every turn
+RECENT_TURNS = 50
+
+# USD per 1K tokens as (prompt, completion)
+MODEL_PRICING = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of a call, matching dated model names to their base price"""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        # e.g. "gpt-4o-2024-08-06" -> "gpt-4o"; longest prefix wins so gpt-4o beats gpt-4
+        matches = [name for name in MODEL_PRICING if model and model.startswith(name)]
+        if not matches:
+            return 0.0
+        pricing = MODEL_PRICING[max(matches, key=len)]
+    prompt_price, completion_price = pricing
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+@dataclass
+class SessionBudget:
+    """Token/cost limits for one session.
+
+    Before the hard limit is reached the agent first compacts the chat history
+    it sends (compact_at) and then switches every turn to the fast model
+    (downgrade_at). Both thresholds are fractions of the limit.
+    """
+    max_tokens: int = 200_000
+    max_cost: float = 1.00
+    compact_at: float = 0.5
+    downgrade_at: float = 0.8
+    keep_recent_messages: int = 6
+
+    @classmethod
+    def from_env(cls) -> "SessionBudget":
+        return cls(
+            max_tokens=int(os.getenv("TRAVEL_AGENT_SESSION_TOKEN_BUDGET", "200000")),
+            max_cost=float(os.getenv("TRAVEL_AGENT_SESSION_COST_BUDGET", "1.00")),
+        )
+
+
+@dataclass
+class TurnUsage:
+    """Usage of a single TravelAgent.chat call"""
+    tier: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    latency: float
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class SessionUsage:
+    """Running usage totals and budget for one conversation session"""
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    budget: SessionBudget = field(default_factory=SessionBudget.from_env)
+    # The latest RECENT_TURNS turns, oldest first
+    turns: List[TurnUsage] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    turn_count: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def budget_fraction(self) -> float:
+        """Share of the budget used so far, by whichever limit is closer"""
+        fractions = []
+        if self.budget.max_tokens:
+            fractions.append(self.total_tokens / self.budget.max_tokens)
+        if self.budget.max_cost:
+            fractions.append(self.cost / self.budget.max_cost)
+        return max(fractions, default=0.0)
+
+    def should_compact(self) -> bool:
+        return self.budget_fraction() >= self.budget.compact_at
+
+    def should_downgrade(self) -> bool:
+        return self.budget_fraction() >= self.budget.downgrade_at
+
+    def is_exhausted(self) -> bool:
+        return self.budget_fraction() >= 1.0
+
+    def record_turn(self, turn: TurnUsage):
+        self.turns.append(turn)
+        if len(self.turns) > RECENT_TURNS:
+            del self.turns[:-RECENT_TURNS]
+        self.turn_count += 1
+        self.prompt_tokens += turn.prompt_tokens
+        self.completion_tokens += turn.completion_tokens
+        self.cost += turn.cost
+        usage_ledger.record(self.session_id, turn)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "turns": self.turn_count,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cost": round(self.cost, 4),
+            "budget_used": round(self.budget_fraction(), 3),
+        }
+
+
+def compact_history(chat_history: List, keep_recent: int = 6) -> List:
+    """Trim the history sent to the model, keeping the opening request and the latest turns"""
+    if len(chat_history) <= keep_recent + 1:
+        return chat_history
+    # The first user message usually carries destination, dates and budget
+    return [chat_history[0]] + list(chat_history[-keep_recent:])
+
+
+class UsageLedger:
+    """Process-wide aggregate of token usage across all sessions.
+
+    Overall and per-model totals cover everything recorded; per-session totals
+    are kept for the most recently active max_sessions only, so long-running
+    servers and batch runs do not grow the ledger without bound.
+    """
+
+    def __init__(self, max_sessions: int = LEDGER_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._by_model: Dict[str, Dict[str, Any]] = {}
+        self._overall = _empty_totals()
+        self._sessions_seen = 0
+
+    def record(self, session_id: str, turn: TurnUsage):
+        with self._lock:
+            if session_id not in self._sessions:
+                self._sessions_seen += 1
+            for bucket in (
+                self._sessions.setdefault(session_id, _empty_totals()),
+                self._by_model.setdefault(turn.model, _empty_totals()),
+                self._overall,
+            ):
+                bucket["turns"] += 1
+                bucket["prompt_tokens"] += turn.prompt_tokens
+                bucket["completion_tokens"] += turn.completion_tokens
+                bucket["cost"] += turn.cost
+                bucket["last_seen"] = turn.timestamp
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def forget(self, session_id: str):
+        """Drop a deleted session's own totals; overall and per-model totals keep its usage"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals overall, per model and per recently active session"""
+        with self._lock:
+            sessions = {sid: dict(totals) for sid, totals in self._sessions.items()}
+            by_model = {model: dict(totals) for model, totals in self._by_model.items()}
+            overall = dict(self._overall, sessions=self._sessions_seen)
+        return {"overall": overall, "by_model": by_model, "sessions": sessions}
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"turns": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0, "last_seen": None}
+
+
+# Shared by every session served from this process
+usage_ledger = UsageLedger()
@@ -0,0 +1,123 @@
+"""
+Web travel recommendations from the DuckDuckGo Instant Answer API
+Results are categorized once and cached on disk per normalized city and
+interests, so repeat questions are answered without the network round trip.
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from disk_cache import CACHE_DIR, DiskCache
+from text_index import normalize
+from topic_classifier import get_topic_classifier, iter_topic_texts
+
+SEARCH_URL = "https://api.duckduckgo.com/"
+
+# Instant answers for a city change rarely; cities with no answer are retried sooner
+RECOMMENDATION_TTL = float(os.getenv("TRAVEL_AGENT_RECOMMENDATION_TTL", str(30 * 86400)))
+EMPTY_RECOMMENDATION_TTL = float(os.getenv("TRAVEL_AGENT_EMPTY_RECOMMENDATION_TTL", "86400"))
+
+# Interests that do not narrow the search
+GENERAL_INTERESTS = {"", "general", "any", "anything", "everything"}
+
+
+def recommendation_key(city: str, interests: str = "general") -> str:
+    """Cache key: city plus the sorted interest words, e.g. 'paris|culture food'.
+
+    Known names and aliases ("NYC") share their city's key; any other text is
+    kept as typed (lower-cased), since the key is also what gets searched.
+    """
+    from city_index import get_city_index
+
+    index = get_city_index()
+    # No fuzzy matching: a near miss ("Parma") must not be searched and cached as another city
+    city_key = index.lookup(city, fuzzy=False)
+    if city_key:
+        city_name = normalize(index.display_name(city_key))
+    else:
+        city_name = " ".join(city.replace("|", " ").lower().split())
+    words = sorted(set(normalize(interests).split()) - {"and"} - GENERAL_INTERESTS)
+    interest_key = " ".join(words) if words else "general"
+    return f"{city_name}|{interest_key}"
+
+
+def fetch_web_recommendations(city: str, interests: str = "general") -> Optional[Dict[str, Any]]:
+    """Query DuckDuckGo and categorize the related topics.
+
+    Returns None when the API has nothing for the city; raises on HTTP errors
+    so that failures are not cached as empty answers.
+    """
+    import requests
+
+    search_query = f"{city} travel guide attractions restaurants activities"
+    if interests not in GENERAL_INTERESTS:
+        search_query = f"{city} travel guide {interests} attractions restaurants activities"
+    params = {
+        "q": search_query,
+        "format": "json",
+        "no_html": "1",
+        "skip_disambig": "1"
+    }
+    response = requests.get(SEARCH_URL, params=params, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+
+    abstract = data.get("Abstract", "")
+    # Categorize every related topic, including grouped sub-topics
+    grouped = get_topic_classifier().categorize(iter_topic_texts(data.get("RelatedTopics", [])))
+    if not (abstract or grouped["attractions"] or grouped["activities"] or grouped["restaurants"]):
+        return None
+    return {
+        "abstract": abstract,
+        "attractions": grouped["attractions"][:5],
+        "restaurants": grouped["restaurants"][:3],
+        "activities": grouped["activities"][:3],
+        "tips": grouped["tips"][:3],
+    }
+
+
+def format_web_recommendations(city: str, recommendations: Dict[str, Any]) -> str:
+    result = f"Travel recommendations for {city}:\n\n"
+    if recommendations["abstract"]:
+        result += f"Overview: {recommendations['abstract']}\n\n"
+
+    sections = [
+        ("Top Attractions", recommendations["attractions"]),
+        ("Recommended Restaurants", recommendations["restaurants"]),
+        ("Popular Activities", recommendations["activities"]),
+    ]
+    for title, items in sections:
+        if items:
+            result += f"{title}\n"
+            for i, item in enumerate(items, 1):
+                result += f"{i}. {item}\n"
+            result += "\n"
+
+    if recommendations["tips"]:
+        result += "Travel Tips\n"
+        for i, tip in enumerate(recommendations["tips"], 1):
+            result += f"{i}. {tip}\n"
+    return result
+
+
+def _load_recommendations(key: str) -> Optional[Dict[str, Any]]:
+    city, interests = key.split("|", 1)
+    return fetch_web_recommendations(city, interests)
+
+
+@lru_cache(maxsize=None)
+def get_recommendation_cache() -> DiskCache:
+    cache = DiskCache(
+        CACHE_DIR / "web_recommendations.sqlite3",
+        _load_recommendations,
+        ttl=RECOMMENDATION_TTL,
+        negative_ttl=EMPTY_RECOMMENDATION_TTL,
+    )
+    cache.start_background_refresh()
+    return cache
+
+
+def get_web_recommendations(city: str, interests: str = "general") -> Optional[Dict[str, Any]]:
+    """Categorized web recommendations for a city, served from the disk cache when possible"""
+    return get_recommendation_cache().get(recommendation_key(city, interests))